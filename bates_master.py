@@ -1,13 +1,24 @@
 import os
 import csv
-import PyPDF4
 from pathlib import Path
 from datetime import datetime
 import re
 from typing import List, Dict, Tuple
 import shutil
+import json
+import hashlib
 from tqdm import tqdm
+from tqdm.contrib.logging import logging_redirect_tqdm
 import logging
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+import queue
+import multiprocessing
+import threading
+import socket
+import tempfile
+import time
+from itertools import chain, islice
+from contextlib import contextmanager
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 try:
@@ -21,47 +32,1453 @@ import argparse
 import platform
 from docx import Document
 from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import ArrayObject, DecodedStreamObject, DictionaryObject, NameObject
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.colors import black
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.lib.rl_accel import escapePDF
+from reportlab.lib.utils import ImageReader
 import io
+import cProfile
+import pstats
 import openpyxl
 from openpyxl import load_workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.styles import Font
 from openpyxl.utils import get_column_letter
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.worksheet.worksheet import Worksheet
-from PyPDF2 import PdfMerger
 import xlrd
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, landscape, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from PIL import Image
+from PIL import Image, ImageOps, ImageSequence
 import email
 from email import policy
 from email.parser import BytesParser
-from fpdf import FPDF
-import html
+from html.parser import HTMLParser
+import mimetypes
+import textwrap
 
 # Windows-specific imports
 if platform.system() == 'Windows':
     import win32com.client
     import comtypes.client
+    resource = None
+else:
+    import resource
+
+# How often the GUI applies progress from a running production; updates in between are coalesced
+GUI_POLL_INTERVAL_MS = 100
+
+# Kinds of ProductionEvent and the fields each one carries
+EVENT_PHASE_STARTED = 'phase_started'    # phase
+EVENT_PHASE_FINISHED = 'phase_finished'  # phase, seconds
+EVENT_PLANNED = 'planned'                # files, pages, next_number
+EVENT_FILE_CONVERTED = 'file_converted'  # source, pages
+EVENT_FILE_STARTED = 'file_started'      # source, bates_number
+EVENT_FILE_STAMPED = 'file_stamped'      # source, bates_begin, bates_end, pages, bytes_written, reused
+EVENT_FILE_FAILED = 'file_failed'        # source, phase, reason
+EVENT_PROGRESS = 'progress'              # files_done, files_total, pages_done, pages_total, bytes_written
+EVENT_CANCELLED = 'cancelled'            # phase, files_done
+EVENT_JOB_STARTED = 'job_started'        # job (ProductionQueue only)
+EVENT_JOB_FINISHED = 'job_finished'      # job, status (ProductionQueue only)
+
+MANIFEST_FILENAME = "bates_manifest.json"
+MANIFEST_VERSION = 1
+CHECKPOINT_FILENAME = "bates_checkpoint.jsonl"
+METRICS_FILENAME = "run_metrics.json"
+PROFILE_FILENAME = "run_profile.prof"
+
+# Rows of the run summary in the log: slowest files and functions of a --profile run
+METRICS_SLOWEST_FILES = 10
+PROFILE_TOP_FUNCTIONS = 25
+
+# Month names and abbreviations, longest first so "September" beats "Sep"
+MONTH_MAP = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+_MONTH = (r'(?:january|february|march|april|may|june|july|august|september|october|november|december'
+          r'|sept|jan|feb|mar|apr|jun|jul|aug|sep|oct|nov|dec)\.?')
+_YEAR = r'\d{4}|\d{2}'
+
+# Every supported date format in one pattern, scanned in a single pass. The outer
+# group names the format, the inner groups its year, month and day.
+DATE_PATTERN = re.compile(
+    r'(?<![\d\w])(?:'
+    r'(?P<ymd>(?P<ymd_y>\d{4})[-/.](?P<ymd_m>\d{1,2})[-/.](?P<ymd_d>\d{1,2}))'  # YYYY-MM-DD, YYYY/MM/DD
+    rf'|(?P<mdy>(?P<mdy_m>\d{{1,2}})[-/](?P<mdy_d>\d{{1,2}})[-/](?P<mdy_y>{_YEAR}))'  # MM/DD/YYYY
+    rf'|(?P<dmy>(?P<dmy_d>\d{{1,2}})\.(?P<dmy_m>\d{{1,2}})\.(?P<dmy_y>{_YEAR}))'  # DD.MM.YYYY
+    rf'|(?P<dny>(?P<dny_d>\d{{1,2}})\s+(?P<dny_m>{_MONTH})\s+(?P<dny_y>{_YEAR}))'  # 15 November 2023
+    rf'|(?P<ndy>(?P<ndy_m>{_MONTH})\s+(?P<ndy_d>\d{{1,2}}),?\s+(?P<ndy_y>{_YEAR}))'  # November 15, 2023
+    rf'|(?P<ynd>(?P<ynd_y>\d{{4}})\s+(?P<ynd_m>{_MONTH})\s+(?P<ynd_d>\d{{1,2}}))'  # 2023 November 15
+    r')(?![\d\w])',
+    re.IGNORECASE
+)
+
+# Suffixes convert_to_pdf handles itself; everything else goes to the office engine
+IMAGE_SUFFIXES = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tif', '.tiff'}
+EMAIL_SUFFIXES = {'.eml'}
+MAILBOX_SUFFIXES = {'.mbox', '.mbx'}
+NATIVE_CONVERSION_SUFFIXES = ({'.pdf', '.xlsx', '.xls', '.xlsm', '.xlsb', '.csv'} | IMAGE_SUFFIXES | EMAIL_SUFFIXES
+                              | MAILBOX_SUFFIXES)
+
+# Messages split out of a mailbox between progress messages in the log
+MAILBOX_PROGRESS_INTERVAL = 1000
+
+# Rendered email messages: fixed-width font and size, line spacing and page margin
+EMAIL_FONT = 'Courier'
+EMAIL_FONT_SIZE = 9
+EMAIL_LEADING = 11
+EMAIL_MARGIN = 0.6 * inch
+
+# Message headers printed above an email body, with their labels
+EMAIL_HEADERS = [('From', 'from'), ('Sent', 'date'), ('To', 'to'), ('Cc', 'cc'), ('Subject', 'subject')]
+
+# Threads decoding images when files are prepared in a single process
+IMAGE_DECODE_THREADS = 4
+
+# EXIF orientations that are a pure rotation, mapped to the canvas rotation that displays them upright
+EXIF_ROTATIONS = {1: 0, 3: 180, 6: -90, 8: 90}
+
+# Spreadsheet and CSV tables: rows sampled for column widths, rows per page including the header
+TABLE_SAMPLE_ROWS = 200
+TABLE_ROWS_PER_PAGE = 30
+
+# Default look of converted spreadsheet and CSV tables
+DEFAULT_TABLE_THEME = {
+    'header_background': '#4F81BD',
+    'header_text': '#FFFFFF',
+    'header_font': 'Helvetica-Bold',
+    'header_font_size': 9,
+    'header_leading': 10,
+    'header_padding': 6,
+    'body_font': 'Helvetica',
+    'body_font_size': 8,
+    'body_leading': 9,
+    'body_padding': 4,
+    'side_padding': 4,
+    'stripe_background': '#F2F2F2',
+    'grid_color': '#808080',
+    'grid_width': 0.5,
+    'box_width': 1,
+    'max_lines': 3,
+    'title_font': 'Helvetica-Bold',
+    'title_font_size': 12,
+    'title_space': 37,
+}
+
+# Bump when a converter changes its output so cached conversions are not reused
+CONVERSION_CACHE_VERSION = 6
+
+# Office documents handed to a single soffice --convert-to call in batch mode
+OFFICE_BATCH_SIZE = 50
+
+# Default size of a combined PDF volume; a volume is assembled in memory, so
+# this bounds the memory the combined PDF takes however large the production
+COMBINED_VOLUME_MAX_MB = 500
+
+# Document info fields that may hold a date, in order of preference
+METADATA_DATE_FIELDS = ['/CreationDate', '/ModDate', '/Date', '/LastModified', '/LastPrinted']
+
+# Held while forking a conversion sandbox or starting a command, so a sandbox
+# forked from one thread never inherits the pipes of a command another thread
+# is starting; the command's caller would otherwise wait on them forever
+SPAWN_LOCK = threading.Lock()
+
+def compute_file_hash(file_path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def run_command(cmd: List[str], timeout: float = None) -> subprocess.CompletedProcess:
+    """subprocess.run with capture_output and text, starting the command under SPAWN_LOCK."""
+    with SPAWN_LOCK:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        raise
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+# The processor of this worker process, set up once by init_worker
+worker_processor = None
+
+def init_worker(log_file, processor):
+    """Set up a worker process with its own long-lived copy of the processor.
+    
+    Tasks then send only their file or plan entry, and the stamp overlay
+    cache, page-count index and date cache last for every file the worker
+    handles. A forked worker inherits the parent's object as it was, so it is
+    reset the way a pickled copy would be.
+    """
+    global worker_processor
+    init_worker_logging(log_file)
+    processor.__setstate__(processor.__getstate__())
+    worker_processor = processor
+
+def prepare_in_worker(task: Tuple[int, Path, Path]) -> Dict:
+    """Run prepare_file in a worker; task carries the PDF staged for it in the parent, if any."""
+    index, input_file, staged_pdf = task
+    if staged_pdf is not None:
+        worker_processor.staged_conversions[index] = staged_pdf
+    try:
+        return worker_processor.prepare_file((index, input_file))
+    finally:
+        worker_processor.staged_conversions.pop(index, None)
+
+def execute_in_worker(entry: Dict) -> Dict:
+    """Run execute_entry in a worker."""
+    return worker_processor.execute_entry(entry)
+
+def init_worker_logging(log_file):
+    """Configure logging in a worker process to write to the run's log file."""
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    # No-op when the worker was forked with the parent's handlers already in place
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
+
+class ProductionEvent:
+    """Something that happened during a production, as passed to its listeners.
+
+    kind is one of the EVENT_* constants and fields holds the values listed
+    next to it; events relayed by a ProductionQueue also carry the job number.
+    Events are only built when a listener is registered.
+    """
+
+    __slots__ = ('kind', 'time', 'fields')
+
+    def __init__(self, kind: str, fields: Dict):
+        self.kind = kind
+        self.time = time.time()
+        self.fields = fields
+
+    def __getitem__(self, name):
+        return self.fields[name]
+
+    def get(self, name, default=None):
+        return self.fields.get(name, default)
+
+    def to_json(self) -> str:
+        """Serialize the event as one line of JSON; paths become strings."""
+        return json.dumps({'event': self.kind, 'time': round(self.time, 3), **self.fields}, default=str)
+
+class JsonLinesEventWriter:
+    """Listener that writes every event to a stream as a line of JSON."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        # Jobs of a queue emit from several threads
+        self.lock = threading.Lock()
+
+    def __call__(self, event: ProductionEvent):
+        line = event.to_json() + '\n'
+        with self.lock:
+            self.stream.write(line)
+            self.stream.flush()
+
+class TqdmProgressListener:
+    """Listener that draws the stamping phase as a tqdm bar of pages, one bar per queued job."""
+
+    def __init__(self):
+        self.bars = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, event: ProductionEvent):
+        if event.kind == EVENT_PROGRESS:
+            with self.lock:
+                bar = self.bars.get(event.get('job'))
+                if bar is None:
+                    job = event.get('job')
+                    bar = tqdm(total=event['pages_total'], unit='page', position=len(self.bars),
+                               desc=f"Job {job}" if job is not None else "Stamping")
+                    self.bars[job] = bar
+                bar.update(event['pages_done'] - bar.n)
+                bar.set_postfix(files=f"{event['files_done']}/{event['files_total']}",
+                                MB=f"{event['bytes_written'] / 1048576:.1f}", refresh=False)
+        elif event.kind in (EVENT_PHASE_FINISHED, EVENT_CANCELLED) and event['phase'] == 'stamping':
+            with self.lock:
+                bar = self.bars.get(event.get('job'))
+                if bar is not None:
+                    bar.close()
+
+class RunMetrics:
+    """Timings, sizes and memory use of one production run.
+
+    Phases are timed in the main process as they run. Per-file figures come
+    from the planned entries and the execution results, which worker
+    processes time for themselves, so file seconds add up worker time rather
+    than wall-clock time.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.phases = {}
+        self.steps = {}
+        self.files = {}
+
+    def add_phase(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def get_file(self, entry: Dict) -> Dict:
+        record = self.files.get(entry['index'])
+        if record is None:
+            record = self.files[entry['index']] = {
+                'source': str(entry['source']),
+                'type': entry['source'].suffix.lower() or '(none)',
+                'pages': entry['page_count'],
+                'prepare_seconds': 0.0,
+                'execute_seconds': 0.0,
+                'bytes_read': 0,
+                'bytes_written': 0,
+                'status': 'planned',
+            }
+        return record
+
+    def add_prepared(self, entry: Dict):
+        """Record how long a file took to convert and count."""
+        record = self.get_file(entry)
+        record['prepare_seconds'] = entry.get('prepare_seconds', 0.0)
+        record['pages'] = entry['page_count']
+        if entry['error']:
+            record['status'] = 'failed'
+
+    def add_result(self, entry: Dict, result: Dict):
+        """Record how long a file took to copy and stamp, and the time of each step."""
+        record = self.get_file(entry)
+        record['pages'] = entry['page_count']
+        record['execute_seconds'] = result.get('seconds', 0.0)
+        record['bytes_read'] = result['bytes_read']
+        record['bytes_written'] = result['bytes_written']
+        record['status'] = 'reused' if result['reused'] else 'stamped' if result['success'] else 'failed'
+        for step, seconds in result.get('steps', {}).items():
+            self.steps[step] = self.steps.get(step, 0.0) + seconds
+
+    def get_types(self) -> Dict[str, Dict]:
+        """Files, pages, output bytes and file seconds per source type."""
+        types = {}
+        for record in self.files.values():
+            totals = types.setdefault(record['type'], {'files': 0, 'pages': 0, 'bytes_written': 0, 'seconds': 0.0})
+            totals['files'] += 1
+            totals['pages'] += record['pages']
+            totals['bytes_written'] += record['bytes_written']
+            totals['seconds'] += record['prepare_seconds'] + record['execute_seconds']
+        return types
+
+    def get_slowest_files(self, count: int) -> List[Dict]:
+        return sorted(self.files.values(), key=lambda record: record['prepare_seconds'] + record['execute_seconds'],
+                      reverse=True)[:count]
+
+    @staticmethod
+    def get_peak_rss_mb(who: int) -> float:
+        """Peak resident memory of this process or of its finished children, where the platform reports it."""
+        if resource is None:
+            return None
+        peak = resource.getrusage(who).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return round(peak / (1048576 if sys.platform == 'darwin' else 1024), 1)
+
+    def to_dict(self, bytes_read: int, bytes_written: int) -> Dict:
+        return {
+            'started': datetime.fromtimestamp(self.started).isoformat(timespec='seconds'),
+            'wall_seconds': round(time.time() - self.started, 3),
+            'peak_rss_mb': self.get_peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+            'peak_child_rss_mb': self.get_peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None,
+            'bytes_read': bytes_read,
+            'bytes_written': bytes_written,
+            'phases': {phase: round(seconds, 3) for phase, seconds in self.phases.items()},
+            'steps': {step: round(seconds, 3) for step, seconds in self.steps.items()},
+            'types': {file_type: {**totals, 'seconds': round(totals['seconds'], 3)}
+                      for file_type, totals in sorted(self.get_types().items())},
+            'files': [{**record, 'prepare_seconds': round(record['prepare_seconds'], 4),
+                       'execute_seconds': round(record['execute_seconds'], 4)}
+                      for _, record in sorted(self.files.items())],
+        }
+
+    def get_summary_lines(self, bytes_read: int, bytes_written: int) -> List[str]:
+        """The run summary as aligned table rows for the log."""
+        metrics = self.to_dict(bytes_read, bytes_written)
+        peak = f", peak RSS {metrics['peak_rss_mb']} MB" if metrics['peak_rss_mb'] is not None else ""
+        if metrics['peak_child_rss_mb']:
+            peak += f" (child processes {metrics['peak_child_rss_mb']} MB)"
+        lines = [f"Run summary: {metrics['wall_seconds']:.1f} s{peak}, read {bytes_read / 1048576:.1f} MB, "
+                 f"wrote {bytes_written / 1048576:.1f} MB"]
+        
+        lines.append(f"{'Phase':<16}{'Seconds':>10}")
+        lines.extend(f"{phase:<16}{seconds:>10.2f}" for phase, seconds in metrics['phases'].items())
+        if metrics['steps']:
+            lines.append(f"{'File step':<16}{'Seconds':>10}")
+            lines.extend(f"{step:<16}{seconds:>10.2f}" for step, seconds in metrics['steps'].items())
+        
+        if metrics['types']:
+            lines.append(f"{'Type':<10}{'Files':>8}{'Pages':>10}{'MB out':>10}{'File s':>10}{'Pages/s':>10}")
+            for file_type, totals in metrics['types'].items():
+                rate = totals['pages'] / totals['seconds'] if totals['seconds'] else 0
+                lines.append(f"{file_type:<10}{totals['files']:>8}{totals['pages']:>10}"
+                             f"{totals['bytes_written'] / 1048576:>10.1f}{totals['seconds']:>10.2f}{rate:>10.1f}")
+        
+        slowest = self.get_slowest_files(METRICS_SLOWEST_FILES)
+        if slowest:
+            lines.append(f"{'Slowest files':<60}{'Pages':>8}{'Seconds':>10}")
+            for record in slowest:
+                source = record['source'] if len(record['source']) <= 58 else '...' + record['source'][-55:]
+                seconds = record['prepare_seconds'] + record['execute_seconds']
+                lines.append(f"{source:<60}{record['pages']:>8}{seconds:>10.2f}")
+        return lines
+
+class ConversionSandbox:
+    """A forked child process that runs in-process conversions under a time and memory limit.
+
+    The child is forked once and converts one file at a time, so the fork is
+    not paid for every file. A conversion running past timeout seconds or
+    dying is killed together with the child, which is forked again for the
+    next file; so is a child that ran out of memory, since the converter may
+    have been left in a bad state. The memory limit caps the address space of
+    the child at memory_mb above its size when forked. It needs RLIMIT_AS and
+    /proc, so it only takes effect on Linux; elsewhere only the timeout applies.
+    """
+
+    def __init__(self, convert, timeout: int = 300, memory_mb: int = 2048, recycle_after: int = 1000,
+                 logger: logging.Logger = None):
+        self.convert_func = convert
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.recycle_after = recycle_after
+        self.process = None
+        self.connection = None
+        self.conversions = 0
+        self.logger = logger or logging.getLogger(__name__)
+
+    @staticmethod
+    def can_limit_memory() -> bool:
+        """Whether the memory limit is enforced here: macOS ignores RLIMIT_AS and has no /proc."""
+        return resource is not None and platform.system() == 'Linux' and os.path.exists('/proc/self/statm')
+
+    def start(self):
+        """Fork the child process."""
+        context = multiprocessing.get_context('fork')
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=self.serve, args=(child_connection,), daemon=True)
+        with SPAWN_LOCK:
+            self.process.start()
+        child_connection.close()
+        self.conversions = 0
+
+    def serve(self, connection):
+        """Convert files sent by the parent until the connection closes; runs in the child."""
+        if self.memory_mb and self.can_limit_memory():
+            with open('/proc/self/statm') as f:
+                base = int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+            limit = base + self.memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        monitor = ConversionErrorMonitor()
+        logging.getLogger().addHandler(monitor)
+        while True:
+            try:
+                task = connection.recv()
+            except EOFError:
+                return
+            if task is None:
+                return
+            input_path, output_dir = task
+            monitor.out_of_memory = False
+            pdf = self.convert_func(input_path, output_dir)
+            if pdf:
+                connection.send((pdf, None))
+            elif monitor.out_of_memory:
+                connection.send((None, f"Conversion exceeded {self.memory_mb} MB"))
+            else:
+                connection.send((None, "Failed to convert to PDF"))
+
+    def convert(self, input_path: Path, output_dir: Path) -> Tuple[Path, str]:
+        """Convert one file in the child, returning (PDF, None) or (None, reason)."""
+        if self.process is None or not self.process.is_alive() or self.conversions >= self.recycle_after:
+            self.close()
+            self.start()
+        self.conversions += 1
+        self.connection.send((input_path, output_dir))
+        try:
+            if self.connection.poll(self.timeout):
+                pdf, reason = self.connection.recv()
+                if reason is not None and reason != "Failed to convert to PDF":
+                    self.close()
+                return pdf, reason
+            self.logger.error(f"Converting {input_path} to PDF timed out after {self.timeout} seconds, stopping it")
+            self.close(kill=True)
+            return None, "Conversion timed out"
+        except EOFError:
+            # The child died without answering, e.g. crashed in a library
+            self.process.join()
+            self.logger.error(f"Converting {input_path} to PDF crashed (exit code {self.process.exitcode})")
+            self.close()
+            return None, "Conversion crashed"
+
+    def close(self, kill: bool = False):
+        """Stop the child, asking an idle one to exit by itself."""
+        if self.process is None:
+            return
+        if not kill:
+            try:
+                self.connection.send(None)
+                self.process.join(timeout=1)
+            except OSError:
+                pass
+        self.connection.close()
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.process = None
+        self.connection = None
+
+class ConversionErrorMonitor(logging.Handler):
+    """Notices errors logged while handling a MemoryError during an isolated conversion.
+
+    The converters catch their own exceptions and only log them, so the active
+    exception at the time of the log call is the only sign of what went wrong.
+    """
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.out_of_memory = False
+
+    def emit(self, record):
+        if isinstance(sys.exc_info()[1], MemoryError):
+            self.out_of_memory = True
+
+class PdfPageIndex:
+    """Page counts of PDFs, keyed by path, size and modification time.
+
+    The count is read from /Count on the root of the page tree, which only
+    resolves the catalog and the root Pages object instead of walking every
+    page. Files whose page tree root is missing or malformed fall back to full
+    parsing. Entries stay valid for the life of the run unless the file changes.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_key(pdf_path: Path) -> tuple:
+        """Build the cache key for a file from its path, size and modification time."""
+        stat = os.stat(pdf_path)
+        return (str(Path(pdf_path).resolve()), stat.st_size, stat.st_mtime_ns)
+
+    @staticmethod
+    def read_tree_count(reader: PdfReader) -> int:
+        """Return /Count from the page tree root, or None if it cannot be trusted."""
+        try:
+            count = reader.trailer['/Root']['/Pages'].get('/Count')
+            if isinstance(count, int) and count > 0:
+                return int(count)
+        except Exception:
+            pass
+        return None
+
+    def get_page_count(self, pdf_path: Path) -> int:
+        """Return the number of pages in a PDF, raising if it cannot be read."""
+        key = self.get_key(pdf_path)
+        page_count = self.entries.get(key)
+        if page_count is not None:
+            self.hits += 1
+            return page_count
+        
+        self.misses += 1
+        with open(pdf_path, 'rb') as file:
+            reader = PdfReader(file)
+            page_count = self.read_tree_count(reader)
+            if page_count is None:
+                # Broken page tree root; let PyPDF2 walk the pages
+                page_count = len(reader.pages)
+        self.entries[key] = page_count
+        return page_count
+
+    def add(self, pdf_path: Path, page_count: int):
+        """Record a page count that was read elsewhere, e.g. in a worker process."""
+        try:
+            self.entries[self.get_key(pdf_path)] = page_count
+        except OSError:
+            pass
+
+class DateExtractor:
+    """Finds the document date of PDFs from their metadata or first pages.
+
+    Each PDF is opened once; its document info is checked first, then the text
+    of the first few pages is scanned with DATE_PATTERN and the earliest match
+    that is a valid, non-future date wins. Results are cached by path, size and
+    modification time for the life of the run.
+    """
+
+    def __init__(self, max_pages: int = 3):
+        self.max_pages = max_pages
+        self.cache = {}
+
+    @staticmethod
+    def parse_match(match) -> datetime:
+        """Turn a DATE_PATTERN match into a datetime, or None if it is not a real date."""
+        fmt = match.lastgroup
+        year = match.group(f'{fmt}_y')
+        month = match.group(f'{fmt}_m')
+        day = match.group(f'{fmt}_d')
+        try:
+            month = int(month) if month.isdigit() else MONTH_MAP[month[:3].lower()]
+            year = int(year)
+            if len(match.group(f'{fmt}_y')) == 2:
+                # Same pivot as strptime's %y
+                year += 2000 if year < 69 else 1900
+            return datetime(year, month, int(day))
+        except (KeyError, ValueError):
+            return None
+
+    def find_date(self, text: str) -> datetime:
+        """Return the first valid date in text that is not in the future."""
+        now = datetime.now()
+        for match in DATE_PATTERN.finditer(text):
+            found = self.parse_match(match)
+            if found is not None and found <= now:
+                return found
+        return None
+
+    @staticmethod
+    def parse_metadata_date(value) -> datetime:
+        """Parse a PDF date string such as D:20231115123456-06'00'."""
+        date_str = re.sub(r"^D:", "", str(value).strip())
+        try:
+            return datetime.strptime(date_str[:8], '%Y%m%d')
+        except ValueError:
+            return None
+
+    def extract(self, pdf_path: Path, use_metadata: bool = True) -> datetime:
+        """Return the document date of a PDF, or None if none is found.
+        
+        Metadata dates of freshly converted files only record the conversion,
+        so callers turn use_metadata off for them.
+        """
+        stat = os.stat(pdf_path)
+        key = (str(Path(pdf_path).resolve()), stat.st_size, stat.st_mtime_ns, use_metadata)
+        if key in self.cache:
+            return self.cache[key]
+        
+        found = None
+        logger = logging.getLogger(__name__)
+        try:
+            with open(pdf_path, 'rb') as file:
+                reader = PdfReader(file)
+                now = datetime.now()
+                if use_metadata:
+                    metadata = reader.metadata or {}
+                    for field in METADATA_DATE_FIELDS:
+                        if field in metadata:
+                            candidate = self.parse_metadata_date(metadata[field])
+                            if candidate is not None and candidate <= now:
+                                found = candidate
+                                break
+                
+                # Look through the first few pages for dates
+                page_count = len(reader.pages) if found is None else 0
+                for page_num in range(min(self.max_pages, page_count)):
+                    try:
+                        found = self.find_date(reader.pages[page_num].extract_text() or "")
+                    except Exception as e:
+                        logger.debug(f"Error reading page {page_num} of {pdf_path}: {str(e)}")
+                        continue
+                    if found is not None:
+                        break
+        except Exception as e:
+            logger.warning(f"Could not extract date from {pdf_path}: {str(e)}")
+        
+        self.cache[key] = found
+        return found
+
+    def extract_many(self, pdf_paths: List[Path], executor=None) -> List[datetime]:
+        """Extract dates for many PDFs, spread over an executor when one is given."""
+        if executor is not None:
+            return list(executor.map(self.extract, pdf_paths))
+        return [self.extract(pdf_path) for pdf_path in pdf_paths]
+
+class OfficeConversionPool:
+    """Warm headless LibreOffice instances that office documents are converted on.
+
+    Each instance listens on its own localhost socket with its own profile, so
+    several documents convert at once without paying the office-suite startup
+    for every file. unoconv connects to an idle instance for each conversion.
+    Instances are restarted when they crash, when a conversion times out and
+    after every recycle_after conversions to keep memory in check.
+    """
+
+    def __init__(self, size: int, timeout: int = 300, recycle_after: int = 200, logger: logging.Logger = None):
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.recycle_after = recycle_after
+        self.soffice = self.find_soffice()
+        self.idle = queue.Queue()
+        self.instances = []
+        self.logger = logger or logging.getLogger(__name__)
+
+    @staticmethod
+    def find_soffice() -> str:
+        """Return the LibreOffice executable, or None if it is not installed."""
+        for name in ('soffice', 'libreoffice'):
+            found = shutil.which(name)
+            if found:
+                return found
+        if platform.system() == 'Darwin':
+            app_path = '/Applications/LibreOffice.app/Contents/MacOS/soffice'
+            if os.path.exists(app_path):
+                return app_path
+        return None
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Check whether both LibreOffice and the unoconv client can be found."""
+        return cls.find_soffice() is not None and shutil.which('unoconv') is not None
+
+    @staticmethod
+    def find_free_port() -> int:
+        """Ask the OS for an unused localhost port."""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
+
+    def launch(self, slot: int) -> Dict:
+        """Start one listening instance and wait until it accepts connections."""
+        port = self.find_free_port()
+        profile_dir = Path(tempfile.mkdtemp(prefix=f"bates_office_{slot}_"))
+        cmd = [
+            self.soffice, '--headless', '--invisible', '--nologo', '--nodefault',
+            '--norestore', '--nolockcheck',
+            f'-env:UserInstallation={profile_dir.as_uri()}',
+            f'--accept=socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext',
+        ]
+        with SPAWN_LOCK:
+            process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        instance = {'slot': slot, 'port': port, 'process': process,
+                    'profile_dir': profile_dir, 'conversions': 0}
+        
+        # A fresh profile takes a while to initialize on first start
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                break
+            try:
+                with socket.create_connection(('127.0.0.1', port), timeout=1):
+                    self.logger.info(f"Office instance {slot} listening on port {port}")
+                    return instance
+            except OSError:
+                time.sleep(0.25)
+        self.stop_instance(instance)
+        raise RuntimeError(f"Office instance {slot} failed to start")
+
+    def stop_instance(self, instance: Dict):
+        """Terminate an instance and remove its profile."""
+        process = instance['process']
+        if process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        shutil.rmtree(instance['profile_dir'], ignore_errors=True)
+
+    def restart(self, instance: Dict) -> Dict:
+        """Replace an instance with a fresh one, keeping the old one if that fails."""
+        self.stop_instance(instance)
+        try:
+            new_instance = self.launch(instance['slot'])
+        except Exception as e:
+            self.logger.error(f"Could not restart office instance {instance['slot']}: {str(e)}")
+            return instance
+        self.instances[instance['slot']] = new_instance
+        return new_instance
+
+    def start(self):
+        """Start every instance in the pool."""
+        for slot in range(self.size):
+            instance = self.launch(slot)
+            self.instances.append(instance)
+            self.idle.put(instance)
+
+    def convert(self, input_path: Path, output_pdf: Path) -> bool:
+        """Convert one document on the next idle instance, waiting for one if all are busy."""
+        instance = self.idle.get()
+        try:
+            if instance['process'].poll() is not None:
+                self.logger.warning(f"Office instance {instance['slot']} exited, restarting")
+                instance = self.restart(instance)
+            
+            # Converted into a temporary name so a half-written PDF is never picked up
+            temp_pdf = output_pdf.with_name(f"{output_pdf.stem}.converting.pdf")
+            cmd = [
+                'unoconv', '--no-launch',
+                '--connection', f"socket,host=127.0.0.1,port={instance['port']};urp;StarOffice.ComponentContext",
+                '-f', 'pdf', '-o', str(temp_pdf), str(input_path)
+            ]
+            try:
+                result = run_command(cmd, timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                self.logger.error(f"Converting {input_path} timed out after {self.timeout} seconds")
+                # The instance is likely stuck on the document
+                instance = self.restart(instance)
+                temp_pdf.unlink(missing_ok=True)
+                return False
+            
+            instance['conversions'] += 1
+            if result.returncode != 0 or not temp_pdf.exists():
+                self.logger.error(f"Error converting {input_path} to PDF: {result.stderr}")
+                if instance['process'].poll() is not None:
+                    instance = self.restart(instance)
+                temp_pdf.unlink(missing_ok=True)
+                return False
+            
+            os.replace(temp_pdf, output_pdf)
+            return True
+        finally:
+            if instance['conversions'] >= self.recycle_after:
+                self.logger.info(f"Recycling office instance {instance['slot']} after "
+                                 f"{instance['conversions']} conversions")
+                instance = self.restart(instance)
+            self.idle.put(instance)
+
+    def close(self):
+        """Stop every instance."""
+        for instance in self.instances:
+            self.stop_instance(instance)
+        self.instances = []
+
+    def __enter__(self):
+        try:
+            self.start()
+        except Exception:
+            self.close()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class ConversionCache:
+    """On-disk cache of converted PDFs keyed by source content and converter.
+
+    Identical sources, such as an attachment forwarded many times, are
+    converted once and the PDF is reused across files and across runs. Entries
+    are touched when used and the least recently used ones are removed once
+    the cache grows past its size cap. Several processes may share a cache;
+    entries are written under a temporary name and renamed into place.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def get_key(source_path: Path, converter_id: str) -> str:
+        """Build the key for a source file converted by the given converter."""
+        return hashlib.sha256(f"{converter_id}:{compute_file_hash(source_path)}".encode()).hexdigest()
+
+    def get_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.pdf"
+
+    def fetch(self, key: str, target: Path) -> Path:
+        """Place the cached PDF for key at target and return it, or None on a miss."""
+        cached = self.get_path(key)
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            EnhancedBatesNumbering.link_or_copy(cached, target)
+            # Mark the entry as recently used
+            os.utime(cached)
+        except OSError:
+            return None
+        return target
+
+    def store(self, key: str, pdf_path: Path):
+        """Add a converted PDF to the cache."""
+        cached = self.get_path(key)
+        if cached.exists():
+            return
+        try:
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = cached.with_name(f"{cached.stem}.{os.getpid()}.tmp")
+            shutil.copy2(pdf_path, temp_path)
+            os.replace(temp_path, cached)
+            os.utime(cached)
+        except OSError as e:
+            logging.getLogger(__name__).warning(f"Could not cache conversion of {pdf_path}: {str(e)}")
+
+    def trim(self):
+        """Remove the least recently used entries until the cache fits its size cap."""
+        entries = []
+        total = 0
+        for cached in self.cache_dir.glob("*/*.pdf"):
+            try:
+                stat = cached.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, cached))
+            total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        
+        removed = 0
+        for _, size, cached in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            cached.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        logging.getLogger(__name__).info(f"Conversion cache: removed {removed} least recently used entries")
+
+class TableRenderer:
+    """Draws spreadsheet and CSV tables straight onto a canvas.
+
+    Cells are wrapped with cached word widths and drawn as plain strings; row
+    backgrounds, the grid and the box are simple lines and rectangles, so no
+    Paragraph or Table object is built per cell. Each page holds at most
+    TABLE_ROWS_PER_PAGE rows including the repeated header, as many as fit.
+    """
+
+    def __init__(self, output_pdf: Path, theme: Dict = None):
+        self.theme = dict(DEFAULT_TABLE_THEME, **(theme or {}))
+        self.page_width, self.page_height = landscape(A4)  # Use A4 for more space
+        self.margin = 0.25 * inch
+        self.available_width = (self.page_width - 2 * self.margin) * 0.95
+        self.can = canvas.Canvas(str(output_pdf), pagesize=(self.page_width, self.page_height),
+                                 pageCompression=1)
+        self.pages = 0
+        self.page_open = False
+        
+        t = self.theme
+        self.header_color = colors.HexColor(t['header_background'])
+        self.header_text_color = colors.HexColor(t['header_text'])
+        self.stripe_color = colors.HexColor(t['stripe_background'])
+        self.grid_color = colors.HexColor(t['grid_color'])
+        self.body_ascent = pdfmetrics.getAscent(t['body_font'], t['body_font_size'])
+        self.header_ascent = pdfmetrics.getAscent(t['header_font'], t['header_font_size'])
+        self.word_widths = {}
+
+    def text_width(self, text: str, font: str, size: float) -> float:
+        """Return the width of text, caching words since they repeat across rows."""
+        key = (text, font, size)
+        width = self.word_widths.get(key)
+        if width is None:
+            width = pdfmetrics.stringWidth(text, font, size)
+            if len(self.word_widths) < 100000:
+                self.word_widths[key] = width
+        return width
+
+    def wrap(self, text: str, width: float, font: str, size: float) -> List[str]:
+        """Wrap text into at most max_lines lines that fit width, breaking long words."""
+        max_lines = self.theme['max_lines']
+        space = self.text_width(' ', font, size)
+        lines = []
+        current = []
+        current_width = 0
+        for word in text.split():
+            word_width = self.text_width(word, font, size)
+            while word_width > width and len(lines) < max_lines:
+                # A word wider than the column is broken across lines
+                if current:
+                    lines.append(' '.join(current))
+                    current, current_width = [], 0
+                    continue
+                cut = len(word) - 1
+                while cut > 1 and pdfmetrics.stringWidth(word[:cut], font, size) > width:
+                    cut -= 1
+                lines.append(word[:cut])
+                word = word[cut:]
+                word_width = self.text_width(word, font, size)
+            if len(lines) >= max_lines:
+                break
+            if current and current_width + space + word_width > width:
+                lines.append(' '.join(current))
+                current, current_width = [], 0
+                if len(lines) >= max_lines:
+                    break
+            current.append(word)
+            current_width += (space if current_width else 0) + word_width
+        if current and len(lines) < max_lines:
+            lines.append(' '.join(current))
+        return lines
+
+    @staticmethod
+    def format_cell(cell) -> str:
+        """Return a body cell's display text, with numbers formatted to two decimals."""
+        cell_text = str(cell).strip()
+        try:
+            if cell_text.replace(',', '').replace('.', '').replace('-', '').isdigit():
+                cell_text = "{:,.2f}".format(float(cell_text.replace(',', '')))
+        except ValueError:
+            pass
+        return cell_text
+
+    def layout_row(self, cells: List, header: bool) -> Tuple[List[List[str]], float]:
+        """Wrap every cell of a row and return the lines and the row height."""
+        t = self.theme
+        font = t['header_font'] if header else t['body_font']
+        size = t['header_font_size'] if header else t['body_font_size']
+        leading = t['header_leading'] if header else t['body_leading']
+        padding = t['header_padding'] if header else t['body_padding']
+        cell_lines = []
+        for col, cell in enumerate(cells):
+            text = str(cell).strip() if header else self.format_cell(cell)
+            cell_lines.append(self.wrap(text, self.col_widths[col] - 2 * t['side_padding'], font, size))
+        line_count = max(1, max((len(lines) for lines in cell_lines), default=0))
+        return cell_lines, line_count * leading + 2 * padding
+
+    def start_sheet(self, title: str, col_widths: List[float], header: List):
+        """Begin a new sheet on a new page with its column widths and header row."""
+        self.close_page()
+        self.title = title
+        self.col_widths = col_widths
+        self.table_width = sum(col_widths)
+        # Tables are centered like a platypus Table in a frame
+        self.x0 = self.margin + (self.page_width - 2 * self.margin - self.table_width) / 2
+        self.col_x = [self.x0]
+        for width in col_widths:
+            self.col_x.append(self.col_x[-1] + width)
+        self.header = self.layout_row(header, header=True)
+        self.rows_on_page = 0
+        self.sheet_rows = 0
+
+    def open_page(self):
+        """Start a page with the sheet title on the first page and the header row."""
+        t = self.theme
+        self.page_open = True
+        y = self.page_height - self.margin
+        if self.title is not None:
+            self.can.setFillColor(colors.black)
+            self.can.setFont(t['title_font'], t['title_font_size'])
+            self.can.drawCentredString(self.page_width / 2, y - t['title_font_size'], str(self.title))
+            y -= t['title_space']
+            self.title = None
+        self.table_top = y
+        self.row_bottoms = []
+        self.y = y
+        self.draw_row(*self.header, header=True)
+
+    def draw_row(self, cell_lines: List[List[str]], height: float, header: bool = False):
+        """Draw one laid-out row below the previous one."""
+        t = self.theme
+        top = self.y
+        bottom = top - height
+        if header:
+            background = self.header_color
+        elif self.rows_on_page % 2 == 1:
+            # Every other body row is striped, starting with the second
+            background = self.stripe_color
+        else:
+            background = None
+        if background is not None:
+            self.can.setFillColor(background)
+            self.can.rect(self.x0, bottom, self.table_width, height, stroke=0, fill=1)
+        
+        font = t['header_font'] if header else t['body_font']
+        size = t['header_font_size'] if header else t['body_font_size']
+        leading = t['header_leading'] if header else t['body_leading']
+        padding = t['header_padding'] if header else t['body_padding']
+        ascent = self.header_ascent if header else self.body_ascent
+        self.can.setFillColor(self.header_text_color if header else colors.black)
+        self.can.setFont(font, size)
+        for col, lines in enumerate(cell_lines):
+            baseline = top - padding - ascent
+            for line in lines:
+                if header:
+                    self.can.drawCentredString((self.col_x[col] + self.col_x[col + 1]) / 2, baseline, line)
+                else:
+                    self.can.drawString(self.col_x[col] + t['side_padding'], baseline, line)
+                baseline -= leading
+        
+        self.row_bottoms.append(bottom)
+        self.y = bottom
+
+    def add_row(self, cells: List):
+        """Lay out a body row, starting a new page when it does not fit."""
+        cell_lines, height = self.layout_row(cells, header=False)
+        if self.page_open and (self.rows_on_page + 1 >= TABLE_ROWS_PER_PAGE
+                               or self.y - height < self.margin):
+            self.close_page()
+        if not self.page_open:
+            self.open_page()
+        self.draw_row(cell_lines, height)
+        self.rows_on_page += 1
+        self.sheet_rows += 1
+
+    def close_page(self):
+        """Draw the grid and box over the rows on the page and finish it."""
+        if not self.page_open:
+            return
+        t = self.theme
+        bottom = self.row_bottoms[-1]
+        self.can.setStrokeColor(self.grid_color)
+        self.can.setLineWidth(t['grid_width'])
+        for y in self.row_bottoms[:-1]:
+            self.can.line(self.x0, y, self.x0 + self.table_width, y)
+        for x in self.col_x[1:-1]:
+            self.can.line(x, self.table_top, x, bottom)
+        self.can.setStrokeColor(colors.black)
+        self.can.setLineWidth(t['box_width'])
+        self.can.rect(self.x0, bottom, self.table_width, self.table_top - bottom, stroke=1, fill=0)
+        self.can.showPage()
+        self.pages += 1
+        self.page_open = False
+        self.rows_on_page = 0
+
+    def end_sheet(self):
+        """Finish a sheet; one with only a header row still gets its page."""
+        if not self.page_open and not self.sheet_rows:
+            self.open_page()
+
+    def finish(self) -> bool:
+        """Save the PDF; returns False without writing if no page was drawn."""
+        self.close_page()
+        if self.pages == 0:
+            return False
+        self.can.save()
+        return True
+
+class HtmlTextExtractor(HTMLParser):
+    """Collects the visible text of an HTML email body, breaking lines at block elements."""
+
+    BLOCK_TAGS = {'address', 'blockquote', 'br', 'div', 'dl', 'dt', 'dd', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+                  'hr', 'li', 'ol', 'p', 'pre', 'table', 'tr', 'ul'}
+    SKIP_TAGS = {'head', 'script', 'style', 'title'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append('\n')
+        elif tag in ('td', 'th'):
+            self.parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            # Whitespace in HTML text is not significant
+            self.parts.append(re.sub(r'\s+', ' ', data))
+
+    def get_text(self) -> str:
+        """Return the collected text with at most one blank line in a row."""
+        lines = []
+        for line in ''.join(self.parts).split('\n'):
+            line = line.strip()
+            if line or (lines and lines[-1]):
+                lines.append(line)
+        return '\n'.join(lines).strip()
+
+class EmailRenderer:
+    """Renders email messages to PDF and extracts their attachments.
+
+    The headers and body are laid out as fixed-width text, so wrapping is a
+    character count and every page is a single text object drawn in one pass.
+    The plain-text body is preferred; HTML-only messages are reduced to their
+    visible text. Attachments, including attached messages, are saved as files
+    so they can be produced after their parent.
+    """
+
+    def __init__(self):
+        self.page_width, self.page_height = letter
+        char_width = pdfmetrics.stringWidth('M', EMAIL_FONT, EMAIL_FONT_SIZE)
+        self.line_chars = int((self.page_width - 2 * EMAIL_MARGIN) / char_width)
+        self.page_lines = int((self.page_height - 2 * EMAIL_MARGIN) / EMAIL_LEADING)
+        # Control characters other than tabs and line breaks would print as boxes
+        self.control_chars = dict.fromkeys(c for c in range(32) if c not in (9, 10, 11, 12, 13))
+
+    @staticmethod
+    def parse(input_path: Path):
+        """Parse an .eml file into an EmailMessage."""
+        with open(input_path, 'rb') as f:
+            return BytesParser(policy=policy.default).parse(f)
+
+    @staticmethod
+    def get_part_text(part) -> str:
+        """Return the decoded text of a message part, tolerating bad or unknown charsets."""
+        try:
+            return part.get_content()
+        except (LookupError, UnicodeError, AssertionError):
+            payload = part.get_payload(decode=True) or b''
+            return payload.decode('utf-8', errors='replace')
+
+    def get_body_text(self, msg) -> str:
+        """Return the message body as plain text."""
+        body = msg.get_body(preferencelist=('plain', 'html'))
+        if body is None:
+            return ''
+        text = self.get_part_text(body)
+        if body.get_content_subtype() == 'html':
+            extractor = HtmlTextExtractor()
+            extractor.feed(text)
+            extractor.close()
+            text = extractor.get_text()
+        return text
+
+    @staticmethod
+    def clean_filename(name: str) -> str:
+        """Strip directories and characters that are not allowed in file names."""
+        name = name.replace('\\', '/').rsplit('/', 1)[-1]
+        return re.sub(r'[<>:"|?*\x00-\x1f]', '_', name).strip(' .')
+
+    def iter_attachments(self, msg):
+        """Yield (file name, part) for every attachment, with names unique within the message."""
+        used = set()
+        parts = list(msg.iter_attachments())
+        number = 0
+        while parts:
+            part = parts.pop(0)
+            if part.is_multipart() and part.get_content_maintype() == 'multipart':
+                # Attachments can be nested in a further multipart/mixed
+                parts[:0] = list(part.iter_attachments())
+                continue
+            number += 1
+            name = self.clean_filename(part.get_filename() or '')
+            if part.get_content_type() == 'message/rfc822':
+                name = os.path.splitext(name)[0] if name.lower().endswith('.eml') else name
+                name = (name or f"attached_message_{number}") + '.eml'
+            elif not name:
+                extension = mimetypes.guess_extension(part.get_content_type()) or '.bin'
+                name = f"attachment_{number}{extension}"
+            stem, suffix = os.path.splitext(name)
+            copy = 1
+            while name.lower() in used:
+                copy += 1
+                name = f"{stem}_{copy}{suffix}"
+            used.add(name.lower())
+            yield name, part
+
+    @staticmethod
+    def get_attachment_bytes(part) -> bytes:
+        """Return the decoded content of an attachment."""
+        if part.get_content_type() == 'message/rfc822':
+            attached = part.get_payload()
+            attached = attached[0] if isinstance(attached, list) else attached
+            return attached.as_bytes()
+        return part.get_payload(decode=True) or b''
+
+    def save_attachments(self, msg, target_dir: Path) -> List[Path]:
+        """Write the attachments of a message into target_dir in message order."""
+        saved = []
+        for name, part in self.iter_attachments(msg):
+            target_dir.mkdir(parents=True, exist_ok=True)
+            target = target_dir / name
+            target.write_bytes(self.get_attachment_bytes(part))
+            saved.append(target)
+        return saved
+
+    def wrap(self, text: str, width: int) -> List[str]:
+        """Wrap text to width characters, keeping its line breaks and blank lines."""
+        lines = []
+        for line in text.translate(self.control_chars).expandtabs(4).splitlines():
+            line = line.rstrip()
+            if len(line) <= width:
+                lines.append(line)
+            else:
+                lines.extend(textwrap.wrap(line, width, break_on_hyphens=False, drop_whitespace=True))
+        return lines
+
+    def layout(self, msg) -> List[Tuple[str, str]]:
+        """Return the (label, text) lines of a rendered message; body lines have no label."""
+        lines = []
+        label_width = max(len(label) for label, _ in EMAIL_HEADERS + [('Attachments', None)]) + 2
+        attachment_names = [name for name, _ in self.iter_attachments(msg)]
+        headers = [(label, str(msg.get(header, '') or '')) for label, header in EMAIL_HEADERS]
+        if attachment_names:
+            headers.append(('Attachments', '; '.join(attachment_names)))
+        for label, value in headers:
+            if not value:
+                continue
+            wrapped = self.wrap(' '.join(value.split()), self.line_chars - label_width) or ['']
+            lines.append((f"{label}:".ljust(label_width), wrapped[0]))
+            lines.extend((' ' * label_width, line) for line in wrapped[1:])
+        lines.append(('', '-' * self.line_chars))
+        lines.append(('', ''))
+        lines.extend(('', line) for line in self.wrap(self.get_body_text(msg), self.line_chars))
+        return lines
+
+    def render(self, msg, output_pdf: Path) -> int:
+        """Render a message to output_pdf and return its page count."""
+        lines = self.layout(msg)
+        can = canvas.Canvas(str(output_pdf), pagesize=letter, pageCompression=1)
+        top = self.page_height - EMAIL_MARGIN - pdfmetrics.getAscent(EMAIL_FONT, EMAIL_FONT_SIZE)
+        pages = 0
+        for start in range(0, len(lines), self.page_lines):
+            text = can.beginText(EMAIL_MARGIN, top)
+            text.setLeading(EMAIL_LEADING)
+            for label, line in lines[start:start + self.page_lines]:
+                if label.strip():
+                    text.setFont(EMAIL_FONT + '-Bold', EMAIL_FONT_SIZE)
+                    text.textOut(label)
+                    text.setFont(EMAIL_FONT, EMAIL_FONT_SIZE)
+                    text.textLine(line)
+                else:
+                    text.setFont(EMAIL_FONT, EMAIL_FONT_SIZE)
+                    text.textLine(label + line)
+            can.drawText(text)
+            can.showPage()
+            pages += 1
+        can.save()
+        return pages
+
+class StampOverlayCache:
+    """Cache of rendered Bates stamp overlays keyed by page geometry.
+
+    The stamp is drawn with reportlab once for each distinct combination of page
+    size, stamp settings and text width. Every later page with the same geometry
+    reuses the cached content stream with only the Bates text substituted, so no
+    canvas is built and no overlay PDF is parsed per page.
+    """
+
+    def __init__(self, processor: 'EnhancedBatesNumbering'):
+        self.processor = processor
+        self.templates = {}
+        self.hits = 0
+        self.misses = 0
+        self._writer = None
+        self._save_state_ref = None
+
+    def get_key(self, width: float, height: float, page_bates: str) -> tuple:
+        """Build the cache key for a page size and Bates text."""
+        p = self.processor
+        # Text width decides where the stamp lands, so numbers of equal width share a template
+        text_width = pdfmetrics.stringWidth(page_bates, "Helvetica-Bold", 10)
+        return (round(width, 3), round(height, 3), p.stamp_position, p.stamp_color,
+                p.stamp_opacity, p.stamp_box_width, p.stamp_x_offset, p.stamp_y_offset,
+                round(text_width, 3))
+
+    def get_template(self, width: float, height: float, page_bates: str):
+        """Return the cached overlay template for this geometry, rendering it on first use."""
+        key = self.get_key(width, height, page_bates)
+        if key in self.templates:
+            self.hits += 1
+            return self.templates[key]
+        
+        self.misses += 1
+        template = None
+        try:
+            overlay_page = self.processor.render_stamp_overlay(width, height, page_bates).pages[0]
+            content = overlay_page.get_contents().get_data()
+            resources = overlay_page['/Resources'].get_object()
+            
+            # Give the overlay resources names that cannot clash with the page's own
+            resource_dicts = {}
+            for res_type in ('/Font', '/ExtGState'):
+                if res_type not in resources:
+                    continue
+                renamed = {}
+                for name, value in resources[res_type].get_object().items():
+                    new_name = f"/Bates{name[1:]}"
+                    content = re.sub(re.escape(name).encode() + rb'(?=[\s/\[\]()<>{}%])',
+                                     new_name.encode(), content)
+                    renamed[NameObject(new_name)] = value.get_object()
+                resource_dicts[res_type] = renamed
+            
+            placeholder = self.encode_text(page_bates)
+            # Only cache templates where the text can be substituted unambiguously
+            if placeholder is not None and content.count(placeholder) == 1:
+                template = {
+                    'content': content,
+                    'placeholder': placeholder,
+                    'resources': resource_dicts,
+                }
+        except Exception as e:
+            self.processor.logger.debug(f"Could not build stamp overlay template for {key}: {str(e)}")
+        
+        self.templates[key] = template
+        return template
+
+    @staticmethod
+    def encode_text(text: str):
+        """Encode Bates text the way reportlab writes it into a content stream."""
+        try:
+            return b'(' + escapePDF(text).encode('cp1252') + b')'
+        except UnicodeEncodeError:
+            return None
+
+    def stamp(self, writer: PdfWriter, page, width: float, height: float, page_bates: str) -> bool:
+        """Add page to writer with the cached stamp applied.
+
+        Returns False without touching the writer when no template is available,
+        so the caller can fall back to rendering the overlay for this page.
+        """
+        template = self.get_template(width, height, page_bates)
+        if template is None:
+            return False
+        text = self.encode_text(page_bates)
+        if text is None:
+            return False
+        
+        stamp_stream = DecodedStreamObject()
+        stamp_stream.set_data(b'Q\n' + template['content'].replace(template['placeholder'], text))
+        
+        written = writer.add_page(page)
+        
+        # Isolate the original content's graphics state from the stamp
+        if self._writer is not writer:
+            save_state = DecodedStreamObject()
+            save_state.set_data(b'q\n')
+            self._save_state_ref = writer._add_object(save_state)
+            self._writer = writer
+        
+        contents = ArrayObject([self._save_state_ref])
+        if '/Contents' in written:
+            original = written.raw_get('/Contents')
+            if isinstance(original.get_object(), ArrayObject):
+                contents.extend(original.get_object())
+            else:
+                contents.append(original)
+        contents.append(writer._add_object(stamp_stream))
+        written[NameObject('/Contents')] = contents
+        
+        # Copy the resource dictionaries so pages sharing them are not modified
+        resources = DictionaryObject(written['/Resources'].get_object()) if '/Resources' in written else DictionaryObject()
+        for res_type, entries in template['resources'].items():
+            merged = DictionaryObject(resources[res_type].get_object()) if res_type in resources else DictionaryObject()
+            merged.update(entries)
+            resources[NameObject(res_type)] = merged
+        written[NameObject('/Resources')] = resources
+        return True
 
 class EnhancedBatesNumbering:
     def __init__(self, input_dir: str, output_dir: str, prefix: str = '', 
                  zero_pad_length: int = 6, start: int = 1, is_single_file: bool = False,
                  stamp_x: float = 0.97, stamp_y: float = 0.001, stamp_color: str = "black", 
                  stamp_box_width: float = 0.0, stamp_position: str = "bottom-right",
-                 stamp_x_offset: int = 0, stamp_y_offset: int = 0, stamp_opacity: int = 100):
+                 stamp_x_offset: int = 0, stamp_y_offset: int = 0, stamp_opacity: int = 100,
+                 workers: int = 1, timestamp_output: bool = True, previous_output_dir: str = None,
+                 volume_max_pages: int = None, volume_max_bytes: int = COMBINED_VOLUME_MAX_MB * 1024 * 1024,
+                 extract_dates: bool = True, office_instances: int = None,
+                 conversion_timeout: int = 300, batch_conversion: bool = False,
+                 conversion_cache_dir: str = None, conversion_cache_max_bytes: int = 2 * 1024 ** 3,
+                 table_theme: Dict = None, image_max_dpi: int = 300,
+                 conversion_memory_mb: int = 2048, isolate_conversions: bool = True, profile: bool = False):
         self.input_dir = Path(input_dir)
         self.is_single_file = is_single_file
         
-        if is_single_file:
-            # For single files, use the output directory directly
+        if is_single_file or not timestamp_output:
+            # For single files and existing productions, use the output directory directly
             self.output_dir = Path(output_dir)
         else:
             # For directories, create timestamped output directory
@@ -83,6 +1500,90 @@ class EnhancedBatesNumbering:
         self.stamp_y_offset = stamp_y_offset
         self.stamp_opacity = stamp_opacity / 100.0  # Convert to 0-1 range
         
+        # Stamp overlays are rendered once per page geometry and reused
+        self.overlay_cache = StampOverlayCache(self)
+        
+        # Page counts shared by planning, reporting and the combined PDF
+        self.page_index = PdfPageIndex()
+        
+        # Document dates for the report, read from PDFs whose name has none
+        self.extract_dates = extract_dates
+        self.date_extractor = DateExtractor()
+        
+        # Number of worker processes used for conversion and stamping
+        self.workers = max(1, workers)
+        
+        # Office documents are converted on warm LibreOffice instances while planning
+        self.office_instances = max(1, office_instances or self.workers)
+        self.conversion_timeout = conversion_timeout
+        
+        # In-process conversions run in a forked child per thread that is killed
+        # past the timeout or the memory limit (in MB, 0 for none)
+        self.isolate_conversions = isolate_conversions and hasattr(os, 'fork')
+        self.conversion_memory_mb = conversion_memory_mb
+        self.sandbox_local = threading.local()
+        self.sandbox_lock = threading.Lock()
+        self.sandboxes = []
+        self.office_pool = None
+        
+        # In batch mode office documents are converted many per soffice call instead;
+        # PDFs converted ahead of prepare_file (or found in the cache) are kept here by plan index
+        self.batch_conversion = batch_conversion
+        self.staged_conversions = {}
+        
+        # Images scanned at a higher resolution than this are downsampled on their page
+        self.image_max_dpi = image_max_dpi
+        
+        # Front ends watch a run through listeners, called with every ProductionEvent,
+        # and stop it with cancel() after the file being committed
+        self.listeners = []
+        self.cancel_event = threading.Event()
+        self.cancelled = False
+        
+        # Email messages are rendered here; their attachments are produced right after them
+        self.email_renderer = EmailRenderer()
+        
+        # Overrides of DEFAULT_TABLE_THEME for converted spreadsheets and CSV files
+        self.table_theme = table_theme or {}
+        
+        # Converted PDFs are kept across files and runs, keyed by source content
+        self.conversion_cache = (ConversionCache(conversion_cache_dir, conversion_cache_max_bytes)
+                                 if conversion_cache_dir else None)
+        
+        # Combined PDF is split into volumes past these limits (0 or None for no limit)
+        self.volume_max_pages = volume_max_pages or None
+        self.volume_max_bytes = volume_max_bytes or None
+        
+        # One record per stamped file, in Bates order, filled in by process_files
+        self.production_records = []
+        
+        # Bytes read and written by copying and stamping, for the I/O summary
+        self.bytes_read = 0
+        self.bytes_written = 0
+        
+        # Seconds spent in each step of copying and stamping, kept per process like the byte counts;
+        # the main process gathers them with phase timings into run_metrics.json
+        self.step_seconds = {}
+        self.metrics = RunMetrics()
+        # Profile the main process with cProfile during run()
+        self.profile = profile
+        
+        # Converted PDFs wait here until their Bates range is known
+        self.staging_dir = self.output_dir / "_staging"
+        # Emails and mailboxes whose attachments or messages were extracted into
+        # each staging folder, by folder name, so a resumed run can extract them again
+        self.extraction_sources = {}
+        self.log_file = None
+        
+        # Set when executing a previously written production manifest
+        self.manifest_path = None
+        
+        # Completed files are journaled here so interrupted runs can resume
+        self.checkpoint_path = self.output_dir / CHECKPOINT_FILENAME
+        
+        # Earlier production whose unchanged outputs are reused (incremental mode)
+        self.previous_output_dir = Path(previous_output_dir) if previous_output_dir else None
+        
         # Only create issues directory for directory processing
         if not is_single_file:
             self.issues_dir = self.output_dir / "_FILES WITH ISSUES"
@@ -114,9 +1615,47 @@ class EnhancedBatesNumbering:
         
         self.setup_logging()
         
+        if self.isolate_conversions and self.conversion_memory_mb and not ConversionSandbox.can_limit_memory():
+            self.logger.warning(f"The conversion memory limit of {self.conversion_memory_mb} MB is not enforced on "
+                                f"{platform.system()}; conversions are only stopped after "
+                                f"{self.conversion_timeout} seconds")
+        
         # Check for required dependencies
         self.check_dependencies()
         
+    def __getstate__(self):
+        """Drop per-process caches and parent-only state when the processor is sent to a worker process.
+        
+        Records, timings and planning results grow with the production and are
+        only read in the parent; a worker that needs a staged PDF gets it with
+        its task.
+        """
+        state = self.__dict__.copy()
+        state['production_records'] = []
+        state['step_seconds'] = {}
+        state['staged_conversions'] = {}
+        state['extraction_sources'] = {}
+        state['overlay_cache'] = None
+        state['page_index'] = None
+        state['date_extractor'] = None
+        state['office_pool'] = None
+        state['sandbox_local'] = None
+        state['sandbox_lock'] = None
+        state['sandboxes'] = []
+        state['listeners'] = []
+        state['cancel_event'] = None
+        state['metrics'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.sandbox_local = threading.local()
+        self.sandbox_lock = threading.Lock()
+        self.cancel_event = threading.Event()
+        self.overlay_cache = StampOverlayCache(self)
+        self.page_index = PdfPageIndex()
+        self.date_extractor = DateExtractor()
+
     def check_dependencies(self):
         """Check and install required dependencies."""
         try:
@@ -141,16 +1680,22 @@ class EnhancedBatesNumbering:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             log_filename = f"BATES_{self.prefix}_{timestamp}_processing.log"
             log_file = self.output_dir / log_filename
+            self.log_file = log_file
             
             logging.basicConfig(
                 level=logging.INFO,
                 format='%(asctime)s - %(levelname)s - %(message)s',
-                handlers=[
-                    logging.FileHandler(log_file),
-                    logging.StreamHandler()
-                ]
+                handlers=[logging.StreamHandler()]
             )
-            self.logger = logging.getLogger(__name__)
+            # Each production writes its log file through a logger of its own, so productions
+            # run one after another or side by side in one process keep separate logs
+            self.logger = logging.getLogger(f"{__name__}.{self.output_dir.name}")
+            for handler in list(self.logger.handlers):
+                self.logger.removeHandler(handler)
+                handler.close()
+            file_handler = logging.FileHandler(log_file)
+            file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+            self.logger.addHandler(file_handler)
             self.logger.info(f"Logging initialized with prefix: {self.prefix}")
         else:
             # For single file processing, just use basic console logging
@@ -164,141 +1709,17 @@ class EnhancedBatesNumbering:
     def extract_date_from_pdf(self, pdf_path: Path) -> Tuple[datetime, datetime]:
         """Extract the first date found in the PDF content and return both extracted and creation dates."""
         creation_date = datetime.fromtimestamp(pdf_path.stat().st_ctime)
-        extracted_date = None
-        
-        try:
-            # First try to get metadata date
-            try:
-                with open(pdf_path, 'rb') as file:
-                    reader = PyPDF4.PdfFileReader(file)
-                    if reader.getDocumentInfo():
-                        # Try various metadata fields that might contain dates
-                        metadata = reader.getDocumentInfo()
-                        date_fields = [
-                            '/CreationDate',
-                            '/ModDate',
-                            '/Date',
-                            '/LastModified',
-                            '/LastPrinted'
-                        ]
-                        
-                        for field in date_fields:
-                            if field in metadata:
-                                date_str = metadata[field]
-                                # Clean up PDF date format (e.g., "D:20231115123456-06'00'")
-                                date_str = re.sub(r"D:|'00'", "", date_str)
-                                try:
-                                    # Try parsing the date string
-                                    extracted_date = datetime.strptime(date_str[:8], '%Y%m%d')
-                                    if extracted_date and extracted_date <= datetime.now():
-                                        self.logger.info(f"Found date in metadata for {pdf_path}: {extracted_date}")
-                                        return extracted_date, creation_date
-                                except ValueError:
-                                    continue
-            except Exception as e:
-                self.logger.debug(f"Could not read metadata from {pdf_path}: {str(e)}")
-            
-            # If no metadata date, try content extraction
-            try:
-                with open(pdf_path, 'rb') as file:
-                    reader = PyPDF4.PdfFileReader(file)
-                    # Look through first few pages for dates
-                    for page_num in range(min(3, reader.getNumPages())):
-                        try:
-                            page = reader.getPage(page_num)
-                            text = page.extractText()
-                            
-                            # Common date patterns
-                            date_patterns = [
-                                # Standard numeric formats
-                                r'\d{1,2}[-/]\d{1,2}[-/]\d{2,4}',  # MM/DD/YYYY
-                                r'\d{4}[-/]\d{1,2}[-/]\d{1,2}',    # YYYY/MM/DD
-                                
-                                # Month names and abbreviations
-                                r'\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{2,4}',
-                                r'\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{2,4}',
-                                
-                                # Month names with optional day
-                                r'(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{2,4}',
-                                r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s+\d{2,4}',
-                                
-                                # ISO format
-                                r'\d{4}-\d{2}-\d{2}',
-                                
-                                # European format
-                                r'\d{1,2}\.\d{1,2}\.\d{2,4}',
-                                
-                                # Military format
-                                r'\d{2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}',
-                                
-                                # With optional time
-                                r'\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\s+\d{1,2}:\d{2}(?::\d{2})?\s*(?:AM|PM)?',
-                                
-                                # With optional timezone
-                                r'\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\s+\d{1,2}:\d{2}(?::\d{2})?\s*(?:AM|PM)?\s*(?:EST|CST|MST|PST|UTC|GMT)?',
-                                
-                                # Additional patterns
-                                r'\d{4}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2}',
-                                r'\d{4}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2}',
-                                r'(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}',
-                                r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s+\d{4}'
-                            ]
-                            
-                            for pattern in date_patterns:
-                                matches = re.findall(pattern, text, re.IGNORECASE)
-                                if matches:
-                                    try:
-                                        # Clean up the date string
-                                        date_str = matches[0].strip()
-                                        
-                                        # Handle various separators
-                                        date_str = re.sub(r'[/.]', '-', date_str)
-                                        
-                                        # Handle month names
-                                        month_map = {
-                                            'jan': '01', 'feb': '02', 'mar': '03', 'apr': '04',
-                                            'may': '05', 'jun': '06', 'jul': '07', 'aug': '08',
-                                            'sep': '09', 'oct': '10', 'nov': '11', 'dec': '12'
-                                        }
-                                        
-                                        # Try to parse the date string
-                                        try:
-                                            # First try direct parsing
-                                            extracted_date = datetime.strptime(date_str.split()[0], '%Y-%m-%d')
-                                        except ValueError:
-                                            # Try parsing with month names
-                                            parts = date_str.split()
-                                            if len(parts) >= 3:
-                                                month = parts[1][:3].lower()
-                                                if month in month_map:
-                                                    # Reconstruct date string with numeric month
-                                                    date_str = f"{parts[2]}-{month_map[month]}-{parts[0].zfill(2)}"
-                                                    extracted_date = datetime.strptime(date_str, '%Y-%m-%d')
-                                        
-                                        if extracted_date:
-                                            # Validate reasonable date range (e.g., not in the future)
-                                            if extracted_date > datetime.now():
-                                                self.logger.warning(f"Found future date in {pdf_path}: {extracted_date}")
-                                                continue
-                                            self.logger.info(f"Found date in content for {pdf_path}: {extracted_date}")
-                                            return extracted_date, creation_date
-                                            
-                                    except ValueError as e:
-                                        self.logger.debug(f"Could not parse date '{date_str}' from {pdf_path}: {str(e)}")
-                                        continue
-                        except Exception as e:
-                            self.logger.debug(f"Error processing page {page_num} of {pdf_path}: {str(e)}")
-                            continue
-                            
-            except Exception as e:
-                self.logger.warning(f"Could not extract date from {pdf_path}: {str(e)}")
-                
-        except Exception as e:
-            self.logger.warning(f"Error processing {pdf_path}: {str(e)}")
-        
-        # If we get here, we couldn't find a valid date
-        self.logger.info(f"No valid date found in {pdf_path}, using creation date: {creation_date}")
-        return None, creation_date
+        extracted_date = self.date_extractor.extract(pdf_path)
+        if extracted_date is None:
+            self.logger.info(f"No valid date found in {pdf_path}, using creation date: {creation_date}")
+        return extracted_date, creation_date
+
+    def extract_document_date(self, entry: Dict, pdf_path: Path) -> str:
+        """Return the ISO date of a planned file, from its name or else its PDF."""
+        extracted_date = self.extract_date_from_filename(entry['source'].name)
+        if extracted_date is None and self.extract_dates and pdf_path is not None:
+            extracted_date = self.date_extractor.extract(pdf_path, use_metadata=entry['is_pdf'])
+        return extracted_date.strftime('%Y-%m-%d') if extracted_date else None
 
     def generate_description(self, file_path: Path) -> str:
         """Generate description based on folder and file names."""
@@ -315,51 +1736,24 @@ class EnhancedBatesNumbering:
             # Create output PDF path
             output_pdf = output_dir / f"{input_path.stem}.pdf"
             
-            # Handle .eml files specifically
-            if input_path.suffix.lower() == '.eml':
+            # Render email messages in-process; attachments are planned separately
+            if input_path.suffix.lower() in EMAIL_SUFFIXES:
                 try:
-                    with open(input_path, 'rb') as f:
-                        msg = BytesParser(policy=policy.default).parse(f)
-                    
-                    # Create PDF
-                    pdf = FPDF()
-                    pdf.add_page()
-                    
-                    # Set font and size
-                    pdf.set_font('Helvetica', '', 10)
-                    
-                    # Set margins
-                    pdf.set_margins(15, 15, 15)
-                    
-                    # Get content and split into lines
-                    content = self.extract_email_content(msg)
-                    lines = content.split('\n')
-                    
-                    # Add content to PDF
-                    for line in lines:
-                        # Handle long lines by wrapping
-                        if len(line) > 100:
-                            words = line.split()
-                            current_line = ""
-                            for word in words:
-                                if len(current_line) + len(word) + 1 <= 100:
-                                    current_line += " " + word if current_line else word
-                                else:
-                                    pdf.multi_cell(0, 5, current_line)
-                                    current_line = word
-                            if current_line:
-                                pdf.multi_cell(0, 5, current_line)
-                        else:
-                            pdf.multi_cell(0, 5, line)
-                    
-                    # Save PDF
-                    pdf.output(str(output_pdf))
+                    self.email_renderer.render(self.email_renderer.parse(input_path), output_pdf)
                     return output_pdf
-                    
                 except Exception as e:
-                    self.logger.error(f"Error converting .eml file {input_path} to PDF: {str(e)}")
+                    self.logger.error(f"Error converting email {input_path} to PDF: {str(e)}")
                     return None
 
+            # Handle images in-process
+            elif input_path.suffix.lower() in IMAGE_SUFFIXES:
+                try:
+                    self.convert_image_to_pdf(input_path, output_pdf)
+                    return output_pdf
+                except Exception as e:
+                    self.logger.error(f"Error converting image {input_path} to PDF: {str(e)}")
+                    return None
+            
             # Handle Excel files and CSV files with improved formatting
             elif input_path.suffix.lower() in ['.xlsx', '.xls', '.xlsm', '.xlsb', '.csv']:
                 try:
@@ -367,267 +1761,14 @@ class EnhancedBatesNumbering:
                     
                     # Get data based on file type
                     if input_path.suffix.lower() == '.csv':
-                        # Read CSV file
-                        data = []
-                        max_cols = 0
-                        with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            reader = csv.reader(f)
-                            # First pass: find the maximum number of columns
-                            for row in reader:
-                                max_cols = max(max_cols, len(row))
-                                
-                        # Second pass: pad rows to match max columns
-                        with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            reader = csv.reader(f)
-                            for row in reader:
-                                # Pad row with empty strings if needed
-                                padded_row = row + [''] * (max_cols - len(row))
-                                data.append(padded_row)
-                                
-                        if not data or max_cols == 0:
-                            self.logger.warning(f"No data found in CSV file: {input_path}")
-                            return None
-                            
-                        sheets = [{'title': input_path.stem, 'data': data}]
+                        # Rows are read lazily while the pages are laid out
+                        sheets = [{'title': input_path.stem, 'rows': self.iter_csv_rows(input_path)}]
                     else:  # Excel files
-                        if input_path.suffix.lower() in ['.xlsx', '.xlsm', '.xlsb']:
-                            wb = load_workbook(input_path, data_only=True)
-                            sheets = []
-                            for sheet in wb.worksheets:
-                                sheet_data = []
-                                max_row = sheet.max_row
-                                max_col = sheet.max_column
-                                
-                                # Find last non-empty row and column
-                                last_row = 0
-                                last_col = 0
-                                for row in range(1, max_row + 1):
-                                    for col in range(1, max_col + 1):
-                                        cell = sheet.cell(row=row, column=col)
-                                        if cell.value is not None and str(cell.value).strip():
-                                            last_row = max(last_row, row)
-                                            last_col = max(last_col, col)
-                                
-                                # Only process if we found non-empty cells
-                                if last_row > 0 and last_col > 0:
-                                    for row in range(1, last_row + 1):
-                                        row_data = []
-                                        for col in range(1, last_col + 1):
-                                            cell = sheet.cell(row=row, column=col)
-                                            value = cell.value if cell.value is not None else ''
-                                            row_data.append(str(value))
-                                        sheet_data.append(row_data)
-                                    sheets.append({'title': sheet.title, 'data': sheet_data})
-                        else:  # .xls files
-                            wb = xlrd.open_workbook(input_path)
-                            sheets = []
-                            for sheet_idx in range(wb.nsheets):
-                                sheet = wb.sheet_by_index(sheet_idx)
-                                sheet_data = []
-                                # Find last non-empty row and column
-                                last_row = 0
-                                last_col = 0
-                                for row in range(sheet.nrows):
-                                    for col in range(sheet.ncols):
-                                        value = sheet.cell_value(row, col)
-                                        if value is not None and str(value).strip():
-                                            last_row = max(last_row, row)
-                                            last_col = max(last_col, col)
-                                
-                                # Only process if we found non-empty cells
-                                if last_row > 0 and last_col > 0:
-                                    sheet_data = [[str(sheet.cell_value(r, c)) for c in range(last_col + 1)] 
-                                                for r in range(last_row + 1)]
-                                    sheets.append({'title': sheet.name, 'data': sheet_data})
-                    
-                    # Create PDF with landscape orientation and adjusted margins
-                    doc = SimpleDocTemplate(
-                        str(output_pdf),
-                        pagesize=landscape(A4),  # Use A4 for more space
-                        leftMargin=0.25*inch,
-                        rightMargin=0.25*inch,
-                        topMargin=0.25*inch,
-                        bottomMargin=0.25*inch
-                    )
-                    
-                    elements = []
-                    styles = getSampleStyleSheet()
-                    
-                    # Create custom styles
-                    title_style = ParagraphStyle(
-                        'CustomTitle',
-                        parent=styles['Heading1'],
-                        fontSize=12,  # Slightly smaller title
-                        spaceAfter=10,
-                        alignment=1,
-                        textColor=colors.black
-                    )
+                        # Sheets and their rows are streamed straight into the renderer
+                        sheets = self.iter_workbook_sheets(input_path)
                     
-                    header_style = ParagraphStyle(
-                        'HeaderStyle',
-                        parent=styles['Normal'],
-                        fontSize=9,  # Slightly smaller header
-                        leading=10,
-                        alignment=1,
-                        textColor=colors.white,
-                        fontName='Helvetica-Bold'
-                    )
-                    
-                    cell_style = ParagraphStyle(
-                        'CellStyle',
-                        parent=styles['Normal'],
-                        fontSize=8,  # Slightly smaller cell text
-                        leading=9,
-                        alignment=0,
-                        textColor=colors.black,
-                        fontName='Helvetica'
-                    )
-                    
-                    # Process each sheet/data set
-                    for sheet in sheets:
-                        if not sheet['data']:
-                            continue
-                            
-                        self.logger.info(f"Processing sheet: {sheet['title']}")
-                        data = sheet['data']
-                        
-                        if data:
-                            # Add sheet title (except for single CSV files)
-                            if input_path.suffix.lower() != '.csv':
-                                elements.append(Paragraph(sheet['title'], title_style))
-                                elements.append(Spacer(1, 5))
-                            
-                            # Calculate optimal column widths
-                            available_width = doc.width * 0.95
-                            col_widths = []
-                            min_col_width = 0.4 * inch  # Reduced minimum width
-                            max_col_width = 1.5 * inch  # Reduced maximum width
-                            
-                            # First pass: calculate ideal widths
-                            for col in range(len(data[0])):
-                                max_width = 0
-                                for row in data:
-                                    if col < len(row):
-                                        cell_text = str(row[col])
-                                        # Calculate width based on content
-                                        words = cell_text.split()
-                                        if words:
-                                            max_word_len = max(len(word) for word in words)
-                                            total_len = len(cell_text)
-                                            width = max(max_word_len * 0.12, (total_len * 0.1) / 2)
-                                        else:
-                                            width = len(cell_text) * 0.1
-                                        max_width = max(max_width, width)
-                                col_width = max(min_col_width, min(max_col_width, max_width * inch))
-                                col_widths.append(col_width)
-                            
-                            # Adjust if total width exceeds available width
-                            total_width = sum(col_widths)
-                            if total_width > available_width:
-                                scale_factor = available_width / total_width
-                                col_widths = [max(min_col_width, w * scale_factor) for w in col_widths]
-                            
-                            # Split data into chunks that fit on a page
-                            max_rows_per_page = 30  # Adjust based on content
-                            data_chunks = [data[i:i + max_rows_per_page] for i in range(0, len(data), max_rows_per_page)]
-                            
-                            for chunk_idx, chunk in enumerate(data_chunks):
-                                # Process data with improved text wrapping
-                                wrapped_data = []
-                                for row_idx, row in enumerate(chunk):
-                                    wrapped_row = []
-                                    for col_idx, cell in enumerate(row):
-                                        cell_text = str(cell).strip()
-                                        
-                                        # Create appropriate style based on row
-                                        style = header_style if (chunk_idx == 0 and row_idx == 0) else cell_style
-                                        
-                                        # Handle special number formatting
-                                        if row_idx > 0 or chunk_idx > 0:  # Don't format headers
-                                            try:
-                                                if cell_text.replace(',', '').replace('.', '').replace('-', '').isdigit():
-                                                    num = float(cell_text.replace(',', ''))
-                                                    cell_text = "{:,.2f}".format(num)
-                                            except:
-                                                pass
-                                        
-                                        # Calculate available width for wrapping
-                                        avail_width = col_widths[col_idx] - 6  # Reduced padding
-                                        
-                                        # Smart word wrapping with max lines
-                                        words = cell_text.split()
-                                        lines = []
-                                        current_line = []
-                                        current_width = 0
-                                        max_lines = 3  # Limit number of lines per cell
-                                        
-                                        for word in words:
-                                            word_width = len(word) * style.fontSize * 0.6
-                                            if current_width + word_width <= avail_width and len(lines) < max_lines:
-                                                current_line.append(word)
-                                                current_width += word_width + style.fontSize * 0.3
-                                            else:
-                                                if current_line:
-                                                    lines.append(' '.join(current_line))
-                                                if len(lines) >= max_lines:
-                                                    break
-                                                current_line = [word]
-                                                current_width = word_width
-                                        
-                                        if current_line and len(lines) < max_lines:
-                                            lines.append(' '.join(current_line))
-                                        
-                                        # Join lines with HTML line breaks
-                                        final_text = '<br/>'.join(lines)
-                                        
-                                        # Create paragraph with appropriate style
-                                        p = Paragraph(final_text, style)
-                                        wrapped_row.append(p)
-                                    
-                                    wrapped_data.append(wrapped_row)
-                                
-                                # Create table with calculated widths
-                                table = Table(wrapped_data, colWidths=col_widths, repeatRows=1)
-                                
-                                # Add style with improved formatting
-                                table.setStyle(TableStyle([
-                                    # Header style
-                                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4F81BD')),
-                                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                                    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                                    ('FONTSIZE', (0, 0), (-1, 0), 9),
-                                    ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-                                    ('TOPPADDING', (0, 0), (-1, 0), 6),
-                                    # Data style
-                                    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                                    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-                                    ('ALIGN', (0, 1), (-1, -1), 'LEFT'),
-                                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                                    ('FONTSIZE', (0, 1), (-1, -1), 8),
-                                    ('TOPPADDING', (0, 1), (-1, -1), 4),
-                                    ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
-                                    ('LEFTPADDING', (0, 0), (-1, -1), 4),
-                                    ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-                                    # Alternate row colors
-                                    *[('BACKGROUND', (0, i), (-1, i), colors.HexColor('#F2F2F2')) 
-                                      for i in range(2, len(wrapped_data), 2)],
-                                    # Grid style
-                                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                                    ('BOX', (0, 0), (-1, -1), 1, colors.black),
-                                    # Word wrap and alignment
-                                    ('WORDWRAP', (0, 0), (-1, -1), True),
-                                    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                                ]))
-                                
-                                elements.append(table)
-                                if chunk_idx < len(data_chunks) - 1:
-                                    elements.append(PageBreak())
-                    
-                    # Only build PDF if there's content
-                    if elements:
-                        self.logger.info(f"Building PDF for {input_path}")
-                        doc.build(elements)
+                    # Add sheet titles (except for single CSV files)
+                    if self.render_table_pdf(sheets, output_pdf, show_titles=input_path.suffix.lower() != '.csv'):
                         self.logger.info(f"Successfully created PDF: {output_pdf}")
                         return output_pdf
                     else:
@@ -639,7 +1780,13 @@ class EnhancedBatesNumbering:
                     self.logger.error(f"Error details: {type(e).__name__}: {str(e)}")
                     return None
 
-            # For other file types, try to convert using unoconv
+            # For other file types, use the warm office instances when they are running
+            elif self.office_pool is not None:
+                if self.office_pool.convert(input_path, output_pdf):
+                    return output_pdf
+                return None
+            
+            # Otherwise try to convert using unoconv
             else:
                 try:
                     if platform.system() == 'Darwin':  # macOS
@@ -653,7 +1800,7 @@ class EnhancedBatesNumbering:
                         cmd = ['unoconv', '-f', 'pdf', '-o', str(output_pdf), str(input_path)]
                     
                     # Run the conversion command
-                    result = subprocess.run(cmd, capture_output=True, text=True)
+                    result = run_command(cmd, timeout=self.conversion_timeout)
                     
                     if result.returncode != 0:
                         self.logger.error(f"Error converting {input_path} to PDF: {result.stderr}")
@@ -661,6 +1808,10 @@ class EnhancedBatesNumbering:
                     
                     return output_pdf
                     
+                except subprocess.TimeoutExpired:
+                    self.logger.error(f"Converting {input_path} to PDF timed out after "
+                                      f"{self.conversion_timeout} seconds")
+                    return None
                 except Exception as e:
                     self.logger.error(f"Error converting {input_path} to PDF: {str(e)}")
                     return None
@@ -669,16 +1820,472 @@ class EnhancedBatesNumbering:
             self.logger.error(f"Error converting {input_path} to PDF: {str(e)}")
             return None
 
-    def add_bates_stamp(self, input_pdf: Path, output_pdf: Path, bates_number: str) -> bool:
-        """Add Bates number stamp to each page of the PDF."""
+    def convert_isolated(self, input_path: Path, output_dir: Path) -> Tuple[Path, str]:
+        """Convert a file with convert_to_pdf, returning (PDF, None) or (None, reason).
+        
+        Files converted in-process go to this thread's ConversionSandbox, so a
+        pathological spreadsheet, image or message is stopped instead of hanging
+        or exhausting the run. Office documents already convert in separate
+        processes with their own timeout.
+        """
+        if not self.isolate_conversions or self.uses_office_engine(input_path):
+            pdf = self.convert_to_pdf(input_path, output_dir)
+            return pdf, None if pdf else "Failed to convert to PDF"
+        
+        sandbox = getattr(self.sandbox_local, 'sandbox', None)
+        if sandbox is None:
+            sandbox = ConversionSandbox(self.convert_to_pdf, self.conversion_timeout, self.conversion_memory_mb,
+                                        logger=self.logger)
+            self.sandbox_local.sandbox = sandbox
+            with self.sandbox_lock:
+                self.sandboxes.append(sandbox)
+        return sandbox.convert(input_path, output_dir)
+
+    def cancel(self):
+        """Ask the running production to stop after the file it is committing.
+        
+        Safe to call from any thread. Files already stamped stay in the
+        checkpoint journal, so the production can be resumed later.
+        """
+        self.cancel_event.set()
+
+    def add_listener(self, listener):
+        """Call listener with every ProductionEvent of this processor's runs."""
+        self.listeners.append(listener)
+
+    def emit(self, kind: str, **fields):
+        """Pass an event to the listeners; costs one check when there are none."""
+        if self.listeners:
+            event = ProductionEvent(kind, fields)
+            for listener in self.listeners:
+                listener(event)
+
+    @contextmanager
+    def timed_phase(self, phase: str):
+        """Emit the start and the end of a phase, with how long it took."""
+        self.emit(EVENT_PHASE_STARTED, phase=phase)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            self.metrics.add_phase(phase, seconds)
+            self.emit(EVENT_PHASE_FINISHED, phase=phase, seconds=round(seconds, 3))
+
+    def add_step_time(self, step: str, started: float):
+        """Add the time since started (from time.perf_counter) to a step of copying and stamping."""
+        self.step_seconds[step] = self.step_seconds.get(step, 0.0) + time.perf_counter() - started
+
+    def close_sandboxes(self):
+        """Stop the conversion sandboxes started by this process."""
+        with self.sandbox_lock:
+            for sandbox in self.sandboxes:
+                sandbox.close()
+            self.sandboxes = []
+        self.sandbox_local = threading.local()
+
+    def convert_batch_to_pdf(self, input_paths: List[Path], output_dir: Path) -> Dict[Path, Path]:
+        """Convert many office documents to PDF with a single LibreOffice call.
+        
+        File stems must be unique within a batch since every PDF lands in
+        output_dir under its source stem. Returns the PDF for each source that
+        converted; the rest are left for per-file conversion.
+        """
+        converted = {}
+        soffice = OfficeConversionPool.find_soffice()
+        if soffice is None or not input_paths:
+            return converted
+        
+        output_dir.mkdir(parents=True, exist_ok=True)
+        # A private profile keeps the call from being handed to an office instance already running
+        profile_dir = Path(tempfile.mkdtemp(prefix="bates_office_batch_"))
+        cmd = [
+            soffice, '--headless', '--invisible', '--nologo', '--norestore', '--nolockcheck',
+            f'-env:UserInstallation={profile_dir.as_uri()}',
+            '--convert-to', 'pdf', '--outdir', str(output_dir),
+            *[str(input_path) for input_path in input_paths]
+        ]
         try:
-            # Try to unlock the PDF if it's locked
+            result = run_command(cmd, timeout=self.conversion_timeout * len(input_paths))
+            if result.returncode != 0:
+                self.logger.error(f"Batch conversion of {len(input_paths)} files failed: {result.stderr}")
+        except subprocess.TimeoutExpired:
+            self.logger.error(f"Batch conversion of {len(input_paths)} files timed out")
+        except Exception as e:
+            self.logger.error(f"Batch conversion of {len(input_paths)} files failed: {str(e)}")
+        finally:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+        
+        # soffice reports per-file failures only on stderr, so check for each output
+        for input_path in input_paths:
+            output_pdf = output_dir / f"{input_path.stem}.pdf"
+            if output_pdf.exists() and output_pdf.stat().st_size > 0:
+                converted[input_path] = output_pdf
+        return converted
+
+    def convert_office_batches(self, tasks: List[Tuple[int, Path]]) -> Dict[int, Path]:
+        """Convert office documents in batches of one file type, moving each PDF to its staging folder.
+        
+        Batches run side by side, up to one per office instance. Returns the
+        staged PDF by plan index for every document that converted.
+        """
+        by_type = {}
+        for index, input_file in tasks:
+            by_type.setdefault(input_file.suffix.lower(), []).append((index, input_file))
+        
+        # Split each type into batches whose stems do not collide
+        batches = []
+        for typed_tasks in by_type.values():
+            pending = typed_tasks
+            while pending:
+                batch, stems, deferred = [], set(), []
+                for index, input_file in pending:
+                    if input_file.stem in stems or len(batch) >= OFFICE_BATCH_SIZE:
+                        deferred.append((index, input_file))
+                    else:
+                        stems.add(input_file.stem)
+                        batch.append((index, input_file))
+                batches.append(batch)
+                pending = deferred
+        
+        def run_batch(numbered_batch):
+            number, batch = numbered_batch
+            batch_dir = self.staging_dir / f"batch_{number}"
+            outputs = self.convert_batch_to_pdf([input_file for _, input_file in batch], batch_dir)
+            staged = {}
+            for index, input_file in batch:
+                if input_file in outputs:
+                    target = self.get_staged_pdf_path(index, input_file)
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(outputs[input_file], target)
+                    staged[index] = target
+                    if self.conversion_cache is not None:
+                        self.conversion_cache.store(
+                            self.conversion_cache.get_key(input_file, self.get_converter_id(input_file)), target)
+            shutil.rmtree(batch_dir, ignore_errors=True)
+            return staged
+        
+        started = time.monotonic()
+        converted = {}
+        with ThreadPoolExecutor(max_workers=min(self.office_instances, len(batches))) as threads:
+            for staged in threads.map(run_batch, enumerate(batches)):
+                converted.update(staged)
+        elapsed = time.monotonic() - started
+        self.logger.info(f"Batch conversion: {len(converted)} of {len(tasks)} office documents in "
+                         f"{len(batches)} batches took {elapsed:.1f} seconds "
+                         f"({elapsed / max(1, len(tasks)):.2f} s per document)")
+        return converted
+
+    def convert_image_to_pdf(self, input_path: Path, output_pdf: Path):
+        """Convert an image to a PDF with one page per frame.
+        
+        Each frame is scaled to fit a letter page in the matching orientation.
+        JPEGs that need no downsampling are embedded as they are, with the EXIF
+        rotation applied by the page transform instead of re-encoding. Other
+        frames are upright-rotated, downsampled to image_max_dpi when larger
+        and compressed by reportlab (photos as JPEG).
+        """
+        can = canvas.Canvas(str(output_pdf), pagesize=letter)
+        with Image.open(input_path) as img:
+            n_frames = getattr(img, 'n_frames', 1)
+            is_photo = img.format == 'JPEG'
+            passthrough = is_photo and n_frames == 1
+            for frame in ImageSequence.Iterator(img):
+                self.draw_image_page(can, frame, is_photo, input_path if passthrough else None)
+                can.showPage()
+        can.save()
+        if n_frames > 1:
+            self.logger.info(f"Converted {n_frames} frames of {input_path}")
+
+    def draw_image_page(self, can, frame: Image.Image, is_photo: bool, jpeg_path: Path = None):
+        """Draw one image frame centered on its own page.
+        
+        jpeg_path is the source file when its compressed data may be embedded
+        unchanged; is_photo re-encodes a modified frame as JPEG instead of Flate.
+        """
+        margin = 0.5 * inch
+        orientation = frame.getexif().get(0x0112, 1)
+        rotation = EXIF_ROTATIONS.get(orientation)
+        width, height = frame.size
+        shown_width, shown_height = (height, width) if rotation in (90, -90) else (width, height)
+        
+        # Landscape images get a landscape page
+        page_size = landscape(letter) if shown_width > shown_height else letter
+        can.setPageSize(page_size)
+        scale = min((page_size[0] - 2 * margin) / shown_width, (page_size[1] - 2 * margin) / shown_height)
+        dpi = 72 / scale
+        
+        if jpeg_path is not None and rotation is not None and frame.mode in ('RGB', 'L') and dpi <= self.image_max_dpi:
+            source = str(jpeg_path)
+        else:
+            image = ImageOps.exif_transpose(frame) if orientation != 1 else frame
+            rotation = 0
+            if dpi > self.image_max_dpi:
+                factor = self.image_max_dpi / dpi
+                image = image.resize((max(1, round(image.width * factor)), max(1, round(image.height * factor))),
+                                     Image.LANCZOS)
+            if image.mode not in ('RGB', 'L', 'RGBA'):
+                image = image.convert('RGBA' if 'transparency' in image.info or 'A' in image.mode else 'RGB')
+            if is_photo and image.mode in ('RGB', 'L'):
+                buffer = io.BytesIO()
+                image.save(buffer, format='JPEG', quality=85)
+                buffer.seek(0)
+                source = ImageReader(buffer)
+            else:
+                source = ImageReader(image)
+            width, height = image.size
+            shown_width, shown_height = width, height
+            scale = min((page_size[0] - 2 * margin) / shown_width, (page_size[1] - 2 * margin) / shown_height)
+        
+        # Rotate about the page center so rotated JPEGs display upright
+        draw_width, draw_height = width * scale, height * scale
+        can.saveState()
+        can.translate(page_size[0] / 2, page_size[1] / 2)
+        if rotation:
+            can.rotate(rotation)
+        can.drawImage(source, -draw_width / 2, -draw_height / 2, draw_width, draw_height, mask='auto')
+        can.restoreState()
+
+    @staticmethod
+    def iter_csv_rows(input_path: Path):
+        """Yield the rows of a CSV file in a single pass."""
+        with open(input_path, 'r', encoding='utf-8', errors='ignore', newline='') as f:
+            for row in csv.reader(f):
+                yield row
+
+    @staticmethod
+    def trim_rows(rows):
+        """Drop trailing empty cells from each row and trailing empty rows, in a single pass.
+        
+        Empty rows between data are kept; they are only held back as a count
+        until the next row with data shows they are not trailing.
+        """
+        empty_rows = 0
+        for row in rows:
+            cells = ['' if value is None else value for value in row]
+            while cells and not str(cells[-1]).strip():
+                cells.pop()
+            if not cells:
+                empty_rows += 1
+                continue
+            for _ in range(empty_rows):
+                yield []
+            empty_rows = 0
+            yield cells
+
+    def iter_workbook_sheets(self, input_path: Path):
+        """Yield each sheet of a workbook as a title and a lazy iterator over its used rows.
+        
+        .xlsx/.xlsm files are opened read-only and streamed with
+        iter_rows(values_only=True); .xls files are loaded one sheet at a time
+        with xlrd. Each sheet's rows must be consumed before the next sheet is
+        requested.
+        """
+        if input_path.suffix.lower() in ['.xlsx', '.xlsm', '.xlsb']:
+            wb = load_workbook(input_path, read_only=True, data_only=True)
             try:
-                # Create a temporary copy of the input PDF to handle secured PDFs
-                temp_pdf = input_pdf.parent / f"temp_{input_pdf.name}"
-                try:
-                    # Try to create an unsecured copy of the PDF
-                    reader = PdfReader(input_pdf)
+                for sheet in wb.worksheets:
+                    # The stored dimensions are only a hint; the used range is found while streaming
+                    if sheet.max_row is not None:
+                        self.logger.info(f"Sheet {sheet.title}: up to {sheet.max_row} rows, {sheet.max_column} columns")
+                    yield {'title': sheet.title, 'rows': self.trim_rows(sheet.iter_rows(values_only=True))}
+            finally:
+                wb.close()
+        else:  # .xls files
+            wb = xlrd.open_workbook(input_path, on_demand=True)
+            try:
+                for sheet_idx in range(wb.nsheets):
+                    sheet = wb.sheet_by_index(sheet_idx)
+                    rows = (sheet.row_values(row, 0, sheet.ncols) for row in range(sheet.nrows))
+                    yield {'title': sheet.name, 'rows': self.trim_rows(rows)}
+                    wb.unload_sheet(sheet_idx)
+            finally:
+                wb.release_resources()
+
+    @staticmethod
+    def estimate_column_widths(sample: List[List], num_cols: int, available_width: float) -> List[float]:
+        """Estimate column widths from a sample of rows."""
+        min_col_width = 0.4 * inch  # Reduced minimum width
+        max_col_width = 1.5 * inch  # Reduced maximum width
+        col_widths = []
+        for col in range(num_cols):
+            max_width = 0
+            for row in sample:
+                if col < len(row):
+                    cell_text = str(row[col])
+                    # Calculate width based on content
+                    words = cell_text.split()
+                    if words:
+                        max_word_len = max(len(word) for word in words)
+                        width = max(max_word_len * 0.12, (len(cell_text) * 0.1) / 2)
+                    else:
+                        width = len(cell_text) * 0.1
+                    max_width = max(max_width, width)
+            col_widths.append(max(min_col_width, min(max_col_width, max_width * inch)))
+        
+        # Adjust if total width exceeds available width
+        total_width = sum(col_widths)
+        if total_width > available_width:
+            scale_factor = available_width / total_width
+            col_widths = [max(min_col_width, w * scale_factor) for w in col_widths]
+        return col_widths
+
+    def render_table_pdf(self, sheets: List[Dict], output_pdf: Path, show_titles: bool = True) -> bool:
+        """Lay out sheets of rows as tables and write them to a PDF page by page.
+        
+        Each sheet's rows may be a lazy iterator. Column widths are estimated
+        from the first TABLE_SAMPLE_ROWS rows, so every row is read once, and
+        rows are drawn as they arrive. Rows wider than the sample fold their
+        extra cells into the last column. Returns False if there was nothing
+        to draw.
+        """
+        temp_pdf = output_pdf.with_name(f"{output_pdf.stem}.rendering.pdf")
+        renderer = TableRenderer(temp_pdf, self.table_theme)
+        
+        for sheet in sheets:
+            rows = iter(sheet['rows'])
+            sample = list(islice(rows, TABLE_SAMPLE_ROWS))
+            num_cols = max((len(row) for row in sample), default=0)
+            if num_cols == 0:
+                continue
+            
+            self.logger.info(f"Processing sheet: {sheet['title']}")
+            col_widths = self.estimate_column_widths(sample, num_cols, renderer.available_width)
+            renderer.start_sheet(sheet['title'] if show_titles else None, col_widths,
+                                 self.fit_row(sample[0], num_cols))
+            
+            overflow_rows = 0
+            for row in chain(sample[1:], rows):
+                if len(row) > num_cols:
+                    overflow_rows += 1
+                renderer.add_row(self.fit_row(row, num_cols))
+            renderer.end_sheet()
+            if overflow_rows:
+                self.logger.warning(f"{overflow_rows} rows of {sheet['title']} had more than {num_cols} "
+                                    f"columns; extra cells were joined into the last column")
+        
+        if not renderer.finish():
+            return False
+        os.replace(temp_pdf, output_pdf)
+        return True
+
+    @staticmethod
+    def fit_row(row: List, num_cols: int) -> List:
+        """Pad a row to num_cols cells, joining any extra cells into the last one."""
+        if len(row) > num_cols:
+            return list(row[:num_cols - 1]) + [' | '.join(str(cell) for cell in row[num_cols - 1:])]
+        return list(row) + [''] * (num_cols - len(row))
+
+    def get_stamp_fill_color(self):
+        """Return the reportlab color for the configured stamp color."""
+        if self.stamp_color == "red":
+            return colors.red
+        elif self.stamp_color == "blue":
+            return colors.blue
+        elif self.stamp_color == "green":
+            return colors.green
+        elif self.stamp_color == "gray":
+            return colors.gray
+        return black
+
+    def render_stamp_overlay(self, width: float, height: float, page_bates: str) -> PdfReader:
+        """Render the Bates stamp for one page size into a single-page overlay PDF."""
+        packet = io.BytesIO()
+        can = canvas.Canvas(packet, pagesize=(width, height), pageCompression=0)
+        can.setFont("Helvetica-Bold", 10)
+        
+        # Apply color and opacity
+        fill_color = self.get_stamp_fill_color()
+        can.setFillColor(fill_color, alpha=self.stamp_opacity)
+        
+        # Calculate text dimensions
+        text_width = can.stringWidth(page_bates, "Helvetica-Bold", 10)
+        text_height = 10
+        
+        # Set default margins
+        margin = 10
+        
+        # Calculate position based on grid selection
+        if "top" in self.stamp_position:
+            y = height - margin - text_height
+        elif "middle" in self.stamp_position:
+            y = height / 2
+        else:  # bottom
+            y = margin + text_height
+        
+        if "left" in self.stamp_position:
+            x = margin + text_width
+        elif "center" in self.stamp_position:
+            x = width / 2
+        else:  # right
+            x = width - margin
+        
+        # Apply offsets
+        x += self.stamp_x_offset
+        y += self.stamp_y_offset
+        
+        # Draw box if width > 0
+        if self.stamp_box_width > 0:
+            # Calculate box dimensions based on position
+            box_padding = 2
+            box_width = text_width + (box_padding * 2)
+            box_height = text_height + (box_padding * 2)
+            
+            if "left" in self.stamp_position:
+                box_x = x - text_width - box_padding
+            elif "center" in self.stamp_position:
+                box_x = x - (box_width / 2)
+            else:  # right
+                box_x = x - text_width - box_padding
+            
+            if "top" in self.stamp_position:
+                box_y = y - text_height - box_padding
+            elif "middle" in self.stamp_position:
+                box_y = y - (box_height / 2)
+            else:  # bottom
+                box_y = y - box_padding
+            
+            # Draw rectangle around text
+            can.setStrokeColor(fill_color, alpha=self.stamp_opacity)
+            can.setLineWidth(self.stamp_box_width)
+            can.rect(box_x, box_y, box_width, box_height)
+            
+            # Draw text based on position
+            if "left" in self.stamp_position:
+                can.drawString(box_x + box_padding, box_y + box_padding, page_bates)
+            elif "center" in self.stamp_position:
+                can.drawCentredString(x, box_y + box_padding, page_bates)
+            else:  # right
+                can.drawRightString(box_x + box_width - box_padding, box_y + box_padding, page_bates)
+        else:
+            # Draw text without box
+            if "left" in self.stamp_position:
+                can.drawString(x - text_width, y, page_bates)
+            elif "center" in self.stamp_position:
+                can.drawCentredString(x, y, page_bates)
+            else:  # right
+                can.drawRightString(x, y, page_bates)
+        
+        can.save()
+        packet.seek(0)
+        return PdfReader(packet)
+
+    def add_bates_stamp(self, input_pdf: Path, output_pdf: Path, bates_number: str,
+                        start_number: int = None) -> bool:
+        """Add Bates number stamp to each page of the PDF.
+        
+        Pages are numbered consecutively from start_number, which defaults to the
+        processor's current number when no range has been pre-assigned."""
+        try:
+            # Read the source once; only encrypted documents need an unsecured copy
+            try:
+                reader = PdfReader(input_pdf)
+                self.bytes_read += input_pdf.stat().st_size
+                if reader.is_encrypted:
+                    unlock_started = time.perf_counter()
+                    # Create the unsecured copy beside the output, never in the source tree
+                    output_pdf.parent.mkdir(parents=True, exist_ok=True)
+                    temp_pdf = output_pdf.parent / f"temp_{input_pdf.name}"
                     writer = PdfWriter()
                     
                     # Copy all pages to remove security
@@ -688,11 +2295,15 @@ class EnhancedBatesNumbering:
                     # Write unsecured temporary PDF
                     with open(temp_pdf, 'wb') as temp_file:
                         writer.write(temp_file)
+                    self.bytes_written += temp_pdf.stat().st_size
                     
                     # Now use the unsecured PDF for stamping
                     reader = PdfReader(temp_pdf)
-                except Exception as e:
-                    self.logger.warning(f"Could not unlock PDF {input_pdf}, trying to print to PDF: {str(e)}")
+                    self.bytes_read += temp_pdf.stat().st_size
+                    self.add_step_time('unlock', unlock_started)
+            except Exception as e:
+                self.logger.warning(f"Could not unlock PDF {input_pdf}, trying to print to PDF: {str(e)}")
+                try:
                     # If unlocking fails, try to print to PDF
                     if platform.system() == 'Darwin':  # macOS
                         cmd = [
@@ -703,7 +2314,8 @@ class EnhancedBatesNumbering:
                         ]
                         result = subprocess.run(cmd, capture_output=True, text=True)
                         if result.returncode == 0:
-                            temp_pdf = input_pdf.parent / f"printed_{input_pdf.name}"
+                            output_pdf.parent.mkdir(parents=True, exist_ok=True)
+                            temp_pdf = output_pdf.parent / f"printed_{input_pdf.name}"
                             with open(temp_pdf, 'wb') as f:
                                 f.write(result.stdout.encode())
                             reader = PdfReader(temp_pdf)
@@ -711,9 +2323,9 @@ class EnhancedBatesNumbering:
                             raise Exception("Failed to print PDF")
                     else:
                         raise Exception("PDF unlocking and printing not supported on this platform")
-            except Exception as e:
-                self.logger.error(f"Error handling locked PDF {input_pdf}: {str(e)}")
-                return False
+                except Exception as e:
+                    self.logger.error(f"Error handling locked PDF {input_pdf}: {str(e)}")
+                    return False
             
             writer = PdfWriter()
             
@@ -722,185 +2334,42 @@ class EnhancedBatesNumbering:
             total_pages = len(reader.pages)
             
             # Store the starting Bates number for this file
-            current_bates = self.current_number
+            current_bates = start_number if start_number is not None else self.current_number
             
             # Process each page
+            stamp_started = time.perf_counter()
             for page_num, page in enumerate(reader.pages, 1):
                 try:
                     # Get page dimensions
                     width = float(page.mediabox.width)
                     height = float(page.mediabox.height)
                     
-                    # Create a new PDF with the Bates number
-                    packet = io.BytesIO()
-                    can = canvas.Canvas(packet, pagesize=(width, height))
-                    can.setFont("Helvetica-Bold", 10)
-                    
-                    # Set color based on settings
-                    if self.stamp_color == "black":
-                        fill_color = black
-                    elif self.stamp_color == "red":
-                        fill_color = colors.red
-                    elif self.stamp_color == "blue":
-                        fill_color = colors.blue
-                    elif self.stamp_color == "green":
-                        fill_color = colors.green
-                    elif self.stamp_color == "gray":
-                        fill_color = colors.gray
-                    
-                    # Apply opacity
-                    can.setFillColor(fill_color, alpha=self.stamp_opacity)
-                    
                     # Generate Bates number for this page
                     if page_num == 1:
                         # For first page, use the provided Bates number
                         page_bates = bates_number
                     else:
                         # For subsequent pages, increment from the starting number
-                        page_bates = f"{self.prefix}{str(self.start + page_num - 1).zfill(self.zero_pad_length)}"
-                    
-                    # Calculate text dimensions
-                    text_width = can.stringWidth(page_bates, "Helvetica-Bold", 10)
-                    text_height = 10
-                    
-                    # Set default margins
-                    margin = 10
+                        page_bates = self.format_bates(current_bates + page_num - 1)
                     
-                    # Calculate position based on grid selection
-                    if "top" in self.stamp_position:
-                        y = height - margin - text_height
-                    elif "middle" in self.stamp_position:
-                        y = height / 2
-                    else:  # bottom
-                        y = margin + text_height
-                    
-                    if "left" in self.stamp_position:
-                        x = margin + text_width
-                    elif "center" in self.stamp_position:
-                        x = width / 2
-                    else:  # right
-                        x = width - margin
-                    
-                    # Apply offsets
-                    x += self.stamp_x_offset
-                    y += self.stamp_y_offset
-                    
-                    # Draw box if width > 0
-                    if self.stamp_box_width > 0:
-                        # Calculate box dimensions based on position
-                        box_padding = 2
-                        box_width = text_width + (box_padding * 2)
-                        box_height = text_height + (box_padding * 2)
-                        
-                        if "left" in self.stamp_position:
-                            box_x = x - text_width - box_padding
-                        elif "center" in self.stamp_position:
-                            box_x = x - (box_width / 2)
-                        else:  # right
-                            box_x = x - text_width - box_padding
-                        
-                        if "top" in self.stamp_position:
-                            box_y = y - text_height - box_padding
-                        elif "middle" in self.stamp_position:
-                            box_y = y - (box_height / 2)
-                        else:  # bottom
-                            box_y = y - box_padding
-                        
-                        # Draw rectangle around text
-                        can.setStrokeColor(fill_color, alpha=self.stamp_opacity)
-                        can.setLineWidth(self.stamp_box_width)
-                        can.rect(box_x, box_y, box_width, box_height)
-                        
-                        # Draw text based on position
-                        if "left" in self.stamp_position:
-                            can.drawString(box_x + box_padding, box_y + box_padding, page_bates)
-                        elif "center" in self.stamp_position:
-                            can.drawCentredString(x, box_y + box_padding, page_bates)
-                        else:  # right
-                            can.drawRightString(box_x + box_width - box_padding, box_y + box_padding, page_bates)
-                    else:
-                        # Draw text without box
-                        if "left" in self.stamp_position:
-                            can.drawString(x - text_width, y, page_bates)
-                        elif "center" in self.stamp_position:
-                            can.drawCentredString(x, y, page_bates)
-                        else:  # right
-                            can.drawRightString(x, y, page_bates)
-                    
-                    can.save()
-                    packet.seek(0)
-                    
-                    # Create a new PDF with the Bates number
-                    new_pdf = PdfReader(packet)
+                    # Fast path: reuse the overlay rendered for this page geometry
+                    if self.overlay_cache is not None:
+                        try:
+                            if self.overlay_cache.stamp(writer, page, width, height, page_bates):
+                                pages_processed += 1
+                                continue
+                        except Exception as e:
+                            self.logger.debug(f"Overlay cache could not stamp page {page_num} of {input_pdf}: {str(e)}")
                     
-                    # Create a new page object
                     new_page = page
-                    
                     try:
-                        # Try to merge the Bates number with the page
-                        new_page.merge_page(new_pdf.pages[0])
+                        # Render a one-off overlay and merge it with the page
+                        overlay = self.render_stamp_overlay(width, height, page_bates)
+                        new_page.merge_page(overlay.pages[0])
                     except Exception as e:
-                        # If merging fails, try alternative method
-                        self.logger.warning(f"Warning: Primary merge failed for page {page_num}, trying alternative method: {str(e)}")
-                        try:
-                            # Create a new blank page
-                            packet = io.BytesIO()
-                            can = canvas.Canvas(packet, pagesize=(width, height))
-                            
-                            # Copy the original page content
-                            can.doForm(page['/Resources']['/XObject'].keys()[0])
-                            
-                            # Add the Bates number with box
-                            can.setFont("Helvetica-Bold", 10)
-                            can.setFillColor(can._fillColor, alpha=self.stamp_opacity)
-                            
-                            # Draw box if width > 0
-                            if self.stamp_box_width > 0:
-                                box_padding = 2
-                                box_width = text_width + (box_padding * 2)
-                                box_height = text_height + (box_padding * 2)
-                                
-                                if "left" in self.stamp_position:
-                                    box_x = x - text_width - box_padding
-                                elif "center" in self.stamp_position:
-                                    box_x = x - (box_width / 2)
-                                else:  # right
-                                    box_x = x - text_width - box_padding
-                                
-                                if "top" in self.stamp_position:
-                                    box_y = y - text_height - box_padding
-                                elif "middle" in self.stamp_position:
-                                    box_y = y - (box_height / 2)
-                                else:  # bottom
-                                    box_y = y - box_padding
-                                
-                                can.setStrokeColor(can._fillColor, alpha=self.stamp_opacity)
-                                can.setLineWidth(self.stamp_box_width)
-                                can.rect(box_x, box_y, box_width, box_height)
-                                
-                                if "left" in self.stamp_position:
-                                    can.drawString(box_x + box_padding, box_y + box_padding, page_bates)
-                                elif "center" in self.stamp_position:
-                                    can.drawCentredString(x, box_y + box_padding, page_bates)
-                                else:  # right
-                                    can.drawRightString(box_x + box_width - box_padding, box_y + box_padding, page_bates)
-                            else:
-                                if "left" in self.stamp_position:
-                                    can.drawString(x - text_width, y, page_bates)
-                                elif "center" in self.stamp_position:
-                                    can.drawCentredString(x, y, page_bates)
-                                else:  # right
-                                    can.drawRightString(x, y, page_bates)
-                            
-                            can.save()
-                            packet.seek(0)
-                            
-                            # Create new page with combined content
-                            new_page = PdfReader(packet).pages[0]
-                        except Exception as e2:
-                            self.logger.warning(f"Warning: Alternative method also failed for page {page_num}: {str(e2)}")
-                            # If both methods fail, just add the original page
-                            new_page = page
+                        # If merging fails, just add the original page
+                        self.logger.warning(f"Warning: Merge failed for page {page_num}, adding page without stamp: {str(e)}")
+                        new_page = page
                     
                     writer.add_page(new_page)
                     pages_processed += 1
@@ -912,24 +2381,29 @@ class EnhancedBatesNumbering:
                     writer.add_page(page)
                     pages_processed += 1
             
+            self.add_step_time('stamp', stamp_started)
+            
             # Only proceed if we processed at least one page
             if pages_processed > 0:
                 # Create the output directory if it doesn't exist
                 output_pdf.parent.mkdir(parents=True, exist_ok=True)
                 
-                # Write the stamped PDF to a temporary location
+                # Write the stamped PDF beside its final location and swap it in atomically
+                write_started = time.perf_counter()
                 temp_stamped = output_pdf.parent / f"temp_stamped_{output_pdf.name}"
                 with open(temp_stamped, 'wb') as output_file:
                     writer.write(output_file)
-                
-                # Move the stamped file to its final location
-                shutil.move(temp_stamped, output_pdf)
+                    written = output_file.tell()
+                os.replace(temp_stamped, output_pdf)
+                self.bytes_written += written
+                self.add_step_time('write', write_started)
                 
                 # Log success with page count
-                self.logger.info(f"Successfully processed {pages_processed} of {total_pages} pages in {input_pdf}")
+                self.logger.info(f"Successfully processed {pages_processed} of {total_pages} pages in {input_pdf} "
+                                 f"({written} bytes written)")
                 
                 # Update the current number for the next file
-                self.current_number = self.start + total_pages
+                self.current_number = current_bates + total_pages
                 return True
             else:
                 self.logger.error(f"Failed to process any pages in {input_pdf}")
@@ -960,63 +2434,115 @@ class EnhancedBatesNumbering:
     def get_pdf_page_count(self, pdf_path: Path) -> int:
         """Get the number of pages in a PDF file."""
         try:
-            with open(pdf_path, 'rb') as file:
-                reader = PdfReader(file)
-                return len(reader.pages)
+            return self.page_index.get_page_count(pdf_path)
         except Exception as e:
             self.logger.error(f"Error getting page count for {pdf_path}: {str(e)}")
             return 0
 
+    def get_combined_sources(self) -> List[Tuple[Path, int, int]]:
+        """Return (path, page count, size) for every stamped PDF in Bates order.
+        
+        Uses the records collected while stamping when available; otherwise the
+        output directory is scanned and each PDF is opened to validate it.
+        """
+        if self.production_records:
+            return [(record['output_path'], record['page_count'], record['output_size'])
+                    for record in sorted(self.production_records, key=lambda r: r['bates_begin'])]
+        
+        # Get all PDF files and sort them by Bates number
+        pdf_files = []
+        for pdf_file in self.output_dir.glob("**/*.pdf"):
+            if "combined" not in pdf_file.name.lower() and "issues" not in pdf_file.name.lower():
+                bates_match = re.search(rf"{self.prefix}\d+", pdf_file.name)
+                if bates_match:
+                    bates_number = bates_match.group()
+                    pdf_files.append((bates_number, pdf_file))
+        
+        # Sort files by Bates number
+        pdf_files.sort(key=lambda x: int(re.search(r'\d+', x[0]).group()))
+        
+        sources = []
+        for bates_number, pdf_file in pdf_files:
+            # Verify PDF is not corrupted before adding
+            page_count = self.get_pdf_page_count(pdf_file)
+            if page_count > 0:
+                sources.append((pdf_file, page_count, pdf_file.stat().st_size))
+            else:
+                self.logger.warning(f"Skipping empty or unreadable PDF: {pdf_file}")
+        return sources
+
+    def split_volumes(self, sources: List[Tuple[Path, int, int]]) -> List[List[Tuple[Path, int, int]]]:
+        """Group files into volumes that stay within the page and byte limits.
+        
+        Documents are never split; one larger than a limit gets a volume of its own.
+        """
+        volumes = []
+        current = []
+        current_pages = current_bytes = 0
+        for source in sources:
+            _, page_count, size = source
+            over_pages = self.volume_max_pages and current_pages + page_count > self.volume_max_pages
+            over_bytes = self.volume_max_bytes and current_bytes + size > self.volume_max_bytes
+            if current and (over_pages or over_bytes):
+                volumes.append(current)
+                current = []
+                current_pages = current_bytes = 0
+            current.append(source)
+            current_pages += page_count
+            current_bytes += size
+        if current:
+            volumes.append(current)
+        return volumes
+
     def create_combined_pdf(self):
-        """Create a combined PDF of all processed files."""
+        """Create a combined PDF of all processed files.
+        
+        Files are appended in Bates order and written out one volume at a time,
+        so only a single volume is held in memory. Volumes are split past the
+        page or byte limit, COMBINED_VOLUME_MAX_MB unless configured otherwise;
+        a production within the limits gets a single combined PDF. With both
+        limits turned off the whole production is assembled in memory.
+        """
         try:
-            merger = PdfMerger()
-            combined_path = self.output_dir / f"{self.prefix}_combined.pdf"
-            
-            # Get all PDF files and sort them by Bates number
-            pdf_files = []
-            for pdf_file in self.output_dir.glob("**/*.pdf"):
-                if "combined" not in pdf_file.name.lower() and "issues" not in pdf_file.name.lower():
-                    bates_match = re.search(rf"{self.prefix}\d+", pdf_file.name)
-                    if bates_match:
-                        bates_number = bates_match.group()
-                        pdf_files.append((bates_number, pdf_file))
-            
-            # Sort files by Bates number
-            pdf_files.sort(key=lambda x: int(re.search(r'\d+', x[0]).group()))
+            volumes = self.split_volumes(self.get_combined_sources())
+            if not volumes:
+                self.logger.warning("No valid PDFs found to combine")
+                return
             
             # Track failed files
             failed_files = []
             
-            # Merge PDFs with error handling
-            for bates_number, pdf_file in pdf_files:
-                try:
-                    # Verify PDF is not corrupted before adding
-                    with open(pdf_file, 'rb') as f:
-                        reader = PdfReader(f)
-                        if len(reader.pages) > 0:  # Basic check for valid PDF
-                            merger.append(str(pdf_file))
-                        else:
-                            self.logger.warning(f"Skipping empty PDF: {pdf_file}")
-                            failed_files.append(pdf_file)
-                except Exception as e:
-                    self.logger.warning(f"Error processing {pdf_file}, skipping: {str(e)}")
-                    failed_files.append(pdf_file)
-            
-            # Only write the combined PDF if we successfully added any files
-            if len(merger.pages) > 0:
-                merger.write(str(combined_path))
-                self.logger.info(f"Combined PDF created: {combined_path}")
+            for volume_number, volume in enumerate(volumes, 1):
+                if len(volumes) == 1:
+                    combined_path = self.output_dir / f"{self.prefix}_combined.pdf"
+                else:
+                    combined_path = self.output_dir / f"{self.prefix}_combined_VOL{volume_number:03d}.pdf"
                 
-                # Log any failed files
-                if failed_files:
-                    self.logger.warning(f"Failed to include {len(failed_files)} files in combined PDF")
-                    for failed_file in failed_files:
-                        self.logger.warning(f"Failed file: {failed_file}")
-            else:
-                self.logger.warning("No valid PDFs found to combine")
+                writer = PdfWriter()
+                for pdf_file, _, _ in volume:
+                    try:
+                        writer.append(str(pdf_file))
+                    except Exception as e:
+                        self.logger.warning(f"Error processing {pdf_file}, skipping: {str(e)}")
+                        failed_files.append(pdf_file)
+                
+                # Only write the volume if we successfully added any pages
+                if len(writer.pages) > 0:
+                    temp_path = combined_path.with_name(f"temp_{combined_path.name}")
+                    with open(temp_path, 'wb') as output_file:
+                        writer.write(output_file)
+                        written = output_file.tell()
+                    os.replace(temp_path, combined_path)
+                    self.bytes_written += written
+                    self.logger.info(f"Combined PDF created: {combined_path} "
+                                     f"({len(writer.pages)} pages, {written / 1048576:.1f} MB)")
+                writer.close()
             
-            merger.close()
+            # Log any failed files
+            if failed_files:
+                self.logger.warning(f"Failed to include {len(failed_files)} files in combined PDF")
+                for failed_file in failed_files:
+                    self.logger.warning(f"Failed file: {failed_file}")
             
         except Exception as e:
             self.logger.error(f"Error creating combined PDF: {str(e)}")
@@ -1031,238 +2557,1153 @@ class EnhancedBatesNumbering:
             target_dir = self.output_dir / rel_path.parent
             target_dir.mkdir(parents=True, exist_ok=True)
             
-            # Create new filename with Bates number
-            new_filename = f"{bates_number}_{source_path.name}"
-            target_path = target_dir / new_filename
+            # Create new filename with Bates number
+            new_filename = f"{bates_number}_{source_path.name}"
+            target_path = target_dir / new_filename
+            
+            # Copy the file
+            shutil.copy2(source_path, target_path)
+            self.logger.info(f"Copied source file to: {target_path}")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error copying source file {source_path}: {str(e)}")
+            return False
+
+    def format_bates(self, number: int) -> str:
+        """Format a number as a Bates number using the configured prefix and padding."""
+        return f"{self.prefix}{str(number).zfill(self.zero_pad_length)}"
+
+    def discover_files(self) -> List[Path]:
+        """Return all files to produce from the input directory in Bates order."""
+        discovered = []
+        for input_file in sorted(self.input_dir.glob("**/*")):
+            if not input_file.is_file() or self.should_ignore_file(input_file):
+                continue
+            discovered.append(input_file)
+        return discovered
+
+    def prepare_file(self, task: Tuple[int, Path]) -> Dict:
+        """Convert a source file to PDF if needed and count its pages.
+        
+        Runs in a worker process when more than one worker is configured, so it
+        only touches its own staging directory and returns a plain dictionary.
+        """
+        index, input_file = task
+        entry = {
+            'index': index,
+            'source': input_file,
+            # Attachments live in staging; their place in the output is set when they are planned
+            'rel_path': (input_file.relative_to(self.input_dir) if self.input_dir in input_file.parents
+                         else Path(input_file.name)),
+            'is_pdf': input_file.suffix.lower() == '.pdf',
+            'pdf_path': None,
+            'page_count': 0,
+            'error': None,
+        }
+        if self.cancel_event.is_set():
+            # The plan is thrown away on cancel, so there is no point converting the rest
+            entry['error'] = "Cancelled"
+            return entry
+        started = time.perf_counter()
+        try:
+            if input_file.suffix.lower() in MAILBOX_SUFFIXES:
+                # A mailbox has no pages of its own; its messages are planned in its place
+                entry['is_mailbox'] = True
+                entry['attachments'] = self.split_mailbox(input_file, self.staging_dir / str(index) / 'messages')
+                return entry
+            if entry['is_pdf']:
+                entry['pdf_path'] = input_file
+            else:
+                # Each file converts into its own staging folder so names never collide
+                converted_pdf = self.staged_conversions.get(index)
+                cache_key = None
+                if converted_pdf is None and self.conversion_cache is not None:
+                    cache_key = self.conversion_cache.get_key(input_file, self.get_converter_id(input_file))
+                    converted_pdf = self.conversion_cache.fetch(cache_key, self.get_staged_pdf_path(index, input_file))
+                if converted_pdf is None:
+                    converted_pdf, reason = self.convert_isolated(input_file, self.staging_dir / str(index))
+                    if not converted_pdf:
+                        entry['error'] = reason
+                        return entry
+                    if cache_key is not None:
+                        self.conversion_cache.store(cache_key, converted_pdf)
+                entry['pdf_path'] = converted_pdf
+            
+            entry['page_count'] = self.get_pdf_page_count(entry['pdf_path'])
+            if entry['page_count'] == 0:
+                entry['error'] = "Could not read page count"
+            elif input_file.suffix.lower() in EMAIL_SUFFIXES:
+                entry['attachments'] = self.email_renderer.save_attachments(
+                    self.email_renderer.parse(input_file), self.staging_dir / str(index) / 'attachments')
+        except Exception as e:
+            entry['error'] = str(e)
+        finally:
+            # Conversion (unless batched ahead of time) and page counting
+            entry['prepare_seconds'] = time.perf_counter() - started
+        return entry
+
+    def split_mailbox(self, mailbox_path: Path, target_dir: Path) -> List[Path]:
+        """Split an mbox file into one .eml file per message, in mailbox order.
+        
+        The mailbox is read line by line and each line is written straight to
+        its message file, so memory use does not grow with the size of the
+        mailbox or of its messages. Like the mailbox module, a line starting
+        with "From " begins a new message.
+        """
+        target_dir.mkdir(parents=True, exist_ok=True)
+        messages = []
+        message_file = None
+        try:
+            with open(mailbox_path, 'rb') as mailbox:
+                for line in mailbox:
+                    if line.startswith(b'From '):
+                        if message_file is not None:
+                            message_file.close()
+                        message_path = target_dir / f"message_{len(messages) + 1:06d}.eml"
+                        message_file = open(message_path, 'wb')
+                        messages.append(message_path)
+                        if len(messages) % MAILBOX_PROGRESS_INTERVAL == 0:
+                            self.logger.info(f"Read {len(messages)} messages from {mailbox_path}")
+                    elif message_file is not None:
+                        message_file.write(line)
+        finally:
+            if message_file is not None:
+                message_file.close()
+        self.logger.info(f"Split {len(messages)} messages from mailbox {mailbox_path}")
+        return messages
+
+    def plan_production(self, executor=None) -> List[Dict]:
+        """Prepare every file and pre-assign its Bates range.
+        
+        Page counts are gathered first (in parallel when an executor is given),
+        then numbers are allocated deterministically in sorted file order so the
+        plan is identical however many workers are used. In incremental mode,
+        files unchanged since the previous production keep its page count and
+        are neither converted nor restamped if their range did not move.
+        Attachments of email messages are numbered right after their message.
+        """
+        with self.timed_phase('discovery'):
+            files = self.discover_files()
+        self.logger.info(f"Planning {len(files)} files")
+        
+        previous = self.load_previous_production()
+        prepared = []
+        tasks = []
+        for index, input_file in enumerate(files):
+            rel_key = input_file.relative_to(self.input_dir).as_posix()
+            record = previous.get(rel_key)
+            # Emails and mailboxes are prepared again so that their attachments and messages are planned
+            if (record is not None and input_file.suffix.lower() not in EMAIL_SUFFIXES | MAILBOX_SUFFIXES
+                    and self.source_matches_record(input_file, record)):
+                prepared.append(self.make_unchanged_entry(index, input_file, record))
+            else:
+                tasks.append((index, input_file))
+        
+        for entry in self.prepare_files(tasks, executor):
+            self.add_prepared_entry(entry, previous, executor)
+            prepared.append(entry)
+        self.prepare_attachments(prepared, len(files), previous, executor)
+        if self.cancel_event.is_set():
+            # Nothing has been numbered or moved to issues yet; the caller discards the plan
+            return []
+        prepared.sort(key=lambda entry: entry['index'])
+        
+        plan = []
+        next_number = self.current_number
+        family_numbers = {}
+        for entry in chain.from_iterable(self.iter_family(entry) for entry in prepared):
+            if entry.get('is_mailbox') and not entry['error']:
+                continue
+            if entry['error']:
+                self.logger.error(f"Failed to prepare {entry['source']}: {entry['error']}")
+                self.emit(EVENT_FILE_FAILED, source=entry['source'], phase='planning', reason=entry['error'])
+                # Keep a copy of files that could not be read or converted alongside the other problem files
+                issue_copy = self.staging_dir / str(entry['index']) / entry['source'].name
+                issue_copy.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(entry['source'], issue_copy)
+                self.move_to_issues(issue_copy, entry['error'])
+                continue
+            entry['bates_begin'] = next_number
+            entry['bates_end'] = next_number + entry['page_count'] - 1
+            entry['bates_number'] = self.format_bates(next_number)
+            next_number = entry['bates_end'] + 1
+            family_numbers[entry['index']] = entry['bates_number']
+            if 'parent_index' in entry:
+                entry['parent_bates'] = family_numbers[entry.pop('parent_index')]
+            plan.append(entry)
+        
+        if previous:
+            self.resolve_reuse(plan, executor)
+        
+        self.close_sandboxes()
+        if self.conversion_cache is not None:
+            self.conversion_cache.trim()
+        
+        self.logger.info(f"Planned {len(plan)} files, Bates range "
+                         f"{self.format_bates(self.current_number)}-{self.format_bates(next_number - 1)}")
+        return plan
+
+    def add_prepared_entry(self, entry: Dict, previous: Dict[str, Dict], executor=None):
+        """Keep what a prepared entry learned for the rest of the run."""
+        self.metrics.add_prepared(entry)
+        if not entry['is_pdf'] and entry['pdf_path'] is not None:
+            self.emit(EVENT_FILE_CONVERTED, source=entry['source'], pages=entry['page_count'])
+        if executor is not None and entry['page_count']:
+            # Counts read in worker processes are kept for the rest of the run
+            self.page_index.add(entry['pdf_path'], entry['page_count'])
+        if previous:
+            record = previous.get(entry['rel_path'].as_posix())
+            if record is None:
+                entry['incremental_status'] = 'new'
+            elif entry['pdf_path'] is not None and self.source_matches_record(entry['source'], record):
+                # Emails and their attachments are always prepared, but may well be unchanged
+                entry['previous'] = record
+                entry['incremental_status'] = 'unchanged'
+            else:
+                entry['incremental_status'] = 'changed'
+
+    def prepare_attachments(self, prepared: List[Dict], next_index: int, previous: Dict[str, Dict],
+                            executor=None):
+        """Prepare the attachments of prepared emails as the children of their message.
+        
+        Attachments go through prepare_files like any other file, so office
+        documents still use the office instances and the conversion cache. Each
+        round prepares the attachments found by the previous one, so attached
+        messages bring their own attachments along. Children get plan indexes
+        from next_index on and land in a <message>_attachments folder next to
+        their message. The messages of a mailbox are prepared the same way, in
+        a <mailbox>_messages folder, but are not attachments of anything.
+        """
+        parents = [entry for entry in prepared if entry.get('attachments')]
+        while parents:
+            tasks, owners = [], []
+            for parent in parents:
+                parent['children'] = []
+                self.extraction_sources[str(parent['index'])] = parent['source']
+                for attachment in parent.pop('attachments'):
+                    if self.should_ignore_file(attachment):
+                        continue
+                    tasks.append((next_index, attachment))
+                    owners.append(parent)
+                    next_index += 1
+            mailboxes = sum(1 for parent in parents if parent.get('is_mailbox'))
+            if mailboxes:
+                self.logger.info(f"Preparing {len(tasks)} files from {mailboxes} mailboxes "
+                                 f"and {len(parents) - mailboxes} email messages")
+            else:
+                self.logger.info(f"Preparing {len(tasks)} attachments of {len(parents)} email messages")
+            
+            children = self.prepare_files(tasks, executor)
+            for parent, child in zip(owners, children):
+                parent_rel = parent['rel_path']
+                if parent.get('is_mailbox'):
+                    child['rel_path'] = parent_rel.parent / f"{parent_rel.stem}_messages" / child['source'].name
+                else:
+                    child['rel_path'] = parent_rel.parent / f"{parent_rel.stem}_attachments" / child['source'].name
+                    child['parent_index'] = parent['index']
+                self.add_prepared_entry(child, previous, executor)
+                parent['children'].append(child)
+            parents = [child for child in children if child.get('attachments')]
+
+    @classmethod
+    def iter_family(cls, entry: Dict):
+        """Yield a prepared entry followed by its attachments, depth first."""
+        yield entry
+        for child in entry.pop('children', []):
+            yield from cls.iter_family(child)
+
+    def map_prepare(self, tasks: List[Tuple[int, Path]], executor=None):
+        """Run prepare_file over tasks, in the executor's workers when one is given, keeping task order."""
+        if executor is not None:
+            return executor.map(prepare_in_worker, [(index, input_file, self.staged_conversions.get(index))
+                                                    for index, input_file in tasks])
+        return [self.prepare_file(task) for task in tasks]
+
+    def prepare_native_files(self, tasks: List[Tuple[int, Path]], executor=None) -> List[Dict]:
+        """Run prepare_file over tasks, decoding images on threads when there is no process pool.
+        
+        Pillow releases the GIL while decoding and resampling, so a few threads
+        speed up image-heavy productions even with a single worker.
+        """
+        image_tasks = [task for task in tasks if task[1].suffix.lower() in IMAGE_SUFFIXES]
+        if executor is not None or len(image_tasks) < 2:
+            return list(self.map_prepare(tasks, executor))
+        image_indexes = {task[0] for task in image_tasks}
+        threads_count = min(len(image_tasks), IMAGE_DECODE_THREADS, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=threads_count) as threads:
+            image_results = threads.map(self.prepare_file, image_tasks)
+            results = [self.prepare_file(task) for task in tasks if task[0] not in image_indexes]
+            results.extend(image_results)
+        results.sort(key=lambda entry: entry['index'])
+        return results
+
+    @staticmethod
+    def uses_office_engine(file_path: Path) -> bool:
+        """Check whether a file is converted by LibreOffice rather than in-process."""
+        return file_path.suffix.lower() not in NATIVE_CONVERSION_SUFFIXES
+
+    def get_staged_pdf_path(self, index: int, input_file: Path) -> Path:
+        """Return where the converted PDF of a planned file is staged."""
+        return self.staging_dir / str(index) / f"{input_file.stem}.pdf"
+
+    def get_converter_id(self, input_file: Path) -> str:
+        """Identify the converter and settings that produce a file's PDF, for the conversion cache."""
+        engine = 'office' if self.uses_office_engine(input_file) else 'native'
+        converter_id = f"{CONVERSION_CACHE_VERSION}:{engine}:{input_file.suffix.lower()}"
+        if self.table_theme and input_file.suffix.lower() in ['.xlsx', '.xls', '.xlsm', '.xlsb', '.csv']:
+            converter_id += ':' + json.dumps(self.table_theme, sort_keys=True)
+        if input_file.suffix.lower() in IMAGE_SUFFIXES:
+            converter_id += f":{self.image_max_dpi}dpi"
+        return converter_id
+
+    def fetch_cached_conversions(self, tasks: List[Tuple[int, Path]]) -> List[Tuple[int, Path]]:
+        """Stage cached PDFs for the given tasks and return the tasks still to convert."""
+        remaining = []
+        for index, input_file in tasks:
+            key = self.conversion_cache.get_key(input_file, self.get_converter_id(input_file))
+            cached = self.conversion_cache.fetch(key, self.get_staged_pdf_path(index, input_file))
+            if cached is not None:
+                self.staged_conversions[index] = cached
+            else:
+                remaining.append((index, input_file))
+        if len(remaining) < len(tasks):
+            self.logger.info(f"Conversion cache: {len(tasks) - len(remaining)} of {len(tasks)} "
+                             f"office documents already converted")
+        return remaining
+
+    def prepare_files(self, tasks: List[Tuple[int, Path]], executor=None) -> List[Dict]:
+        """Run prepare_file over tasks, converting office documents on a pool of warm instances.
+        
+        Office documents are dispatched from threads in this process, one per
+        instance, while the other files are prepared in the executor. In batch
+        mode they are first converted many per soffice call, and only the ones
+        that failed go to the instances. Without LibreOffice and unoconv every
+        file falls back to a unoconv call of its own.
+        """
+        office_tasks = [task for task in tasks if self.uses_office_engine(task[1])]
+        if office_tasks and self.conversion_cache is not None:
+            # Cached documents need no office engine at all
+            office_tasks = self.fetch_cached_conversions(office_tasks)
+        if office_tasks and self.batch_conversion and OfficeConversionPool.find_soffice() is not None:
+            self.staged_conversions.update(self.convert_office_batches(office_tasks))
+            # Only documents the batches could not convert still need an office engine
+            office_tasks = [task for task in office_tasks if task[0] not in self.staged_conversions]
+        if not office_tasks or not OfficeConversionPool.is_available():
+            return self.prepare_native_files(tasks, executor)
+        office_indexes = {task[0] for task in office_tasks}
+        other_tasks = [task for task in tasks if task[0] not in office_indexes]
+        
+        # Submit to the process pool first so its workers are forked before any thread starts
+        other_results = self.map_prepare(other_tasks, executor) if executor is not None else None
+        
+        size = min(self.office_instances, len(office_tasks))
+        self.logger.info(f"Converting {len(office_tasks)} office documents on {size} office instances")
+        started = time.monotonic()
+        try:
+            with OfficeConversionPool(size, timeout=self.conversion_timeout, logger=self.logger) as pool:
+                self.office_pool = pool
+                with ThreadPoolExecutor(max_workers=size) as threads:
+                    results = list(threads.map(self.prepare_file, office_tasks))
+        except RuntimeError as e:
+            # LibreOffice would not start; convert one process per file instead
+            self.logger.warning(f"Office instances unavailable ({str(e)}), converting one file at a time")
+            results = [self.prepare_file(task) for task in office_tasks]
+        finally:
+            self.office_pool = None
+        elapsed = time.monotonic() - started
+        self.logger.info(f"Office conversion: {len(office_tasks)} documents took {elapsed:.1f} seconds "
+                         f"({elapsed / len(office_tasks):.2f} s per document)")
+        
+        if other_results is None:
+            other_results = self.prepare_native_files(other_tasks)
+        results.extend(other_results)
+        results.sort(key=lambda entry: entry['index'])
+        return results
+
+    def load_previous_production(self) -> Dict[str, Dict]:
+        """Read the completed files of the production this run builds on, if any."""
+        if self.previous_output_dir is None:
+            return {}
+        
+        manifest_path = self.previous_output_dir / MANIFEST_FILENAME
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                previous_settings = json.load(f)['settings']
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f"Cannot read previous production manifest {manifest_path}, "
+                                f"rebuilding everything: {str(e)}")
+            return {}
+        
+        # Stamped outputs can only be reused if they would look exactly the same
+        current_settings = self.get_settings()
+        changed = [key for key in current_settings
+                   if key != 'start' and previous_settings.get(key) != current_settings[key]]
+        if changed:
+            self.logger.warning(f"Stamp settings differ from the previous production ({', '.join(changed)}), "
+                                f"rebuilding everything")
+            return {}
+        
+        records = self.load_checkpoint(self.previous_output_dir)
+        self.logger.info(f"Incremental mode: {len(records)} completed files in {self.previous_output_dir}")
+        return records
+
+    def make_unchanged_entry(self, index: int, input_file: Path, record: Dict) -> Dict:
+        """Build a plan entry for a file that has not changed since the previous production."""
+        is_pdf = input_file.suffix.lower() == '.pdf'
+        return {
+            'index': index,
+            'source': input_file,
+            'rel_path': input_file.relative_to(self.input_dir),
+            'is_pdf': is_pdf,
+            # Non-PDF files are only converted again if they have to be restamped
+            'pdf_path': input_file if is_pdf else None,
+            'page_count': record['bates_end'] - record['bates_begin'] + 1,
+            'error': None,
+            'previous': record,
+            'incremental_status': 'unchanged',
+        }
+
+    def resolve_reuse(self, plan: List[Dict], executor=None):
+        """Mark unchanged files whose Bates range did not move for reuse and prepare the rest."""
+        rebuild = []
+        for entry in plan:
+            record = entry.pop('previous', None)
+            if record is None:
+                continue
+            previous_output = self.previous_output_dir / record['output_path']
+            if (record['bates_begin'] == entry['bates_begin'] and record['bates_end'] == entry['bates_end']
+                    and previous_output.exists()):
+                entry['reuse_from'] = previous_output
+                entry['source_hash'] = record['source_hash']
+                entry['extracted_date'] = record.get('extracted_date')
+                entry['incremental_status'] = 'reused'
+            else:
+                entry['incremental_status'] = 'renumbered'
+                if entry['pdf_path'] is None:
+                    rebuild.append(entry)
+        
+        # Renumbered documents need their PDF version again before they can be restamped
+        tasks = [(entry['index'], entry['source']) for entry in rebuild]
+        for entry, converted in zip(rebuild, self.prepare_files(tasks, executor)):
+            entry['pdf_path'] = converted['pdf_path']
+            if converted['error']:
+                self.logger.error(f"Failed to prepare {entry['source']}: {converted['error']}")
+            elif converted['page_count'] != entry['page_count']:
+                self.logger.warning(f"{entry['source']} converted to {converted['page_count']} pages, "
+                                    f"previously {entry['page_count']}")
+        
+        status_counts = {}
+        for entry in plan:
+            status = entry['incremental_status']
+            status_counts[status] = status_counts.get(status, 0) + 1
+            if status != 'reused':
+                self.logger.info(f"Rebuilding ({status}): {entry['rel_path']}")
+        reused = status_counts.pop('reused', 0)
+        rebuilt = sum(status_counts.values())
+        details = ', '.join(f"{count} {status}" for status, count in sorted(status_counts.items()))
+        self.logger.info(f"Incremental report: {reused} files reused, {rebuilt} files rebuilt"
+                         + (f" ({details})" if details else ""))
+
+    @staticmethod
+    def link_or_copy(source: Path, target: Path):
+        """Hard-link source to target when possible, otherwise copy it."""
+        if target.exists():
+            target.unlink()
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+
+    def restore_staged_files(self, entries: List[Dict]):
+        """Convert or extract again the staged files of planned entries that are missing.
+        
+        A resumed production normally finds its converted PDFs, attachments and
+        mailbox messages where planning left them, but staging can be lost, e.g.
+        removed by hand or by an older version at the end of an interrupted run.
+        The file that filled a staging folder is prepared into it again, which
+        writes the same paths; a conversion whose page count no longer matches
+        the plan is not stamped, since it would not fit its Bates range.
+        """
+        missing = [entry for entry in entries
+                   if (self.staging_dir in entry['source'].parents and not entry['source'].exists())
+                   or (not entry['is_pdf'] and entry['pdf_path'] is not None and not entry['pdf_path'].exists())]
+        if not missing:
+            return
+        self.logger.warning(f"{len(missing)} files are missing from {self.staging_dir}; preparing them again")
+        restored = set()
+        
+        def restore_folder(staged_path: Path, source: Path):
+            """Prepare source again into the staging folder holding staged_path."""
+            folder = staged_path.relative_to(self.staging_dir).parts[0]
+            if folder in restored or source is None:
+                return
+            restored.add(folder)
+            if self.staging_dir in source.parents and not source.exists():
+                # An attachment of an attachment: its own message has to come back first
+                restore_folder(source, self.extraction_sources.get(source.relative_to(self.staging_dir).parts[0]))
+            prepared = self.prepare_file((int(folder), source))
+            if prepared['error']:
+                self.logger.error(f"Failed to prepare {source} again: {prepared['error']}")
+        
+        for entry in missing:
+            if self.staging_dir in entry['source'].parents and not entry['source'].exists():
+                folder = entry['source'].relative_to(self.staging_dir).parts[0]
+                restore_folder(entry['source'], self.extraction_sources.get(folder))
+            if entry['is_pdf'] or entry['pdf_path'] is None or entry['pdf_path'].exists():
+                continue
+            if entry['source'].exists():
+                restore_folder(entry['pdf_path'], entry['source'])
+            if not entry['pdf_path'].exists():
+                self.logger.error(f"Could not convert {entry['source']} to PDF again")
+                entry['pdf_path'] = None
+            elif self.get_pdf_page_count(entry['pdf_path']) != entry['page_count']:
+                self.logger.error(f"{entry['source']} converted to {self.get_pdf_page_count(entry['pdf_path'])} "
+                                  f"pages, planned {entry['page_count']}")
+                entry['pdf_path'] = None
+        self.close_sandboxes()
+
+    def execute_entry(self, entry: Dict) -> Dict:
+        """Copy and stamp one planned file into the output directory.
+        
+        Runs in a worker process when more than one worker is configured; moving
+        failed files to the issues folder is left to the caller so that it
+        happens in Bates order.
+        """
+        result = {'success': False, 'issue_path': None, 'reason': None, 'reused': False}
+        bates_number = entry['bates_number']
+        input_file = entry['source']
+        bytes_read, bytes_written = self.bytes_read, self.bytes_written
+        step_seconds = dict(self.step_seconds)
+        started = time.perf_counter()
+        try:
+            # Create the relative path structure in the output directory
+            target_dir = self.output_dir / entry['rel_path'].parent
+            target_dir.mkdir(parents=True, exist_ok=True)
+            
+            stat = input_file.stat()
+            if entry['is_pdf']:
+                # The stamped PDF is written straight from the source with Bates number prefix
+                target_path = target_dir / f"{bates_number}_{input_file.name}"
+            else:
+                # Copy the original file with Bates number prefix
+                original_target_path = target_dir / f"{bates_number}_{input_file.name}"
+                copy_started = time.perf_counter()
+                shutil.copy2(input_file, original_target_path)
+                self.add_step_time('copy', copy_started)
+                self.bytes_read += stat.st_size
+                self.bytes_written += stat.st_size
+                self.logger.info(f"Copied original file to: {original_target_path}")
+                
+                # The PDF version carries the same Bates number
+                target_path = target_dir / f"{bates_number}_{input_file.stem}.pdf"
+            
+            result['issue_path'] = target_path
+            result['source_size'] = stat.st_size
+            result['source_mtime'] = stat.st_mtime
+            result['output_path'] = target_path.relative_to(self.output_dir).as_posix()
+            
+            # Unchanged files keeping their Bates range reuse the previous stamped PDF
+            if entry.get('reuse_from') is not None:
+                self.link_or_copy(entry['reuse_from'], target_path)
+                result['source_hash'] = entry['source_hash']
+                result['extracted_date'] = entry.get('extracted_date') or self.extract_document_date(
+                    entry, entry['pdf_path'] or target_path)
+                result['reused'] = True
+                result['success'] = True
+                return result
             
-            # Copy the file
-            shutil.copy2(source_path, target_path)
-            self.logger.info(f"Copied source file to: {target_path}")
-            return True
+            if entry['pdf_path'] is None:
+                # There is no PDF to keep, so the copied original goes to the issues folder
+                result['issue_path'] = original_target_path
+                result['reason'] = "Failed to convert to PDF"
+                return result
+            
+            # Converted PDFs are stamped straight from staging, which stays intact
+            # until the whole manifest has been executed
+            if not self.add_bates_stamp(entry['pdf_path'], target_path, bates_number,
+                                        start_number=entry['bates_begin']):
+                if not target_path.exists():
+                    # Keep the unstamped PDF for the issues folder
+                    shutil.copy2(entry['pdf_path'], target_path)
+                result['reason'] = "Failed to apply Bates stamp"
+                return result
             
+            hash_started = time.perf_counter()
+            result['source_hash'] = compute_file_hash(input_file)
+            self.add_step_time('hash', hash_started)
+            date_started = time.perf_counter()
+            result['extracted_date'] = self.extract_document_date(entry, entry['pdf_path'])
+            self.add_step_time('date', date_started)
+            self.bytes_read += stat.st_size
+            result['success'] = True
         except Exception as e:
-            self.logger.error(f"Error copying source file {source_path}: {str(e)}")
+            self.logger.error(f"Error processing {input_file}: {str(e)}")
+            result['reason'] = str(e)
+        finally:
+            result['bytes_read'] = self.bytes_read - bytes_read
+            result['bytes_written'] = self.bytes_written - bytes_written
+            result['seconds'] = time.perf_counter() - started
+            result['steps'] = {step: seconds - step_seconds.get(step, 0.0)
+                               for step, seconds in self.step_seconds.items()
+                               if seconds != step_seconds.get(step, 0.0)}
+        return result
+
+    def add_production_record(self, entry: Dict, outcome: Dict):
+        """Remember a stamped file so later steps need not rescan or reparse the output.
+        
+        The outcome is either the execute_entry result or the checkpoint record
+        of a file completed by an earlier run.
+        """
+        output_path = self.output_dir / outcome['output_path']
+        self.production_records.append({
+            'bates_number': entry['bates_number'],
+            'bates_begin': entry['bates_begin'],
+            'bates_end': entry['bates_end'],
+            'source': entry['source'],
+            'rel_path': entry['rel_path'].as_posix(),
+            'file_type': entry['source'].suffix.lower().lstrip('.'),
+            'extracted_date': outcome.get('extracted_date'),
+            'source_hash': outcome.get('source_hash'),
+            'parent_bates': entry.get('parent_bates'),
+            'output_path': output_path,
+            'page_count': entry['page_count'],
+            'output_size': output_path.stat().st_size,
+        })
+
+    def get_settings(self) -> Dict:
+        """Return the settings that determine the numbering and look of a production."""
+        return {
+            'prefix': self.prefix,
+            'zero_pad_length': self.zero_pad_length,
+            'start': self.start,
+            'stamp_x': self.stamp_x,
+            'stamp_y': self.stamp_y,
+            'stamp_color': self.stamp_color,
+            'stamp_box_width': self.stamp_box_width,
+            'stamp_position': self.stamp_position,
+            'stamp_x_offset': self.stamp_x_offset,
+            'stamp_y_offset': self.stamp_y_offset,
+            'stamp_opacity': round(self.stamp_opacity * 100),
+        }
+
+    def get_conversion_options(self) -> Dict:
+        """Return the settings that determine how files are converted to PDF."""
+        return {
+            'office_instances': self.office_instances,
+            'conversion_timeout': self.conversion_timeout,
+            'batch_conversion': self.batch_conversion,
+            'conversion_cache_dir': str(self.conversion_cache.cache_dir) if self.conversion_cache else None,
+            'conversion_cache_max_bytes': self.conversion_cache.max_bytes if self.conversion_cache else 2 * 1024 ** 3,
+            'image_max_dpi': self.image_max_dpi,
+            'conversion_memory_mb': self.conversion_memory_mb,
+            'isolate_conversions': self.isolate_conversions,
+        }
+
+    def write_manifest(self, plan: List[Dict] = None) -> Path:
+        """Write the production plan to a JSON manifest in the output directory.
+        
+        Without a plan only the settings are written, so a run interrupted while
+        planning can still be resumed with the same settings.
+        """
+        plan_entries = plan or []
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'input_dir': str(self.input_dir.resolve()),
+            'settings': self.get_settings(),
+            'output_options': {
+                'volume_max_pages': self.volume_max_pages,
+                'volume_max_bytes': self.volume_max_bytes,
+                'extract_dates': self.extract_dates,
+            },
+            # Resumed runs convert the remaining files the same way
+            'conversion_options': self.get_conversion_options(),
+            'total_files': len(plan_entries),
+            'total_pages': sum(entry['page_count'] for entry in plan_entries),
+            'extraction_sources': {
+                folder: {'extracted_path': source.relative_to(self.output_dir).as_posix()}
+                if self.staging_dir in source.parents else {'source': source.relative_to(self.input_dir).as_posix()}
+                for folder, source in self.extraction_sources.items()
+            },
+            'entries': None if plan is None else [
+                {
+                    'source': entry['rel_path'].as_posix(),
+                    'is_pdf': entry['is_pdf'],
+                    # Converted PDFs live in the staging folder until they are stamped
+                    'pdf_path': None if entry['is_pdf'] or entry['pdf_path'] is None
+                                else entry['pdf_path'].relative_to(self.output_dir).as_posix(),
+                    'page_count': entry['page_count'],
+                    'bates_begin': entry['bates_begin'],
+                    'bates_end': entry['bates_end'],
+                    'bates_number': entry['bates_number'],
+                    'reuse_from': str(entry['reuse_from']) if entry.get('reuse_from') else None,
+                    'source_hash': entry.get('source_hash'),
+                    'extracted_date': entry.get('extracted_date'),
+                    # Attachments and mailbox messages are read from where they were extracted in staging
+                    'extracted_path': entry['source'].relative_to(self.output_dir).as_posix()
+                                      if self.staging_dir in entry['source'].parents else None,
+                    'parent_bates': entry.get('parent_bates'),
+                }
+                for entry in plan_entries
+            ],
+        }
+        
+        manifest_path = self.output_dir / MANIFEST_FILENAME
+        temp_path = manifest_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temp_path, manifest_path)
+        self.logger.info(f"Production manifest written: {manifest_path}")
+        return manifest_path
+
+    def load_manifest(self, manifest_path: Path) -> List[Dict]:
+        """Read a production manifest back into plan entries."""
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        
+        if manifest.get('version') != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported manifest version {manifest.get('version')} in {manifest_path}")
+        
+        self.extraction_sources = {
+            folder: self.output_dir / item['extracted_path'] if 'extracted_path' in item else self.input_dir / item['source']
+            for folder, item in manifest.get('extraction_sources', {}).items()
+        }
+        plan = []
+        for index, item in enumerate(manifest['entries']):
+            rel_path = Path(item['source'])
+            if item.get('extracted_path'):
+                source = self.output_dir / item['extracted_path']
+            else:
+                source = self.input_dir / rel_path
+            plan.append({
+                'index': index,
+                'source': source,
+                'rel_path': rel_path,
+                'is_pdf': item['is_pdf'],
+                'pdf_path': source if item['is_pdf'] else (self.output_dir / item['pdf_path'] if item['pdf_path'] else None),
+                'page_count': item['page_count'],
+                'bates_begin': item['bates_begin'],
+                'bates_end': item['bates_end'],
+                'bates_number': item['bates_number'],
+                'reuse_from': Path(item['reuse_from']) if item.get('reuse_from') else None,
+                'source_hash': item.get('source_hash'),
+                'extracted_date': item.get('extracted_date'),
+                'parent_bates': item.get('parent_bates'),
+                'error': None,
+            })
+        return plan
+
+    @classmethod
+    def from_manifest(cls, manifest_path: str, workers: int = 1,
+                      conversion_overrides: Dict = None) -> 'EnhancedBatesNumbering':
+        """Create a processor that executes an existing manifest in its output directory.
+        
+        Conversion options come from the manifest; conversion_overrides replaces
+        the ones given again, e.g. a longer timeout for a resumed run.
+        """
+        manifest_path = Path(manifest_path)
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        
+        processor = cls(
+            input_dir=manifest['input_dir'],
+            output_dir=str(manifest_path.parent),
+            workers=workers,
+            timestamp_output=False,
+            **manifest['settings'],
+            **manifest.get('output_options', {}),
+            **{**manifest.get('conversion_options', {}), **(conversion_overrides or {})}
+        )
+        # A manifest without entries was interrupted while planning and is planned again
+        if manifest['entries'] is not None:
+            processor.manifest_path = manifest_path
+        return processor
+
+    @classmethod
+    def resume(cls, output_dir: str, workers: int = 1, conversion_overrides: Dict = None) -> 'EnhancedBatesNumbering':
+        """Create a processor that continues an interrupted production in output_dir."""
+        manifest_path = Path(output_dir) / MANIFEST_FILENAME
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"No production manifest found in {output_dir}")
+        processor = cls.from_manifest(str(manifest_path), workers=workers, conversion_overrides=conversion_overrides)
+        processor.logger.info(f"Resuming production in {processor.output_dir}")
+        return processor
+
+    def load_checkpoint(self, output_dir: Path = None) -> Dict[str, Dict]:
+        """Read the completion journal, keyed by source path relative to the input directory.
+        
+        Reads this production's journal unless another output directory is given.
+        """
+        completed = {}
+        checkpoint_path = self.checkpoint_path if output_dir is None else output_dir / CHECKPOINT_FILENAME
+        if not checkpoint_path.exists():
+            return completed
+        with open(checkpoint_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash mid-write
+                    continue
+                completed[record['source']] = record
+        return completed
+
+    def record_checkpoint(self, journal, entry: Dict, result: Dict):
+        """Durably append a completed file to the journal."""
+        record = {
+            'source': entry['rel_path'].as_posix(),
+            'source_hash': result['source_hash'],
+            'source_size': result['source_size'],
+            'source_mtime': result['source_mtime'],
+            'bates_begin': entry['bates_begin'],
+            'bates_end': entry['bates_end'],
+            'output_path': result['output_path'],
+            'extracted_date': result['extracted_date'],
+            'completed': datetime.now().isoformat(timespec='seconds'),
+        }
+        journal.write(json.dumps(record) + '\n')
+        journal.flush()
+        os.fsync(journal.fileno())
+
+    def is_entry_complete(self, entry: Dict, record: Dict) -> bool:
+        """Check whether a journal record still covers a planned entry."""
+        if record is None:
+            return False
+        if record['bates_begin'] != entry['bates_begin'] or record['bates_end'] != entry['bates_end']:
             return False
+        if not (self.output_dir / record['output_path']).exists():
+            return False
+        return self.source_matches_record(entry['source'], record)
 
-    def extract_email_content(self, msg):
-        """Extract email content, handling both plain text and HTML."""
-        content = []
-        
-        # Get email metadata
-        subject = msg.get('subject', 'No Subject')
-        from_addr = msg.get('from', 'Unknown Sender')
-        to_addr = msg.get('to', 'Unknown Recipient')
-        date = msg.get('date', 'Unknown Date')
-        
-        content.append(f"From: {from_addr}")
-        content.append(f"To: {to_addr}")
-        content.append(f"Subject: {subject}")
-        content.append(f"Date: {date}")
-        content.append("\n" + "="*50 + "\n")
-        
-        # Process email body
-        if msg.is_multipart():
-            for part in msg.walk():
-                if part.get_content_type() == "text/plain":
-                    try:
-                        text = part.get_content()
-                        if isinstance(text, bytes):
-                            text = text.decode()
-                        content.append(text)
-                    except Exception as e:
-                        content.append(f"Error decoding text part: {str(e)}")
-                elif part.get_content_type() == "text/html":
-                    try:
-                        html_content = part.get_content()
-                        if isinstance(html_content, bytes):
-                            html_content = html_content.decode()
-                        # Basic HTML to text conversion
-                        html_content = re.sub('<[^<]+?>', '', html_content)
-                        html_content = html.unescape(html_content)
-                        content.append(html_content)
-                    except Exception as e:
-                        content.append(f"Error decoding HTML part: {str(e)}")
-        else:
-            try:
-                text = msg.get_content()
-                if isinstance(text, bytes):
-                    text = text.decode()
-                content.append(text)
-            except Exception as e:
-                content.append(f"Error decoding content: {str(e)}")
+    @staticmethod
+    def source_matches_record(source: Path, record: Dict) -> bool:
+        """Check whether a source file is unchanged since a journal record was written."""
+        try:
+            stat = source.stat()
+        except OSError:
+            return False
+        if stat.st_size == record['source_size'] and stat.st_mtime == record['source_mtime']:
+            return True
+        if stat.st_size != record['source_size']:
+            return False
+        # Metadata changed; only the content hash can tell whether the file did
+        return compute_file_hash(source) == record['source_hash']
+
+    def log_plan_summary(self, plan: List[Dict]):
+        """Log a preview of a planned production."""
+        total_pages = sum(entry['page_count'] for entry in plan)
+        type_counts = {}
+        for entry in plan:
+            file_type = entry['source'].suffix.lower() or '(none)'
+            type_counts[file_type] = type_counts.get(file_type, 0) + 1
         
-        return "\n".join(content)
+        self.logger.info(f"Plan: {len(plan)} files, {total_pages} pages")
+        if plan:
+            self.logger.info(f"Plan: Bates range {plan[0]['bates_number']}-{self.format_bates(plan[-1]['bates_end'])}")
+        for file_type, count in sorted(type_counts.items()):
+            self.logger.info(f"Plan: {count} {file_type} files")
+        attachments = sum(1 for entry in plan if entry.get('parent_bates'))
+        if attachments:
+            self.logger.info(f"Plan: {attachments} of the files are email attachments")
+
+    @staticmethod
+    def select_chunk(plan: List[Dict], chunk: Tuple[int, int] = None) -> List[Dict]:
+        """Return the contiguous slice of the plan for chunk (number, total), numbered from 1."""
+        if chunk is None:
+            return plan
+        number, total = chunk
+        if total < 1 or not 1 <= number <= total:
+            raise ValueError(f"Invalid chunk {number}/{total}")
+        begin = (number - 1) * len(plan) // total
+        end = number * len(plan) // total
+        return plan[begin:end]
 
-    def process_files(self):
-        """Process all PDF files in the input directory."""
+    def create_executor(self):
+        """Create the process pool used for conversion and stamping, or None to run serially."""
+        if self.workers <= 1:
+            return None
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                   initargs=(self.log_file, self))
+
+    def process_files(self, plan: List[Dict] = None, chunk: Tuple[int, int] = None):
+        """Process all files in the input directory.
+        
+        Without a plan, files are converted and counted first, Bates ranges are
+        assigned in sorted order and written to the manifest. Every planned file
+        (or the selected chunk of them) is then copied and stamped. Both phases
+        run in a process pool when workers > 1; results are committed in Bates
+        order so the output matches a serial run.
+        """
+        executor = None
         try:
             # Create output directory if it doesn't exist
             self.output_dir.mkdir(parents=True, exist_ok=True)
             
-            # Track processed files to avoid duplicates
-            processed_files = set()
+            executor = self.create_executor()
+            if executor is not None:
+                self.logger.info(f"Processing with {self.workers} worker processes")
             
-            # Process each file in the input directory
-            for input_file in sorted(self.input_dir.glob("**/*")):
-                if not input_file.is_file() or self.should_ignore_file(input_file):
-                    continue
-                
-                # Skip if we've already processed this file
-                if str(input_file) in processed_files:
-                    continue
-                
-                try:
-                    # Generate Bates number for this file
-                    bates_number = f"{self.prefix}{str(self.current_number).zfill(self.zero_pad_length)}"
-                    
-                    # Create the relative path structure in the output directory
-                    rel_path = input_file.relative_to(self.input_dir)
-                    target_dir = self.output_dir / rel_path.parent
-                    target_dir.mkdir(parents=True, exist_ok=True)
-                    
-                    # If it's a PDF, copy it and add Bates stamps
-                    if input_file.suffix.lower() == '.pdf':
-                        # Copy the original PDF with Bates number prefix
-                        new_filename = f"{bates_number}_{input_file.name}"
-                        target_path = target_dir / new_filename
-                        shutil.copy2(input_file, target_path)
-                        self.logger.info(f"Copied source file to: {target_path}")
-
-                        # Add Bates stamps to the copied PDF
-                        if not self.add_bates_stamp(input_file, target_path, bates_number):
-                            self.move_to_issues(target_path, "Failed to apply Bates stamp")
-                            continue
+            if plan is None:
+                self.write_manifest()
+                with self.timed_phase('planning'):
+                    plan = self.plan_production(executor)
+                if self.cancel_event.is_set():
+                    # The manifest has no entries yet, so a resumed run plans again
+                    self.cancelled = True
+                    self.logger.warning("Cancelled while planning; resume the production to start it again")
+                    self.emit(EVENT_CANCELLED, phase='planning', files_done=0)
+                    return
+                self.write_manifest(plan)
+            
+            # The number after this production is known as soon as it is planned
+            self.emit(EVENT_PLANNED, files=len(plan), pages=sum(entry['page_count'] for entry in plan),
+                      next_number=plan[-1]['bates_end'] + 1 if plan else self.current_number)
+            
+            entries = self.select_chunk(plan, chunk)
+            if chunk is not None:
+                self.logger.info(f"Executing chunk {chunk[0]}/{chunk[1]}: {len(entries)} of {len(plan)} files")
+            
+            # Skip files finished by an earlier, interrupted run of this production
+            completed = self.load_checkpoint()
+            skipped = {}
+            pending = []
+            for entry in entries:
+                record = completed.get(entry['rel_path'].as_posix())
+                if self.is_entry_complete(entry, record):
+                    skipped[entry['index']] = record
+                else:
+                    pending.append(entry)
+            if skipped:
+                self.logger.info(f"Skipping {len(entries) - len(pending)} files already completed")
+            self.restore_staged_files(pending)
+            
+            if executor is not None:
+                results = executor.map(execute_in_worker, pending)
+            else:
+                results = (self.execute_entry(entry) for entry in pending)
+            
+            # Commit results in Bates order
+            reused = 0
+            bytes_read = bytes_written = 0
+            files_done = pages_done = stamped = 0
+            pages_total = sum(entry['page_count'] for entry in entries)
+            results = iter(results)
+            with self.timed_phase('stamping'), open(self.checkpoint_path, 'a', encoding='utf-8') as journal:
+                self.emit(EVENT_PROGRESS, files_done=0, files_total=len(entries), pages_done=0,
+                          pages_total=pages_total, bytes_written=0)
+                for entry in entries:
+                    if self.cancel_event.is_set():
+                        # Everything committed so far is in the journal, so the run can be resumed
+                        self.cancelled = True
+                        self.logger.warning(f"Cancelled after {files_done} of {len(entries)} files; "
+                                            f"resume the production to finish it")
+                        self.emit(EVENT_CANCELLED, phase='stamping', files_done=files_done)
+                        break
+                    if entry['index'] in skipped:
+                        self.add_production_record(entry, skipped[entry['index']])
                     else:
-                        # For non-PDF files:
-                        if input_file.suffix.lower() == '.eml':
-                            # For EML files:
-                            # 1. Copy the original EML file with Bates number prefix
-                            original_new_filename = f"{bates_number}_{input_file.name}"
-                            original_target_path = target_dir / original_new_filename
-                            shutil.copy2(input_file, original_target_path)
-                            self.logger.info(f"Copied original EML file to: {original_target_path}")
-                            
-                            # 2. Create PDF version with the same Bates number
-                            pdf_filename = f"{bates_number}_{input_file.stem}.pdf"
-                            pdf_path = target_dir / pdf_filename
-                            
-                            # Convert to PDF
-                            converted_pdf = self.convert_to_pdf(input_file, target_dir)
-                            if not converted_pdf:
-                                self.logger.error(f"Failed to convert {input_file} to PDF")
-                                continue
-                                
-                            # Move the converted PDF to the final location with Bates number
-                            shutil.move(str(converted_pdf), str(pdf_path))
-                            
-                            # Add Bates stamps to the PDF
-                            if not self.add_bates_stamp(pdf_path, pdf_path, bates_number):
-                                self.move_to_issues(pdf_path, "Failed to apply Bates stamp")
-                                continue
+                        # With worker processes the file may already be done; this is when its turn comes
+                        self.emit(EVENT_FILE_STARTED, source=entry['source'], bates_number=entry['bates_number'])
+                        result = next(results)
+                        self.metrics.add_result(entry, result)
+                        stamped += 1
+                        bytes_read += result['bytes_read']
+                        bytes_written += result['bytes_written']
+                        if result['success']:
+                            self.record_checkpoint(journal, entry, result)
+                            self.add_production_record(entry, result)
+                            reused += result['reused']
+                            self.emit(EVENT_FILE_STAMPED, source=entry['source'], bates_begin=entry['bates_begin'],
+                                      bates_end=entry['bates_end'], pages=entry['page_count'],
+                                      bytes_written=result['bytes_written'], reused=result['reused'])
                         else:
-                            # For other non-PDF files:
-                            # 1. Copy the original file with Bates number prefix
-                            original_new_filename = f"{bates_number}_{input_file.name}"
-                            original_target_path = target_dir / original_new_filename
-                            shutil.copy2(input_file, original_target_path)
-                            self.logger.info(f"Copied original file to: {original_target_path}")
-                            
-                            # 2. Create PDF version with the same Bates number
-                            pdf_filename = f"{bates_number}_{input_file.stem}.pdf"
-                            pdf_path = target_dir / pdf_filename
-                            
-                            # Convert to PDF
-                            converted_pdf = self.convert_to_pdf(input_file, target_dir)
-                            if not converted_pdf:
-                                self.logger.error(f"Failed to convert {input_file} to PDF")
-                                continue
-                                
-                            # Move the converted PDF to the final location with Bates number
-                            shutil.move(str(converted_pdf), str(pdf_path))
-                            
-                            # Add Bates stamps to the PDF
-                            if not self.add_bates_stamp(pdf_path, pdf_path, bates_number):
-                                self.move_to_issues(pdf_path, "Failed to apply Bates stamp")
-                                continue
-
-                    # Mark file as processed
-                    processed_files.add(str(input_file))
-                    
-                except Exception as e:
-                    self.logger.error(f"Error processing {input_file}: {str(e)}")
-                    if 'target_path' in locals():
-                        self.move_to_issues(target_path, str(e))
-                    elif 'pdf_path' in locals():
-                        self.move_to_issues(pdf_path, str(e))
+                            if result['issue_path'] is not None and result['issue_path'].exists():
+                                self.move_to_issues(result['issue_path'], result['reason'])
+                            self.emit(EVENT_FILE_FAILED, source=entry['source'], phase='stamping',
+                                      reason=result['reason'])
+                    files_done += 1
+                    pages_done += entry['page_count']
+                    self.emit(EVENT_PROGRESS, files_done=files_done, files_total=len(entries),
+                              pages_done=pages_done, pages_total=pages_total, bytes_written=bytes_written)
+            if self.previous_output_dir is not None:
+                self.logger.info(f"Reused {reused} stamped files from {self.previous_output_dir}, "
+                                 f"stamped {len(pending) - reused} files")
+            # Worker processes keep their own counters, so totals come from the results
+            if executor is not None:
+                self.bytes_read += bytes_read
+                self.bytes_written += bytes_written
+            self.logger.info(f"I/O: read {bytes_read / 1048576:.1f} MB, wrote {bytes_written / 1048576:.1f} MB "
+                             f"copying and stamping {stamped} files")
+            
+            if plan and not self.cancelled:
+                self.current_number = plan[-1]['bates_end'] + 1
+            
+            # Only once every file is done: an interrupted run still needs the converted PDFs
+            # to resume, and so do other chunks or the resumed run of a cancelled one
+            if chunk is None and not self.cancelled and self.staging_dir.exists():
+                shutil.rmtree(self.staging_dir, ignore_errors=True)
 
         except Exception as e:
             self.logger.error(f"Error during file processing: {str(e)}")
             raise
+        finally:
+            if executor is not None:
+                # Files not yet started when the run was cancelled are dropped
+                executor.shutdown(cancel_futures=self.cancelled)
+            self.close_sandboxes()
 
     def generate_excel(self):
-        """Generate Excel report of processed files."""
+        """Generate Excel report of processed files from the production records.
+        
+        Rows are built one at a time, once to size the columns and again while
+        streaming them into a write-only workbook, so no copy of the report is
+        held in memory next to the production records.
+        """
         try:
             excel_path = self.output_dir / "bates_report.xlsx"
-            workbook = openpyxl.Workbook()
-            sheet = workbook.active
-            sheet.title = "Bates Report"
-
-            # Add headers
-            headers = ["Bates Number", "Original Filename", "Page Count", "Creation Date", "Processing Date"]
-            for col, header in enumerate(headers, 1):
-                sheet.cell(row=1, column=col, value=header)
-
-            # Add data
-            row = 2
-            for pdf_file in sorted(self.output_dir.glob("**/*.pdf")):
-                if "combined" not in pdf_file.name.lower():
-                    bates_match = re.search(rf"{self.prefix}\d+", pdf_file.name)
-                    bates_number = bates_match.group() if bates_match else "N/A"
-                    
-                    sheet.cell(row=row, column=1, value=bates_number)
-                    sheet.cell(row=row, column=2, value=pdf_file.name)
-                    sheet.cell(row=row, column=3, value=self.get_pdf_page_count(pdf_file))
-                    sheet.cell(row=row, column=4, value=datetime.fromtimestamp(pdf_file.stat().st_ctime).strftime('%Y-%m-%d'))
-                    sheet.cell(row=row, column=5, value=datetime.now().strftime('%Y-%m-%d'))
-                    row += 1
-
-            # Auto-adjust column widths
-            for column in sheet.columns:
-                max_length = 0
-                column = [cell for cell in column]
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = (max_length + 2)
-                sheet.column_dimensions[get_column_letter(column[0].column)].width = adjusted_width
+            workbook = openpyxl.Workbook(write_only=True)
+            sheet = workbook.create_sheet("Bates Report")
+
+            headers = ["Bates Begin", "Bates End", "Page Count", "Original Path", "File Type",
+                       "Extracted Date", "PDF Path", "SHA-256", "Parent Bates", "Processing Date"]
+            processing_date = datetime.now().strftime('%Y-%m-%d')
+            records = sorted(self.production_records, key=lambda r: r['bates_begin'])
+
+            def iter_rows():
+                for record in records:
+                    yield [
+                        record['bates_number'],
+                        self.format_bates(record['bates_end']),
+                        record['page_count'],
+                        record['rel_path'],
+                        record['file_type'],
+                        record['extracted_date'] or "",
+                        record['output_path'].relative_to(self.output_dir).as_posix(),
+                        record['source_hash'] or "",
+                        record['parent_bates'] or "",
+                        processing_date,
+                    ]
+
+            # Write-only sheets need their column widths before the first row
+            widths = [len(header) for header in headers]
+            for row in iter_rows():
+                for col, value in enumerate(row):
+                    widths[col] = max(widths[col], len(str(value)))
+            for col, width in enumerate(widths, 1):
+                sheet.column_dimensions[get_column_letter(col)].width = width + 2
+
+            header_cells = []
+            for header in headers:
+                cell = WriteOnlyCell(sheet, value=header)
+                cell.font = Font(bold=True)
+                header_cells.append(cell)
+            sheet.append(header_cells)
+            for row in iter_rows():
+                sheet.append(row)
 
             workbook.save(excel_path)
-            self.logger.info(f"Excel report generated: {excel_path}")
+            self.logger.info(f"Excel report generated: {excel_path} ({len(records)} files)")
 
         except Exception as e:
             self.logger.error(f"Error generating Excel report: {str(e)}")
             raise
 
-    def run(self):
-        """Run the Bates numbering process."""
+    def run(self, plan_only: bool = False, chunk: Tuple[int, int] = None):
+        """Run the Bates numbering process.
+        
+        With plan_only, only the planning phase runs and the manifest is written
+        for review. A processor created with from_manifest executes that
+        manifest instead of planning again; chunk limits execution to one slice
+        of it so a production can be split across machines.
+        
+        Phase and per-file timings are written to run_metrics.json and
+        summarized in the log however the run ends; with profile set the main
+        process is also profiled with cProfile.
+        """
+        self.metrics = RunMetrics()
+        profiler = None
+        if self.profile:
+            profiler = cProfile.Profile()
+            profiler.enable()
         try:
+            if plan_only:
+                executor = self.create_executor()
+                try:
+                    with self.timed_phase('planning'):
+                        plan = self.plan_production(executor)
+                finally:
+                    if executor is not None:
+                        executor.shutdown()
+                if self.cancel_event.is_set():
+                    self.cancelled = True
+                    self.logger.warning("Cancelled while planning; no manifest was written")
+                    self.emit(EVENT_CANCELLED, phase='planning', files_done=0)
+                    return
+                manifest_path = self.write_manifest(plan)
+                self.log_plan_summary(plan)
+                self.logger.info(f"Planning complete. Execute with --manifest {manifest_path}")
+                return
+            
+            plan = self.load_manifest(self.manifest_path) if self.manifest_path else None
+            
             # Process files
-            self.process_files()
+            self.process_files(plan, chunk)
+            
+            if self.cancelled:
+                self.logger.info(f"Processing cancelled. Output directory: {self.output_dir}")
+                return
+            
+            if chunk is not None:
+                self.logger.info(f"Chunk {chunk[0]}/{chunk[1]} complete. Output directory: {self.output_dir}")
+                return
             
             # Generate Excel report
-            self.generate_excel()
+            with self.timed_phase('report'):
+                self.generate_excel()
             
             # Create combined PDF
-            self.create_combined_pdf()
+            with self.timed_phase('combining'):
+                self.create_combined_pdf()
             
             self.logger.info(f"Processing complete. Output directory: {self.output_dir}")
             
         except Exception as e:
             self.logger.error(f"Error during processing: {str(e)}")
             raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self.write_profile(profiler)
+            self.write_run_metrics()
+
+    def write_run_metrics(self):
+        """Write run_metrics.json next to the log and log the run summary."""
+        try:
+            metrics_path = self.output_dir / METRICS_FILENAME
+            with open(metrics_path, 'w', encoding='utf-8') as f:
+                json.dump(self.metrics.to_dict(self.bytes_read, self.bytes_written), f, indent=2)
+            for line in self.metrics.get_summary_lines(self.bytes_read, self.bytes_written):
+                self.logger.info(line)
+            self.logger.info(f"Run metrics written: {metrics_path}")
+        except Exception as e:
+            # Metrics are informational and must never fail a production
+            self.logger.warning(f"Could not write run metrics: {str(e)}")
+
+    def write_profile(self, profiler: cProfile.Profile):
+        """Save the cProfile statistics of the run and log its most expensive functions.
+        
+        Worker processes are not profiled; run with one worker to see
+        conversion and stamping in the profile.
+        """
+        try:
+            profile_path = self.output_dir / PROFILE_FILENAME
+            profiler.dump_stats(str(profile_path))
+            report = io.StringIO()
+            pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+            self.logger.info(f"Profile written: {profile_path} (open with python -m pstats)\n{report.getvalue()}")
+        except Exception as e:
+            self.logger.warning(f"Could not write profile: {str(e)}")
 
     def get_pdf_files(self) -> List[Tuple[Path, Path]]:
         """Get all PDF files and convertible files in the input directory and its subdirectories.
@@ -1368,6 +3809,164 @@ class EnhancedBatesNumbering:
         except Exception as e:
             self.logger.error(f"Error moving {file_path} to issues folder: {str(e)}")
 
+class ProductionQueue:
+    """Runs several directory productions back to back or side by side.
+
+    Each job is a dictionary of EnhancedBatesNumbering arguments (input_dir,
+    output_dir, prefix, start and any stamp or conversion settings). A job
+    with chain_start set is numbered from the number after the previous job's
+    last Bates number instead of its own start; it waits for that job's plan,
+    not for the whole job. Up to concurrent_jobs jobs run at once and share
+    worker_budget worker processes between them.
+    """
+
+    def __init__(self, jobs: List[Dict], worker_budget: int = 1, concurrent_jobs: int = 1):
+        for number, job in enumerate(jobs, 1):
+            if not job.get('input_dir') or not job.get('output_dir'):
+                raise ValueError(f"Job {number} needs an input_dir and an output_dir")
+        self.jobs = [dict(job) for job in jobs]
+        self.worker_budget = max(1, worker_budget)
+        self.concurrent_jobs = max(1, min(concurrent_jobs, len(self.jobs) or 1))
+        self.results = []
+        self.processors = {}
+        self.lock = threading.Lock()
+        self.output_dirs = set()
+        self.listeners = []
+        self.cancel_event = threading.Event()
+        self.cancelled = False
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_job_file(cls, job_file: str, worker_budget: int = 1, concurrent_jobs: int = 1) -> 'ProductionQueue':
+        """Read jobs from a JSON file.
+        
+        The file holds a list of jobs, or an object with a "jobs" list and
+        optional "defaults" that every job starts from.
+        """
+        with open(job_file, 'r', encoding='utf-8') as f:
+            content = json.load(f)
+        if isinstance(content, list):
+            content = {'jobs': content}
+        defaults = content.get('defaults', {})
+        return cls([{**defaults, **job} for job in content['jobs']], worker_budget, concurrent_jobs)
+
+    def cancel(self):
+        """Stop the running jobs after the file each is committing and skip the rest."""
+        self.cancel_event.set()
+        with self.lock:
+            for processor in self.processors.values():
+                processor.cancel()
+
+    def add_listener(self, listener):
+        """Call listener with the events of every job, each tagged with its job number."""
+        self.listeners.append(listener)
+
+    def emit(self, kind: str, **fields):
+        """Pass a queue event to the listeners."""
+        if self.listeners:
+            self.relay(ProductionEvent(kind, fields))
+
+    def relay(self, event: ProductionEvent):
+        for listener in self.listeners:
+            listener(event)
+
+    def make_output_dir(self, job: Dict) -> Path:
+        """Pick the timestamped output folder of a job, unique among the jobs of this queue."""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        base = Path(job['output_dir']) / f"BATES_{job['prefix']}_{timestamp}"
+        output_dir = base
+        with self.lock:
+            # Jobs with the same prefix and destination may start within the same second
+            suffix = 2
+            while output_dir in self.output_dirs or output_dir.exists():
+                output_dir = base.with_name(f"{base.name}_{suffix}")
+                suffix += 1
+            self.output_dirs.add(output_dir)
+        return output_dir
+
+    def run_job(self, number: int, next_numbers: List[Future]) -> Dict:
+        """Run one job and return its outcome."""
+        job = dict(self.jobs[number - 1])
+        planned = next_numbers[number - 1]
+        chain_start = job.pop('chain_start', False) and number > 1
+        job['prefix'] = job.get('prefix', '').rstrip('_')
+        result = {'job': number, 'input_dir': job['input_dir'], 'prefix': job['prefix'],
+                  'output_dir': None, 'status': 'failed', 'first_number': None, 'next_number': None,
+                  'error': None}
+        try:
+            if self.cancel_event.is_set():
+                result['status'] = 'cancelled'
+                return result
+            self.emit(EVENT_JOB_STARTED, job=number)
+            if chain_start:
+                try:
+                    job['start'] = next_numbers[number - 2].result()
+                except Exception as e:
+                    raise RuntimeError(f"Cannot chain from job {number - 1}: {str(e)}")
+            # Jobs running side by side split the worker budget; a job may ask for fewer
+            share = max(1, self.worker_budget // self.concurrent_jobs)
+            job['workers'] = max(1, min(int(job.get('workers', share)), share))
+            
+            processor = EnhancedBatesNumbering(**{**job, 'output_dir': str(self.make_output_dir(job)),
+                                                  'timestamp_output': False})
+            result['output_dir'] = str(processor.output_dir)
+            result['first_number'] = processor.start
+            
+            def on_event(event):
+                if event.kind == EVENT_PLANNED and not planned.done():
+                    planned.set_result(event['next_number'])
+                if self.listeners:
+                    event.fields['job'] = number
+                    self.relay(event)
+            processor.add_listener(on_event)
+            
+            with self.lock:
+                self.processors[number] = processor
+                if self.cancel_event.is_set():
+                    processor.cancel()
+            try:
+                processor.run()
+            finally:
+                with self.lock:
+                    del self.processors[number]
+            
+            if processor.cancelled:
+                result['status'] = 'cancelled'
+            else:
+                result['status'] = 'complete'
+                result['next_number'] = processor.current_number
+        except Exception as e:
+            result['error'] = str(e)
+            self.logger.error(f"Job {number} ({job['input_dir']}) failed: {str(e)}")
+        finally:
+            # A job chained to this one must not wait forever
+            if not planned.done():
+                planned.set_exception(RuntimeError(f"job {number} was {result['status']} before it was planned"))
+            self.emit(EVENT_JOB_FINISHED, job=number, status=result['status'])
+        return result
+
+    def run(self) -> List[Dict]:
+        """Run every job and return their outcomes in job order."""
+        self.logger.info(f"Running {len(self.jobs)} jobs, {self.concurrent_jobs} at a time "
+                         f"with {self.worker_budget} worker processes")
+        next_numbers = [Future() for _ in self.jobs]
+        # Jobs start in order, so the job a chained job waits for has always started
+        with ThreadPoolExecutor(max_workers=self.concurrent_jobs) as executor:
+            self.results = list(executor.map(lambda number: self.run_job(number, next_numbers),
+                                             range(1, len(self.jobs) + 1)))
+        self.cancelled = self.cancel_event.is_set()
+        
+        for result in self.results:
+            summary = f"Job {result['job']} ({result['input_dir']}): {result['status']}"
+            if result['status'] == 'complete' and result['next_number'] > result['first_number']:
+                summary += f", Bates {result['first_number']}-{result['next_number'] - 1}"
+            if result['output_dir']:
+                summary += f", output {result['output_dir']}"
+            if result['error']:
+                summary += f" ({result['error']})"
+            self.logger.info(summary)
+        return self.results
+
 class BatesGUI:
     def __init__(self):
         if HAS_TKINTERDND:
@@ -1392,6 +3991,8 @@ class BatesGUI:
         self.prefix = tk.StringVar(value="ABC")  # Default prefix
         self.digits = tk.IntVar(value=5)  # Default to 5 digits
         self.start_number = tk.IntVar(value=1)  # Default starting number
+        self.workers = tk.IntVar(value=1)  # Default to a single worker process
+        self.volume_size_mb = tk.IntVar(value=COMBINED_VOLUME_MAX_MB)  # 0 for a single combined PDF
         
         # Stamp appearance settings
         self.stamp_x = tk.DoubleVar(value=0.97)  # Default 97% from left (3% from right)
@@ -1406,6 +4007,16 @@ class BatesGUI:
         self.processing = False
         self.last_directory = str(Path.home())  # Initialize with home directory
         
+        # Productions run on a worker thread; progress and outcomes come back on this queue
+        self.events = queue.Queue()
+        self.processor = None
+        self.stamping_started = {}
+        
+        # Directory productions waiting in the Queue tab
+        self.queue_jobs = []
+        self.chain_start = tk.BooleanVar(value=False)
+        self.concurrent_jobs = tk.IntVar(value=1)
+        
         # Set default input directory
         default_dir = Path('~/Desktop')
         if default_dir.exists():
@@ -1426,6 +4037,8 @@ class BatesGUI:
         # Setup drag and drop after widgets are created
         if HAS_TKINTERDND:
             self.setup_drag_drop()
+        
+        self.root.after(GUI_POLL_INTERVAL_MS, self.poll_events)
             
     def create_widgets(self):
         # Main container with padding
@@ -1444,12 +4057,19 @@ class BatesGUI:
         self.file_tab = ttk.Frame(self.notebook)
         self.notebook.add(self.file_tab, text="File")
         
+        # Create Queue Tab
+        self.queue_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.queue_tab, text="Queue")
+        
         # Create Directory Tab Content
         self.create_directory_tab()
         
         # Create File Tab Content
         self.create_file_tab()
         
+        # Create Queue Tab Content
+        self.create_queue_tab()
+        
         # Create Common Settings Frame (at bottom)
         self.create_common_settings()
         
@@ -1509,6 +4129,11 @@ class BatesGUI:
                                          command=self.start_processing)
         self.stamp_dir_button.pack(expand=True)
         
+        # Resume Button for interrupted productions
+        self.resume_button = ttk.Button(stamp_dir_frame, text="Resume Run",
+                                      command=self.resume_processing)
+        self.resume_button.pack(expand=True, pady=(5, 0))
+        
     def create_file_tab(self):
         # File Tab Content
         file_frame = ttk.Frame(self.file_tab, padding="5")
@@ -1565,6 +4190,44 @@ class BatesGUI:
                                           command=self.stamp_single_file)
         self.stamp_file_button.pack(expand=True)
         
+    def create_queue_tab(self):
+        # Queue Tab Content
+        queue_frame = ttk.Frame(self.queue_tab, padding="5")
+        queue_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Jobs waiting to run, in order
+        jobs_frame = ttk.LabelFrame(queue_frame, text="Jobs", padding="5")
+        jobs_frame.pack(fill=tk.BOTH, expand=True, pady=5)
+        columns = ('source', 'destination', 'prefix', 'start', 'status')
+        self.queue_tree = ttk.Treeview(jobs_frame, columns=columns, show='headings', height=6)
+        for column, heading, width in zip(columns, ("Source", "Destination", "Prefix", "Start", "Status"),
+                                          (350, 350, 80, 120, 100)):
+            self.queue_tree.heading(column, text=heading)
+            self.queue_tree.column(column, width=width)
+        self.queue_tree.pack(fill=tk.BOTH, expand=True)
+        
+        # Queue editing
+        edit_frame = ttk.Frame(queue_frame)
+        edit_frame.pack(fill=tk.X, pady=5)
+        ttk.Button(edit_frame, text="Add Directory Settings",
+                  command=self.add_queue_job).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Checkbutton(edit_frame, text="Chain start number from previous job",
+                       variable=self.chain_start).pack(side=tk.LEFT, padx=5)
+        ttk.Button(edit_frame, text="Remove Selected",
+                  command=self.remove_queue_jobs).pack(side=tk.LEFT, padx=5)
+        ttk.Button(edit_frame, text="Clear",
+                  command=self.clear_queue).pack(side=tk.LEFT, padx=5)
+        ttk.Label(edit_frame, text="Jobs at once:").pack(side=tk.LEFT, padx=(15, 2))
+        ttk.Spinbox(edit_frame, from_=1, to=os.cpu_count() or 1, textvariable=self.concurrent_jobs,
+                   width=5, format="%0.0f").pack(side=tk.LEFT)
+        
+        # Run Queue Button
+        run_queue_frame = ttk.Frame(queue_frame)
+        run_queue_frame.pack(fill=tk.X, pady=5)
+        self.run_queue_button = ttk.Button(run_queue_frame, text="Run Queue",
+                                         command=self.run_queue)
+        self.run_queue_button.pack(expand=True)
+        
     def create_common_settings(self):
         # Common Settings Frame
         settings_frame = ttk.LabelFrame(self.main_frame, text="Settings", padding="5")
@@ -1611,6 +4274,24 @@ class BatesGUI:
                                      width=5, format="%0.1f", increment=0.1)
         self.box_spinbox.pack(side=tk.LEFT)
         
+        # Worker processes
+        workers_frame = ttk.Frame(base_frame)
+        workers_frame.pack(fill=tk.X, pady=2)
+        ttk.Label(workers_frame, text="Workers:", width=8).pack(side=tk.LEFT)
+        self.workers_spinbox = ttk.Spinbox(workers_frame, from_=1, to=os.cpu_count() or 1,
+                                         textvariable=self.workers,
+                                         width=5, format="%0.0f")
+        self.workers_spinbox.pack(side=tk.LEFT)
+        
+        # Combined PDF volume size (0 for a single file)
+        volume_frame = ttk.Frame(base_frame)
+        volume_frame.pack(fill=tk.X, pady=2)
+        ttk.Label(volume_frame, text="Volume MB:", width=8).pack(side=tk.LEFT)
+        self.volume_spinbox = ttk.Spinbox(volume_frame, from_=0, to=10000, increment=50,
+                                        textvariable=self.volume_size_mb,
+                                        width=5, format="%0.0f")
+        self.volume_spinbox.pack(side=tk.LEFT)
+        
         # Center Column - Stamp Appearance
         appearance_frame = ttk.LabelFrame(columns_frame, text="Stamp Appearance", padding="5")
         appearance_frame.pack(side=tk.LEFT, fill=tk.Y, padx=5)
@@ -1683,6 +4364,17 @@ class BatesGUI:
         self.status_label = ttk.Label(self.main_frame, text="Ready", justify=tk.CENTER)
         self.status_label.pack(pady=5)
         
+        # Progress of the running production
+        progress_frame = ttk.Frame(self.main_frame)
+        progress_frame.pack(fill=tk.X, padx=5)
+        self.progress_bar = ttk.Progressbar(progress_frame, mode='determinate', maximum=1.0)
+        self.progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.cancel_button = ttk.Button(progress_frame, text="Cancel", command=self.cancel_processing)
+        self.cancel_button.pack(side=tk.LEFT, padx=(5, 0))
+        self.cancel_button.state(['disabled'])
+        self.progress_label = ttk.Label(self.main_frame, text="", justify=tk.CENTER)
+        self.progress_label.pack(pady=(2, 5))
+        
     def handle_mouse_wheel(self, event):
         """Handle mouse wheel events for the spinboxes."""
         widget = event.widget
@@ -1914,10 +4606,6 @@ class BatesGUI:
         if self.processing:
             return
             
-        self.processing = True
-        self.stamp_dir_button.state(['disabled'])
-        self.status_label.config(text="Processing...")
-        
         try:
             # Clean up prefix (remove trailing underscore if present)
             prefix = self.prefix.get().rstrip('_')
@@ -1930,30 +4618,137 @@ class BatesGUI:
             processor = EnhancedBatesNumbering(
                 input_dir=self.input_dir.get(),
                 output_dir=str(output_dir),  # Use the new timestamped directory
-                prefix=prefix,
-                zero_pad_length=self.digits.get(),
-                start=self.start_number.get(),
-                stamp_x=self.stamp_x.get(),
-                stamp_y=self.stamp_y.get(),
-                stamp_color=self.stamp_color.get(),
-                stamp_box_width=self.stamp_box_width.get(),
-                stamp_position=self.stamp_position.get(),
-                stamp_x_offset=self.stamp_x_offset.get(),
-                stamp_y_offset=self.stamp_y_offset.get(),
-                stamp_opacity=self.stamp_opacity.get()
+                timestamp_output=False,  # The manifest goes straight into it, where Resume Run looks
+                workers=self.workers.get(),
+                **self.get_production_settings()
             )
-            processor.run()
-            messagebox.showinfo("Success", "Processing completed successfully!")
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+            return
+        
+        self.status_label.config(text="Processing...")
+        self.run_in_background(processor, processor.run,
+                               lambda result: self.show_production_result(processor, str(output_dir)),
+                               [self.stamp_dir_button, self.resume_button])
+            
+    def get_production_settings(self) -> Dict:
+        """Numbering and stamp settings of a directory production, as EnhancedBatesNumbering arguments."""
+        return {
+            # Clean up prefix (remove trailing underscore if present)
+            'prefix': self.prefix.get().rstrip('_'),
+            'zero_pad_length': self.digits.get(),
+            'start': self.start_number.get(),
+            'stamp_x': self.stamp_x.get(),
+            'stamp_y': self.stamp_y.get(),
+            'stamp_color': self.stamp_color.get(),
+            'stamp_box_width': self.stamp_box_width.get(),
+            'stamp_position': self.stamp_position.get(),
+            'stamp_x_offset': self.stamp_x_offset.get(),
+            'stamp_y_offset': self.stamp_y_offset.get(),
+            'stamp_opacity': self.stamp_opacity.get(),
+            'volume_max_bytes': self.volume_size_mb.get() * 1024 * 1024,
+        }
+            
+    def add_queue_job(self):
+        """Queue a production of the Directory tab's folders with the current settings."""
+        if not self.input_dir.get():
+            messagebox.showerror("Error", "Please select a source directory on the Directory tab")
+            return
+        job = {
+            'input_dir': self.input_dir.get(),
+            'output_dir': self.output_dir.get() or self.input_dir.get(),
+            'chain_start': self.chain_start.get() and bool(self.queue_jobs),
+            **self.get_production_settings()
+        }
+        self.queue_jobs.append(job)
+        self.queue_tree.insert('', tk.END, iid=str(len(self.queue_jobs)), values=(
+            job['input_dir'], job['output_dir'], job['prefix'],
+            "after previous" if job['chain_start'] else job['start'], "Waiting"))
+            
+    def remove_queue_jobs(self):
+        """Drop the selected jobs from the queue."""
+        if self.processing:
+            return
+        selected = {int(item) - 1 for item in self.queue_tree.selection()}
+        jobs = [job for number, job in enumerate(self.queue_jobs) if number not in selected]
+        self.clear_queue()
+        for job in jobs:
+            self.queue_jobs.append(job)
+            self.queue_tree.insert('', tk.END, iid=str(len(self.queue_jobs)), values=(
+                job['input_dir'], job['output_dir'], job['prefix'],
+                "after previous" if job['chain_start'] else job['start'], "Waiting"))
+            
+    def clear_queue(self):
+        """Remove every job from the queue."""
+        if self.processing:
+            return
+        self.queue_jobs = []
+        self.queue_tree.delete(*self.queue_tree.get_children())
+            
+    def run_queue(self):
+        """Run the queued productions within the worker budget set by Workers."""
+        if self.processing:
+            return
+        if not self.queue_jobs:
+            messagebox.showerror("Error", "Add at least one job to the queue")
+            return
+        
+        production_queue = ProductionQueue(self.queue_jobs, worker_budget=self.workers.get(),
+                                           concurrent_jobs=self.concurrent_jobs.get())
+        for item in self.queue_tree.get_children():
+            self.queue_tree.set(item, 'status', "Waiting")
+        self.status_label.config(text="Running queue...")
+        self.run_in_background(production_queue, production_queue.run, self.show_queue_result,
+                               [self.run_queue_button, self.stamp_dir_button, self.resume_button])
+            
+    def show_queue_result(self, results: List[Dict]):
+        """Summarize how the queued productions ended."""
+        complete = [result for result in results if result['status'] == 'complete']
+        lines = [f"{len(complete)} of {len(results)} jobs completed."]
+        for result in results:
+            if result['status'] != 'complete':
+                line = f"Job {result['job']} ({result['input_dir']}): {result['status']}"
+                lines.append(f"{line} - {result['error']}" if result['error'] else line)
+        if len(complete) == len(results):
+            messagebox.showinfo("Success", "\n".join(lines))
+        else:
+            messagebox.showwarning("Queue", "\n".join(lines))
+        if complete:
+            self.open_output_folder(str(Path(complete[-1]['output_dir']).parent))
+            
+    def resume_processing(self):
+        """Resume an interrupted directory production."""
+        if self.processing:
+            return
             
-            # Open output folder
-            self.open_output_folder(str(output_dir))
+        folder_path = filedialog.askdirectory(
+            title="Select Interrupted Production Folder",
+            initialdir=self.last_directory
+        )
+        if not folder_path:
+            return
             
+        try:
+            processor = EnhancedBatesNumbering.resume(folder_path, workers=self.workers.get())
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
-        finally:
-            self.processing = False
-            self.stamp_dir_button.state(['!disabled'])
-            self.status_label.config(text="Ready")
+            return
+        
+        self.status_label.config(text="Resuming...")
+        self.run_in_background(processor, processor.run,
+                               lambda result: self.show_production_result(processor, folder_path),
+                               [self.stamp_dir_button, self.resume_button])
+            
+    def show_production_result(self, processor, output_dir: str):
+        """Tell the user how a directory production ended."""
+        if processor.cancelled:
+            messagebox.showinfo("Cancelled", "Processing was cancelled. Files already stamped are kept; "
+                                f"use Resume Run on {output_dir} to finish the production.")
+            return
+        messagebox.showinfo("Success", "Processing completed successfully!")
+        
+        # Open output folder
+        self.open_output_folder(output_dir)
             
     def stamp_single_file(self):
         """Process a single file for Bates stamping."""
@@ -1964,10 +4759,6 @@ class BatesGUI:
         if self.processing:
             return
             
-        self.processing = True
-        self.stamp_file_button.state(['disabled'])
-        self.status_label.config(text="Processing...")
-        
         try:
             input_file = Path(self.input_file.get())
             output_dir = Path(self.file_output_dir.get())
@@ -1989,35 +4780,165 @@ class BatesGUI:
                 stamp_y_offset=self.stamp_y_offset.get(),
                 stamp_opacity=self.stamp_opacity.get()
             )
-            
-            # Process just this file
+        except Exception as e:
+            self.status_label.config(text=f"Error: {str(e)}")
+            return
+        
+        def stamp():
+            # Returns the status message and whether there is output to show
             if input_file.suffix.lower() == '.pdf':
-                bates_number = f"{processor.prefix}{str(processor.current_number).zfill(processor.zero_pad_length)}"
-                output_pdf = output_dir / f"{bates_number}_{input_file.name}"
-                if processor.add_bates_stamp(input_file, output_pdf, bates_number):
-                    self.status_label.config(text=f"File stamped successfully: {output_pdf.name}")
-                    self.open_output_folder(str(output_dir))
-                else:
-                    self.status_label.config(text="File was copied to _FILES WITH ISSUES folder due to stamping issues")
+                pdf_path = input_file
+                success_text = "File stamped successfully"
             else:
                 # Convert to PDF first
                 pdf_path = processor.convert_to_pdf(input_file, output_dir)
-                if pdf_path:
-                    bates_number = f"{processor.prefix}{str(processor.current_number).zfill(processor.zero_pad_length)}"
-                    output_pdf = output_dir / f"{bates_number}_{pdf_path.name}"
-                    if processor.add_bates_stamp(pdf_path, output_pdf, bates_number):
-                        self.status_label.config(text=f"File converted and stamped successfully: {output_pdf.name}")
-                        self.open_output_folder(str(output_dir))
-                    else:
-                        self.status_label.config(text="File was copied to _FILES WITH ISSUES folder due to stamping issues")
+                if not pdf_path:
+                    return "Could not convert file to PDF", False
+                success_text = "File converted and stamped successfully"
+            bates_number = f"{processor.prefix}{str(processor.current_number).zfill(processor.zero_pad_length)}"
+            output_pdf = output_dir / f"{bates_number}_{pdf_path.name}"
+            if processor.add_bates_stamp(pdf_path, output_pdf, bates_number):
+                return f"{success_text}: {output_pdf.name}", True
+            return "File was copied to _FILES WITH ISSUES folder due to stamping issues", False
+        
+        def show_result(result):
+            message, stamped = result
+            self.status_label.config(text=message)
+            if stamped:
+                self.open_output_folder(str(output_dir))
+        
+        self.status_label.config(text="Processing...")
+        self.run_in_background(processor, stamp, show_result, [self.stamp_file_button], cancellable=False)
+            
+    def run_in_background(self, processor, task, on_success, buttons, cancellable=True):
+        """Run task on a worker thread so the window stays responsive.
+        
+        The processor reports progress through the event queue, and the outcome
+        is queued as well, so every widget is still only touched from the Tk
+        thread by poll_events. on_success gets the task's return value.
+        """
+        self.processing = True
+        self.processor = processor
+        for button in buttons:
+            button.state(['disabled'])
+        if cancellable:
+            self.cancel_button.state(['!disabled'])
+        self.stamping_started = {}
+        self.progress_bar.config(mode='indeterminate')
+        self.progress_bar.start()
+        
+        processor.add_listener(lambda event: self.events.put(('event', event)))
+        
+        def work():
+            try:
+                self.events.put(('done', task(), on_success, buttons))
+            except Exception as e:
+                self.events.put(('error', e, None, buttons))
+        
+        # A daemon thread does not keep a closed window's process alive; the journal allows a resume
+        threading.Thread(target=work, name="bates-production", daemon=True).start()
+            
+    def cancel_processing(self):
+        """Stop the running production after the file it is committing."""
+        if self.processor is None:
+            return
+        self.processor.cancel()
+        self.cancel_button.state(['disabled'])
+        self.status_label.config(text="Cancelling after the current file...")
+            
+    def poll_events(self):
+        """Apply the events queued by the worker thread since the last poll."""
+        latest = None
+        try:
+            while True:
+                item = self.events.get_nowait()
+                if item[0] == 'event' and item[1].kind == EVENT_PROGRESS:
+                    # Only the newest counters are drawn
+                    latest = item[1]
+                    continue
+                if latest is not None:
+                    self.show_progress(latest)
+                    latest = None
+                if item[0] == 'event':
+                    self.handle_event(item[1])
                 else:
-                    self.status_label.config(text="Could not convert file to PDF")
+                    self.finish_background(*item)
+        except queue.Empty:
+            pass
+        if latest is not None:
+            self.show_progress(latest)
+        self.root.after(GUI_POLL_INTERVAL_MS, self.poll_events)
             
-        except Exception as e:
-            self.status_label.config(text=f"Error: {str(e)}")
-        finally:
-            self.processing = False
-            self.stamp_file_button.state(['!disabled'])
+    def handle_event(self, event: ProductionEvent):
+        """Show phase changes and queue job status; per-file events only feed the counters."""
+        if event.kind in (EVENT_JOB_STARTED, EVENT_JOB_FINISHED):
+            status = "Running" if event.kind == EVENT_JOB_STARTED else event['status'].capitalize()
+            self.queue_tree.set(str(event['job']), 'status', status)
+            return
+        if event.kind != EVENT_PHASE_STARTED:
+            return
+        
+        phase = event['phase']
+        if phase == 'stamping':
+            # Rates and ETA are per production, so queued jobs side by side each keep their own start
+            self.stamping_started[event.get('job')] = time.monotonic()
+        if not self.processor.cancel_event.is_set():
+            status = {
+                'discovery': "Finding files...",
+                'planning': "Converting and counting pages...",
+                'stamping': "Stamping...",
+                'report': "Writing the production report...",
+                'combining': "Combining PDFs...",
+            }.get(phase, "Processing...")
+            if event.get('job') is not None:
+                status = f"Job {event['job']} of {len(self.processor.jobs)}: {status}"
+            self.status_label.config(text=status)
+        if phase != 'stamping':
+            if str(self.progress_bar.cget('mode')) != 'indeterminate':
+                self.progress_bar.config(mode='indeterminate')
+                self.progress_bar.start()
+            self.progress_label.config(text="")
+            
+    def show_progress(self, event: ProductionEvent):
+        """Update the progress bar and the counters line."""
+        if str(self.progress_bar.cget('mode')) != 'determinate':
+            self.progress_bar.stop()
+            self.progress_bar.config(mode='determinate')
+        pages_done, pages_total = event['pages_done'], event['pages_total']
+        self.progress_bar['value'] = pages_done / pages_total if pages_total else 0
+        
+        elapsed = time.monotonic() - self.stamping_started.get(event.get('job'), time.monotonic())
+        rate = pages_done / elapsed if elapsed > 0 else 0
+        details = [
+            f"{event['files_done']:,} of {event['files_total']:,} files",
+            f"{pages_done:,} of {pages_total:,} pages",
+            f"{event['bytes_written'] / (1024 * 1024):,.1f} MB written",
+            f"{rate:,.1f} pages/sec",
+        ]
+        if rate > 0:
+            remaining = int((pages_total - pages_done) / rate)
+            details.append(f"ETA {remaining // 3600}:{remaining // 60 % 60:02d}:{remaining % 60:02d}")
+        if event.get('job') is not None:
+            details.insert(0, f"Job {event['job']}")
+        self.progress_label.config(text="  |  ".join(details))
+            
+    def finish_background(self, outcome: str, result, on_success, buttons):
+        """Reset the controls after a background task and report its outcome."""
+        self.processing = False
+        self.processor = None
+        self.progress_bar.stop()
+        self.progress_bar.config(mode='determinate')
+        self.progress_bar['value'] = 0
+        self.progress_label.config(text="")
+        self.cancel_button.state(['disabled'])
+        for button in buttons:
+            button.state(['!disabled'])
+        self.status_label.config(text="Ready")
+        
+        if outcome == 'error':
+            messagebox.showerror("Error", f"An error occurred: {str(result)}")
+        else:
+            on_success(result)
             
     def open_output_folder(self, custom_output_dir=None):
         """Open the output folder in the system's file explorer."""
@@ -2033,33 +4954,171 @@ class BatesGUI:
     def run(self):
         self.root.mainloop()
 
+def run_with_listeners(target, run, events_path: str = None, show_progress: bool = True):
+    """Call run with the command line's event log and progress bar attached to target.
+    
+    target is a processor or a ProductionQueue. The bar is only drawn on a
+    terminal; while it is, the console only shows warnings and errors, printed
+    above the bar, and the full log is in the production's log file.
+    """
+    events_file = None
+    if events_path:
+        events_file = sys.stdout if events_path == '-' else open(events_path, 'a', encoding='utf-8')
+        target.add_listener(JsonLinesEventWriter(events_file))
+    show_progress = show_progress and sys.stderr.isatty()
+    if show_progress:
+        target.add_listener(TqdmProgressListener())
+    try:
+        if show_progress:
+            with logging_redirect_tqdm():
+                # The redirecting handlers only live as long as this block
+                for handler in logging.getLogger().handlers:
+                    handler.setLevel(logging.WARNING)
+                return run()
+        return run()
+    finally:
+        if events_file is not None and events_file is not sys.stdout:
+            events_file.close()
+
 def main():
     if len(sys.argv) > 1:
         # Command line mode
         parser = argparse.ArgumentParser(description='Enhanced Bates Numbering Utility')
-        parser.add_argument('input_path', help='Input file or directory')
-        parser.add_argument('output_dir', help='Directory for processed files')
+        parser.add_argument('input_path', nargs='?', help='Input file or directory')
+        parser.add_argument('output_dir', nargs='?', help='Directory for processed files')
         parser.add_argument('--prefix', default='', help='Prefix for Bates numbers')
         parser.add_argument('--zero-pad', type=int, default=5, 
                           help='Number of zeros to pad Bates numbers (default: 5)')
         parser.add_argument('--start', type=int, default=1, 
                           help='Starting number for Bates numbering')
+        parser.add_argument('--workers', type=int, default=1,
+                          help='Number of worker processes for conversion and stamping (default: 1)')
+        parser.add_argument('--volume-size-mb', type=float, default=COMBINED_VOLUME_MAX_MB,
+                          help='Split the combined PDF into volumes of at most this many MB, 0 for a single '
+                               f'combined PDF of any size (default: {COMBINED_VOLUME_MAX_MB})')
+        parser.add_argument('--volume-pages', type=int, default=0,
+                          help='Split the combined PDF into volumes of at most this many pages (default: no limit)')
+        parser.add_argument('--office-instances', type=int, default=None,
+                          help='Number of warm LibreOffice instances for office documents (default: --workers)')
+        parser.add_argument('--conversion-timeout', type=int, default=300,
+                          help='Seconds allowed to convert one document before it is stopped (default: 300)')
+        parser.add_argument('--conversion-memory-mb', type=int, default=2048,
+                          help='Memory allowed to convert one spreadsheet, image or email, 0 for no limit '
+                               '(default: 2048)')
+        parser.add_argument('--no-conversion-isolation', action='store_true',
+                          help='Convert spreadsheets, images and emails in the worker itself, without '
+                               'a timeout or memory limit')
+        parser.add_argument('--batch-conversion', action='store_true',
+                          help='Convert office documents in batches with one LibreOffice call per batch')
+        parser.add_argument('--conversion-cache', metavar='DIR',
+                          help='Keep converted PDFs in DIR and reuse them for identical source files')
+        parser.add_argument('--conversion-cache-size-mb', type=int, default=2048,
+                          help='Size cap of the conversion cache in MB (default: 2048)')
+        parser.add_argument('--image-dpi', type=int, default=300,
+                          help='Downsample converted images scanned above this resolution (default: 300)')
+        parser.add_argument('--no-extract-dates', action='store_true',
+                          help='Do not read document dates from PDF metadata and text for the report')
+        parser.add_argument('--plan-only', action='store_true',
+                          help='Only plan the production and write its manifest')
+        parser.add_argument('--manifest', help='Execute a previously written production manifest')
+        parser.add_argument('--chunk', help='Execute only chunk I of N of the manifest, e.g. 2/4')
+        parser.add_argument('--incremental', metavar='PREVIOUS_OUTPUT_DIR',
+                          help='Reuse stamped files from a previous production of the same input for unchanged files')
+        parser.add_argument('--resume', metavar='OUTPUT_DIR',
+                          help='Resume an interrupted production in its BATES_<prefix>_<timestamp> directory')
+        parser.add_argument('--jobs', metavar='JOB_FILE',
+                          help='Run the productions listed in a JSON job file; --workers is shared between them')
+        parser.add_argument('--concurrent-jobs', type=int, default=1,
+                          help='Number of job-file productions run at the same time (default: 1)')
+        parser.add_argument('--events', metavar='FILE',
+                          help='Append every production event to FILE as JSON lines ("-" for stdout)')
+        parser.add_argument('--no-progress', action='store_true',
+                          help='Do not draw a progress bar on the terminal')
+        parser.add_argument('--profile', action='store_true',
+                          help='Profile the run with cProfile and save run_profile.prof in the output directory')
         
         args = parser.parse_args()
         
+        chunk = None
+        if args.chunk:
+            try:
+                number, total = (int(part) for part in args.chunk.split('/'))
+                chunk = (number, total)
+            except ValueError:
+                parser.error("--chunk must look like I/N, e.g. 2/4")
+        
+        if args.jobs:
+            # Several productions, each with its own settings, within one worker budget
+            logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+            production_queue = ProductionQueue.from_job_file(args.jobs, worker_budget=args.workers,
+                                                             concurrent_jobs=args.concurrent_jobs)
+            results = run_with_listeners(production_queue, production_queue.run, args.events,
+                                         not args.no_progress)
+            if any(result['status'] != 'complete' for result in results):
+                sys.exit(1)
+            return
+        
+        conversion_options = {
+            'office_instances': args.office_instances,
+            'conversion_timeout': args.conversion_timeout,
+            'batch_conversion': args.batch_conversion,
+            'conversion_cache_dir': args.conversion_cache,
+            'conversion_cache_max_bytes': args.conversion_cache_size_mb * 1024 * 1024,
+            'image_max_dpi': args.image_dpi,
+            'conversion_memory_mb': args.conversion_memory_mb,
+            'isolate_conversions': not args.no_conversion_isolation,
+        }
+        # Conversion options given on the command line override those saved in a manifest
+        option_args = {
+            'office_instances': 'office_instances', 'conversion_timeout': 'conversion_timeout',
+            'batch_conversion': 'batch_conversion', 'conversion_cache_dir': 'conversion_cache',
+            'conversion_cache_max_bytes': 'conversion_cache_size_mb', 'image_max_dpi': 'image_dpi',
+            'conversion_memory_mb': 'conversion_memory_mb', 'isolate_conversions': 'no_conversion_isolation',
+        }
+        conversion_overrides = {option: value for option, value in conversion_options.items()
+                                if getattr(args, option_args[option]) != parser.get_default(option_args[option])}
+        
+        if args.resume:
+            # Continue an interrupted run; finished files are skipped
+            processor = EnhancedBatesNumbering.resume(args.resume, workers=args.workers,
+                                                      conversion_overrides=conversion_overrides)
+            processor.profile = args.profile
+            run_with_listeners(processor, lambda: processor.run(chunk=chunk), args.events, not args.no_progress)
+            return
+        
+        if args.manifest:
+            # Execute an existing plan; settings come from the manifest
+            processor = EnhancedBatesNumbering.from_manifest(args.manifest, workers=args.workers,
+                                                             conversion_overrides=conversion_overrides)
+            processor.profile = args.profile
+            run_with_listeners(processor, lambda: processor.run(chunk=chunk), args.events, not args.no_progress)
+            return
+        
+        if not args.input_path or not args.output_dir:
+            parser.error("input_path and output_dir are required unless --manifest or --resume is given")
+        if chunk is not None:
+            parser.error("--chunk can only be used with --manifest or --resume")
+        
         # Clean up prefix (remove trailing underscore if present)
         prefix = args.prefix.rstrip('_')
         
+        input_path = Path(args.input_path)
         processor = EnhancedBatesNumbering(
-            input_dir=str(Path(args.input_path).parent),
+            input_dir=str(input_path if input_path.is_dir() else input_path.parent),
             output_dir=args.output_dir,
             prefix=prefix,
             zero_pad_length=args.zero_pad,
-            start=args.start
+            start=args.start,
+            workers=args.workers,
+            previous_output_dir=args.incremental,
+            volume_max_pages=args.volume_pages,
+            volume_max_bytes=int(args.volume_size_mb * 1024 * 1024),
+            extract_dates=not args.no_extract_dates,
+            profile=args.profile,
+            **conversion_options
         )
         
         # Check if input is a single file
-        input_path = Path(args.input_path)
         if input_path.is_file():
             if input_path.suffix.lower() == '.pdf':
                 bates_number = f"{processor.prefix}{str(processor.current_number).zfill(processor.zero_pad_length)}"
@@ -2082,7 +5141,8 @@ def main():
                     print("Could not convert file to PDF")
         else:
             # Process entire directory
-            processor.run()
+            run_with_listeners(processor, lambda: processor.run(plan_only=args.plan_only), args.events,
+                               not args.no_progress)
     else:
         # GUI mode
         gui = BatesGUI()
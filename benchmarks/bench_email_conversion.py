@@ -0,0 +1,48 @@
+import sys
+import time
+import tempfile
+import argparse
+from pathlib import Path
+from email.message import EmailMessage
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from bates_master import EnhancedBatesNumbering
+
+def create_synthetic_emails(mail_dir: Path, count: int, paragraphs: int) -> list:
+    """Create plain-text messages of a few paragraphs each."""
+    mail_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for msg_num in range(1, count + 1):
+        msg = EmailMessage()
+        msg['From'] = f"Sender {msg_num} <sender{msg_num}@example.com>"
+        msg['To'] = "custodian@example.com"
+        msg['Subject'] = f"Synthetic production message {msg_num}"
+        msg['Date'] = "Mon, 3 Jun 2024 09:00:00 -0400"
+        msg.set_content(f"Paragraph of message {msg_num} with enough words to wrap. " * 12 + "\n\n" * paragraphs)
+        path = mail_dir / f"msg_{msg_num:05d}.eml"
+        path.write_bytes(bytes(msg))
+        paths.append(path)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark email to PDF conversion throughput')
+    parser.add_argument('--emails', type=int, default=1000, help='Number of messages (default: 1000)')
+    parser.add_argument('--paragraphs', type=int, default=10, help='Body paragraphs per message (default: 10)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        work_dir = Path(work_dir)
+        emails = create_synthetic_emails(work_dir / "mail", args.emails, args.paragraphs)
+        processor = EnhancedBatesNumbering(str(work_dir / "mail"), str(work_dir / "out"), is_single_file=True)
+
+        started = time.perf_counter()
+        for msg_num, path in enumerate(emails):
+            if processor.convert_to_pdf(path, work_dir / "pdf" / str(msg_num)) is None:
+                raise RuntimeError(f"Conversion failed for {path}")
+        elapsed = time.perf_counter() - started
+
+        print(f"Messages: {args.emails} (plain text, {args.paragraphs} paragraphs)")
+        print(f"Conversion: {elapsed:8.1f} s  ({args.emails / elapsed * 60:,.0f} messages/min, single process)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import sys
+import time
+import tempfile
+import argparse
+from pathlib import Path
+from docx import Document
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from bates_master import EnhancedBatesNumbering, OfficeConversionPool
+
+def create_synthetic_docs(doc_dir: Path, count: int) -> list:
+    """Create small Word documents with a few paragraphs each."""
+    doc_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for doc_num in range(1, count + 1):
+        document = Document()
+        document.add_heading(f"Synthetic production document {doc_num}", level=1)
+        for paragraph_num in range(5):
+            document.add_paragraph(f"Paragraph {paragraph_num} of document {doc_num}. " * 10)
+        path = doc_dir / f"doc_{doc_num:05d}.docx"
+        document.save(str(path))
+        paths.append(path)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-file versus batch office conversion')
+    parser.add_argument('--docs', type=int, default=100, help='Number of Word documents (default: 100)')
+    parser.add_argument('--instances', type=int, default=2, help='Office instances for the pool (default: 2)')
+    args = parser.parse_args()
+
+    if OfficeConversionPool.find_soffice() is None:
+        print("LibreOffice (soffice) was not found on the PATH; nothing to benchmark")
+        return
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        work_dir = Path(work_dir)
+        docs = create_synthetic_docs(work_dir / "docs", args.docs)
+        processor = EnhancedBatesNumbering(str(work_dir / "docs"), str(work_dir / "out"),
+                                           is_single_file=True, office_instances=args.instances)
+
+        # Before: one soffice start per document
+        started = time.perf_counter()
+        for doc in docs:
+            processor.convert_batch_to_pdf([doc], work_dir / "per_file")
+        per_file = time.perf_counter() - started
+
+        # After: one soffice start per batch of the same type
+        processor.staging_dir = work_dir / "staging"
+        started = time.perf_counter()
+        converted = processor.convert_office_batches(list(enumerate(docs)))
+        batch = time.perf_counter() - started
+
+        print(f"Documents: {args.docs} (docx)")
+        print(f"Per-file soffice:  {per_file:8.1f} s  ({per_file / args.docs:.2f} s/doc)")
+        print(f"Batched soffice:   {batch:8.1f} s  ({batch / args.docs:.2f} s/doc, {len(converted)} converted)")
+        print(f"Speedup:           {per_file / batch:8.2f}x")
+
+        if OfficeConversionPool.is_available():
+            started = time.perf_counter()
+            with OfficeConversionPool(args.instances) as pool:
+                pool_dir = work_dir / "pool"
+                pool_dir.mkdir()
+                for doc in docs:
+                    pool.convert(doc, pool_dir / f"{doc.stem}.pdf")
+            pooled = time.perf_counter() - started
+            print(f"Warm instances:    {pooled:8.1f} s  ({pooled / args.docs:.2f} s/doc, serial dispatch)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import sys
+import time
+import tempfile
+import argparse
+from pathlib import Path
+import openpyxl
+from openpyxl import load_workbook
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from bates_master import EnhancedBatesNumbering
+
+def create_synthetic_workbook(xlsx_path: Path, rows: int, cols: int):
+    """Create a single-sheet workbook with a header row and mixed text and numbers."""
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Data")
+    sheet.append([f"Column {col}" for col in range(1, cols + 1)])
+    for row in range(1, rows + 1):
+        sheet.append([f"Row {row} text" if col % 3 == 0 else row * col + 0.5 for col in range(cols)])
+    workbook.save(str(xlsx_path))
+
+def ingest_full_scan(xlsx_path: Path) -> int:
+    """Before: full workbook load and a cell-by-cell scan for the used range, then a second pass."""
+    wb = load_workbook(xlsx_path, data_only=True)
+    cells = 0
+    for sheet in wb.worksheets:
+        last_row = 0
+        last_col = 0
+        for row in range(1, sheet.max_row + 1):
+            for col in range(1, sheet.max_column + 1):
+                cell = sheet.cell(row=row, column=col)
+                if cell.value is not None and str(cell.value).strip():
+                    last_row = max(last_row, row)
+                    last_col = max(last_col, col)
+        for row in range(1, last_row + 1):
+            row_data = []
+            for col in range(1, last_col + 1):
+                value = sheet.cell(row=row, column=col).value
+                row_data.append(str(value if value is not None else ''))
+            cells += len(row_data)
+    return cells
+
+def ingest_streaming(processor: EnhancedBatesNumbering, xlsx_path: Path) -> int:
+    """After: read-only workbook streamed row by row in a single pass."""
+    cells = 0
+    for sheet in processor.iter_workbook_sheets(xlsx_path):
+        for row in sheet['rows']:
+            cells += len(row)
+    return cells
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark spreadsheet ingestion before and after streaming')
+    parser.add_argument('--rows', type=int, default=100000, help='Number of data rows (default: 100000)')
+    parser.add_argument('--cols', type=int, default=30, help='Number of columns (default: 30)')
+    parser.add_argument('--skip-full-scan', action='store_true',
+                        help='Only time streaming; the full scan takes tens of minutes at 100k rows')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        work_dir = Path(work_dir)
+        xlsx_path = work_dir / "synthetic.xlsx"
+        create_synthetic_workbook(xlsx_path, args.rows, args.cols)
+
+        processor = EnhancedBatesNumbering(str(work_dir), str(work_dir / "out"), is_single_file=True)
+
+        started = time.perf_counter()
+        after_cells = ingest_streaming(processor, xlsx_path)
+        after = time.perf_counter() - started
+
+        print(f"Workbook: {args.rows} rows x {args.cols} columns")
+        print(f"Read-only streaming:   {after:8.1f} s  ({after_cells} cells, {after_cells / after:,.0f} cells/sec)")
+        if not args.skip_full_scan:
+            started = time.perf_counter()
+            before_cells = ingest_full_scan(xlsx_path)
+            before = time.perf_counter() - started
+            print(f"Full load + cell scan: {before:8.1f} s  ({before_cells} cells, {before_cells / before:,.0f} cells/sec)")
+            print(f"Speedup:               {before / after:8.2f}x")
+
+if __name__ == '__main__':
+    main()
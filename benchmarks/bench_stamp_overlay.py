@@ -0,0 +1,59 @@
+import sys
+import time
+import tempfile
+import argparse
+from pathlib import Path
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import letter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from bates_master import EnhancedBatesNumbering
+
+def create_synthetic_pdf(pdf_path: Path, pages: int):
+    """Create a letter-size PDF with a line of text on every page."""
+    can = canvas.Canvas(str(pdf_path), pagesize=letter)
+    for page_num in range(1, pages + 1):
+        can.setFont("Helvetica", 12)
+        can.drawString(72, 720, f"Synthetic production page {page_num}")
+        can.showPage()
+    can.save()
+
+def time_stamping(processor: EnhancedBatesNumbering, input_pdf: Path, output_pdf: Path, pages: int) -> float:
+    """Stamp the PDF once and return the throughput in pages per second."""
+    bates_number = f"{processor.prefix}{str(processor.start).zfill(processor.zero_pad_length)}"
+    started = time.perf_counter()
+    if not processor.add_bates_stamp(input_pdf, output_pdf, bates_number):
+        raise RuntimeError(f"Stamping failed for {input_pdf}")
+    elapsed = time.perf_counter() - started
+    return pages / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Bates stamping with and without the overlay cache')
+    parser.add_argument('--pages', type=int, default=5000, help='Number of letter-size pages (default: 5000)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        work_dir = Path(work_dir)
+        input_pdf = work_dir / "synthetic.pdf"
+        create_synthetic_pdf(input_pdf, args.pages)
+
+        processor = EnhancedBatesNumbering(str(work_dir), str(work_dir / "out"), prefix="ABC",
+                                           zero_pad_length=6, is_single_file=True, stamp_box_width=1.0)
+
+        # Before: render and parse a fresh overlay for every page
+        overlay_cache = processor.overlay_cache
+        processor.overlay_cache = None
+        before = time_stamping(processor, input_pdf, work_dir / "out" / "uncached.pdf", args.pages)
+
+        # After: render once per page geometry and substitute the Bates text
+        processor.overlay_cache = overlay_cache
+        after = time_stamping(processor, input_pdf, work_dir / "out" / "cached.pdf", args.pages)
+
+        print(f"Pages: {args.pages} (letter)")
+        print(f"Per-page overlay:  {before:8.1f} pages/sec")
+        print(f"Cached overlay:    {after:8.1f} pages/sec")
+        print(f"Speedup:           {after / before:8.2f}x")
+        print(f"Templates rendered: {overlay_cache.misses}, reused: {overlay_cache.hits}")
+
+if __name__ == '__main__':
+    main()
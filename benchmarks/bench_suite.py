@@ -0,0 +1,440 @@
+import sys
+import io
+import json
+import time
+import zlib
+import zipfile
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from email.message import EmailMessage
+import openpyxl
+from PIL import Image, ImageDraw
+from PyPDF2 import PdfReader, PdfWriter
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import letter, legal, A4, A3, landscape
+
+try:
+    import resource
+except ImportError:
+    # Peak memory is not reported on Windows
+    resource = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from bates_master import EnhancedBatesNumbering, METRICS_FILENAME
+
+# Page sizes mixed into the mixed_pages corpus
+MIXED_PAGE_SIZES = [letter, A4, legal, landscape(letter), (792, 1224), A3]
+
+WORDS = ("agreement invoice shipment schedule payment meeting contract amendment counsel review "
+         "deposition exhibit production custodian privilege response request notice settlement").split()
+
+# Corpora: name -> (generator, base size); sizes are multiplied by --scale
+CORPORA = {}
+
+def corpus(name: str, size: int):
+    """Register a corpus generator taking (directory, rng, count)."""
+    def register(generator):
+        CORPORA[name] = (generator, size)
+        return generator
+    return register
+
+def write_text_pdf(target, rng: random.Random, pages: int, page_sizes=(letter,), dated: bool = False):
+    """Write a PDF of text pages; invariant output keeps the file identical for the same seed."""
+    can = canvas.Canvas(target, pagesize=letter, invariant=1)
+    for page_num in range(pages):
+        width, height = rng.choice(page_sizes)
+        can.setPageSize((width, height))
+        can.setFont("Helvetica", 10)
+        y = height - 72
+        if dated and page_num == 0:
+            can.drawString(72, y, f"Dated: {rng.choice(['March', 'June', 'October'])} {rng.randint(1, 28)}, "
+                                  f"{rng.randint(2005, 2023)}")
+            y -= 14
+        while y > 72:
+            can.drawString(72, y, " ".join(rng.choice(WORDS) for _ in range(12)))
+            y -= 14
+        can.showPage()
+    can.save()
+
+@corpus('small_pdfs', 400)
+def create_small_pdfs(target: Path, rng: random.Random, count: int):
+    """Many short letter-size PDFs; a quarter carry a date for date extraction."""
+    for doc_num in range(count):
+        write_text_pdf(str(target / f"doc_{doc_num:05d}.pdf"), rng, rng.randint(1, 4), dated=doc_num % 4 == 0)
+
+@corpus('large_pdfs', 1500)
+def create_large_pdfs(target: Path, rng: random.Random, count: int):
+    """Two long PDFs of count pages each."""
+    for doc_num in range(2):
+        write_text_pdf(str(target / f"large_{doc_num}.pdf"), rng, count)
+
+@corpus('mixed_pages', 60)
+def create_mixed_pages(target: Path, rng: random.Random, count: int):
+    """PDFs whose pages mix letter, A4, legal, landscape, tabloid and A3."""
+    for doc_num in range(count):
+        write_text_pdf(str(target / f"mixed_{doc_num:04d}.pdf"), rng, rng.randint(1, 6), MIXED_PAGE_SIZES)
+
+@corpus('encrypted', 40)
+def create_encrypted_pdfs(target: Path, rng: random.Random, count: int):
+    """PDFs with an owner password only, so stamping has to unlock them.
+
+    PyPDF2 derives the document ID from the clock, so only these files differ
+    between generations; their pages and sizes do not.
+    """
+    for doc_num in range(count):
+        plain = io.BytesIO()
+        write_text_pdf(plain, rng, 3)
+        writer = PdfWriter()
+        for page in PdfReader(plain).pages:
+            writer.add_page(page)
+        writer.encrypt(user_password='', owner_password='owner')
+        with open(target / f"locked_{doc_num:04d}.pdf", 'wb') as f:
+            writer.write(f)
+
+@corpus('spreadsheets', 20000)
+def create_spreadsheets(target: Path, rng: random.Random, count: int):
+    """One CSV and one XLSX of count rows of mixed text and numbers."""
+    with open(target / "ledger.csv", 'w', encoding='utf-8') as f:
+        f.write(",".join(f"Column {col}" for col in range(12)) + "\n")
+        for row in range(count):
+            f.write(",".join(rng.choice(WORDS) if col % 3 == 0 else f"{rng.uniform(0, 10000):.2f}"
+                             for col in range(12)) + "\n")
+    workbook = openpyxl.Workbook(write_only=True)
+    workbook.properties.created = workbook.properties.modified = datetime(2024, 1, 1)
+    sheet = workbook.create_sheet("Data")
+    sheet.append([f"Column {col}" for col in range(15)])
+    for row in range(count // 2):
+        sheet.append([rng.choice(WORDS) if col % 3 == 0 else round(rng.uniform(0, 10000), 2) for col in range(15)])
+    workbook.save(str(target / "register.xlsx"))
+    # Zip entries carry the time they were written; pin them so the file is identical between runs
+    with zipfile.ZipFile(target / "register.xlsx") as original:
+        members = [(info, original.read(info)) for info in original.infolist()]
+    with zipfile.ZipFile(target / "register.xlsx", 'w', zipfile.ZIP_DEFLATED) as pinned:
+        for info, data in members:
+            info.date_time = (2024, 1, 1, 0, 0, 0)
+            pinned.writestr(info, data)
+
+def create_image(rng: random.Random, width: int, height: int) -> Image.Image:
+    """A page-like image: light background with dark blocks standing in for text."""
+    image = Image.new('RGB', (width, height), (250, 248, 240))
+    draw = ImageDraw.Draw(image)
+    for _ in range(120):
+        x, y = rng.randrange(width), rng.randrange(height)
+        draw.rectangle([x, y, x + rng.randint(20, width // 3), y + rng.randint(4, 20)],
+                       fill=tuple(rng.randint(0, 90) for _ in range(3)))
+    return image
+
+@corpus('emails', 150)
+def create_emails(target: Path, rng: random.Random, count: int):
+    """Messages with one to three attachments (CSV, PNG and PDF), all converted without LibreOffice."""
+    for msg_num in range(count):
+        msg = EmailMessage()
+        msg['From'] = f"Sender {msg_num} <sender{msg_num}@example.com>"
+        msg['To'] = "custodian@example.com"
+        msg['Subject'] = f"Re: {' '.join(rng.choice(WORDS) for _ in range(4))}"
+        msg['Date'] = f"Mon, {rng.randint(1, 28)} Jun 2024 09:00:00 -0400"
+        msg.set_content("\n\n".join(" ".join(rng.choice(WORDS) for _ in range(60)) for _ in range(rng.randint(2, 8))))
+        msg.add_attachment("\n".join(f"{rng.choice(WORDS)},{rng.uniform(0, 1000):.2f}" for _ in range(80)).encode(),
+                           maintype='text', subtype='csv', filename="totals.csv")
+        if rng.random() < 0.5:
+            png = io.BytesIO()
+            create_image(rng, 400, 300).save(png, 'PNG')
+            msg.add_attachment(png.getvalue(), maintype='image', subtype='png', filename="chart.png")
+        if rng.random() < 0.5:
+            pdf = io.BytesIO()
+            write_text_pdf(pdf, rng, 2)
+            msg.add_attachment(pdf.getvalue(), maintype='application', subtype='pdf', filename="memo.pdf")
+        # The generator would pick a random boundary
+        msg.set_boundary(f"=============={rng.getrandbits(64):020d}==")
+        (target / f"msg_{msg_num:05d}.eml").write_bytes(bytes(msg))
+
+@corpus('images', 30)
+def create_images(target: Path, rng: random.Random, count: int):
+    """Scanned-page sized JPEG, PNG and two-page TIFF images."""
+    for image_num in range(count):
+        kind = image_num % 3
+        if kind == 0:
+            create_image(rng, 2550, 3300).save(target / f"scan_{image_num:04d}.jpg", 'JPEG', quality=85, dpi=(300, 300))
+        elif kind == 1:
+            create_image(rng, 1700, 2200).save(target / f"page_{image_num:04d}.png", 'PNG', dpi=(200, 200))
+        else:
+            frames = [create_image(rng, 1700, 2200) for _ in range(2)]
+            frames[0].save(target / f"fax_{image_num:04d}.tif", 'TIFF', save_all=True, append_images=frames[1:],
+                           dpi=(200, 200))
+
+def get_corpus(corpus_root: Path, name: str, seed: int, scale: float) -> Path:
+    """Return the directory of a corpus, generating it unless an earlier run already did."""
+    target = corpus_root / f"seed{seed}_scale{scale:g}" / name
+    # Kept beside the corpus so productions of the directory do not pick it up
+    marker = target.with_name(f"{name}.complete")
+    if marker.exists():
+        return target
+    shutil.rmtree(target, ignore_errors=True)
+    target.mkdir(parents=True)
+    generator, size = CORPORA[name]
+    # crc32 rather than hash() so the seed does not change between interpreter runs
+    generator(target, random.Random(seed ^ zlib.crc32(name.encode())), max(1, int(size * scale)))
+    marker.touch()
+    return target
+
+def list_files(directory: Path) -> list:
+    return sorted(path for path in directory.iterdir() if path.is_file())
+
+def count_pages(pdf_paths) -> int:
+    return sum(len(PdfReader(str(path)).pages) for path in pdf_paths)
+
+def make_processor(input_dir: Path, output_dir: Path, workers: int = 1, single: bool = True) -> EnhancedBatesNumbering:
+    return EnhancedBatesNumbering(str(input_dir), str(output_dir), prefix="BENCH", zero_pad_length=6,
+                                  is_single_file=single, workers=workers)
+
+# Benchmarks: name -> function(corpus_root, work_dir, settings) returning measurements.
+# Each runs in a fresh interpreter so its peak memory is its own.
+BENCHMARKS = {}
+
+def benchmark(name: str):
+    def register(function):
+        BENCHMARKS[name] = function
+        return function
+    return register
+
+def end_to_end(corpus_name: str):
+    """A whole production of one corpus; phase seconds come from its run_metrics.json."""
+    def run(corpus_root: Path, work_dir: Path, settings: dict) -> dict:
+        source = get_corpus(corpus_root, corpus_name, settings['seed'], settings['scale'])
+        processor = make_processor(source, work_dir / "out", settings['workers'], single=False)
+        started = time.perf_counter()
+        processor.run()
+        seconds = time.perf_counter() - started
+        with open(processor.output_dir / METRICS_FILENAME, 'r', encoding='utf-8') as f:
+            metrics = json.load(f)
+        return {'seconds': seconds, 'files': len(metrics['files']),
+                'pages': sum(record['pages'] for record in metrics['files']),
+                'bytes': sum(path.stat().st_size for path in list_files(source)),
+                'phases': metrics['phases']}
+    return run
+
+for corpus_name in CORPORA:
+    benchmark(f"e2e_{corpus_name}")(end_to_end(corpus_name))
+
+def stamp_corpora(*corpus_names):
+    """add_bates_stamp over the PDFs of some corpora."""
+    def run(corpus_root: Path, work_dir: Path, settings: dict) -> dict:
+        pdfs = [path for name in corpus_names
+                for path in list_files(get_corpus(corpus_root, name, settings['seed'], settings['scale']))]
+        processor = make_processor(pdfs[0].parent, work_dir / "out")
+        pages = count_pages(pdfs)
+        started = time.perf_counter()
+        for doc_num, pdf in enumerate(pdfs):
+            output = work_dir / "out" / f"{doc_num:05d}.pdf"
+            if not processor.add_bates_stamp(pdf, output, processor.format_bates(processor.current_number)):
+                raise RuntimeError(f"Stamping failed for {pdf}")
+        seconds = time.perf_counter() - started
+        return {'seconds': seconds, 'files': len(pdfs), 'pages': pages,
+                'bytes': sum(path.stat().st_size for path in pdfs)}
+    return run
+
+benchmark('stamp')(stamp_corpora('large_pdfs', 'mixed_pages'))
+benchmark('stamp_encrypted')(stamp_corpora('encrypted'))
+
+def convert_corpus(corpus_name: str):
+    """convert_to_pdf over every file of a corpus, in this process."""
+    def run(corpus_root: Path, work_dir: Path, settings: dict) -> dict:
+        sources = list_files(get_corpus(corpus_root, corpus_name, settings['seed'], settings['scale']))
+        processor = make_processor(sources[0].parent, work_dir / "out")
+        converted = []
+        started = time.perf_counter()
+        for doc_num, source in enumerate(sources):
+            pdf = processor.convert_to_pdf(source, work_dir / "pdf" / str(doc_num))
+            if pdf is None:
+                raise RuntimeError(f"Conversion failed for {source}")
+            converted.append(pdf)
+        seconds = time.perf_counter() - started
+        return {'seconds': seconds, 'files': len(sources), 'pages': count_pages(converted),
+                'bytes': sum(path.stat().st_size for path in sources)}
+    return run
+
+for corpus_name in ('spreadsheets', 'emails', 'images'):
+    benchmark(f"convert_{corpus_name}")(convert_corpus(corpus_name))
+
+def after_stamping(phase):
+    """Time one closing phase of a production of small_pdfs; copying and stamping are not timed."""
+    def run(corpus_root: Path, work_dir: Path, settings: dict) -> dict:
+        source = get_corpus(corpus_root, 'small_pdfs', settings['seed'], settings['scale'])
+        processor = make_processor(source, work_dir / "out", settings['workers'], single=False)
+        processor.process_files()
+        records = processor.production_records
+        started = time.perf_counter()
+        phase(processor)
+        seconds = time.perf_counter() - started
+        return {'seconds': seconds, 'files': len(records), 'pages': sum(record['page_count'] for record in records),
+                'bytes': sum(record['output_size'] for record in records)}
+    return run
+
+benchmark('generate_excel')(after_stamping(EnhancedBatesNumbering.generate_excel))
+benchmark('create_combined_pdf')(after_stamping(EnhancedBatesNumbering.create_combined_pdf))
+
+@benchmark('extract_dates')
+def bench_extract_dates(corpus_root: Path, work_dir: Path, settings: dict) -> dict:
+    """extract_date_from_pdf over small_pdfs with a cold cache."""
+    pdfs = list_files(get_corpus(corpus_root, 'small_pdfs', settings['seed'], settings['scale']))
+    processor = make_processor(pdfs[0].parent, work_dir / "out")
+    pages = count_pages(pdfs)
+    started = time.perf_counter()
+    for pdf in pdfs:
+        processor.extract_date_from_pdf(pdf)
+    seconds = time.perf_counter() - started
+    return {'seconds': seconds, 'files': len(pdfs), 'pages': pages,
+            'bytes': sum(path.stat().st_size for path in pdfs)}
+
+def get_peak_rss_mb() -> float:
+    """Peak resident memory of this process and its finished children, in MB."""
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1048576 if sys.platform == 'darwin' else 1024), 1)
+
+def run_case(name: str, corpus_root: Path, settings: dict, result_file: Path):
+    """Run one benchmark in this process and write its measurements as JSON."""
+    with tempfile.TemporaryDirectory() as work_dir:
+        result = BENCHMARKS[name](corpus_root, Path(work_dir), settings)
+    seconds = result['seconds']
+    result.update({
+        'name': name,
+        'pages_per_sec': result['pages'] / seconds if seconds else 0,
+        'mb_per_sec': result['bytes'] / 1048576 / seconds if seconds else 0,
+        'files_per_sec': result['files'] / seconds if seconds else 0,
+        'peak_rss_mb': get_peak_rss_mb(),
+    })
+    result_file.write_text(json.dumps(result))
+
+def run_isolated(name: str, corpus_root: Path, settings: dict) -> dict:
+    """Run one benchmark in a fresh interpreter; the production's own log output is discarded."""
+    with tempfile.TemporaryDirectory() as result_dir:
+        result_file = Path(result_dir) / "result.json"
+        cmd = [sys.executable, str(Path(__file__).resolve()), '--run-case', name, '--result-file', str(result_file),
+               '--corpus-dir', str(corpus_root), '--seed', str(settings['seed']),
+               '--scale', str(settings['scale']), '--workers', str(settings['workers'])]
+        completed = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if completed.returncode != 0 or not result_file.exists():
+            raise RuntimeError(f"Benchmark {name} failed:\n{completed.stderr[-2000:]}")
+        return json.loads(result_file.read_text())
+
+def print_results(results: list):
+    print(f"{'Benchmark':<24}{'Seconds':>9}{'Files':>7}{'Pages':>8}{'MB in':>8}{'Pages/s':>10}{'MB/s':>8}{'Peak MB':>9}")
+    for result in results:
+        peak = f"{result['peak_rss_mb']:>9.0f}" if result['peak_rss_mb'] is not None else f"{'-':>9}"
+        print(f"{result['name']:<24}{result['seconds']:>9.2f}{result['files']:>7}{result['pages']:>8}"
+              f"{result['bytes'] / 1048576:>8.1f}{result['pages_per_sec']:>10.1f}{result['mb_per_sec']:>8.2f}{peak}")
+        if result.get('phases'):
+            print(" " * 26 + ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in result['phases'].items()))
+
+def compare_to_baseline(results: list, baseline: dict, threshold: float, memory_threshold: float) -> list:
+    """Print each result against the baseline and return the regressions found.
+
+    Throughput regresses when it drops more than threshold percent below the
+    baseline; memory when the peak grows more than memory_threshold percent.
+    """
+    baseline_results = {result['name']: result for result in baseline['results']}
+    regressions = []
+    print(f"\n{'Benchmark':<24}{'Metric':<15}{'Baseline':>11}{'Current':>11}{'Change':>9}")
+    for result in results:
+        previous = baseline_results.get(result['name'])
+        if previous is None:
+            print(f"{result['name']:<24}(not in baseline)")
+            continue
+        for metric, higher_is_better, limit in (('pages_per_sec', True, threshold), ('mb_per_sec', True, threshold),
+                                                ('peak_rss_mb', False, memory_threshold)):
+            before, after = previous.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before * 100
+            regressed = change < -limit if higher_is_better else change > limit
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{result['name']:<24}{metric:<15}{before:>11.1f}{after:>11.1f}{change:>8.1f}%{flag}")
+            if regressed:
+                regressions.append(f"{result['name']} {metric} {change:+.1f}%")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark productions end to end and phase by phase on deterministic synthetic corpora')
+    parser.add_argument('--only', nargs='+', metavar='NAME',
+                        help='Run only these benchmarks, or those starting with a given prefix (e.g. e2e_)')
+    parser.add_argument('--list', action='store_true', help='List the benchmarks and exit')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Multiply the size of every corpus by this factor (default: 1.0)')
+    parser.add_argument('--seed', type=int, default=1234, help='Seed of the synthetic corpora (default: 1234)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes for the end-to-end and closing-phase benchmarks (default: 1)')
+    parser.add_argument('--repeat', type=int, default=1, help='Run each benchmark this many times and keep the '
+                                                              'fastest (default: 1)')
+    parser.add_argument('--corpus-dir', help='Keep the generated corpora here and reuse them on later runs')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--save-baseline', metavar='FILE', help='Save the results as a baseline to compare against')
+    parser.add_argument('--baseline', metavar='FILE', help='Compare the results to a saved baseline')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Percent drop in pages/sec or MB/sec reported as a regression (default: 10)')
+    parser.add_argument('--memory-threshold', type=float, default=20.0,
+                        help='Percent growth in peak memory reported as a regression (default: 20)')
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    settings = {'seed': args.seed, 'scale': args.scale, 'workers': args.workers}
+
+    if args.run_case:
+        run_case(args.run_case, Path(args.corpus_dir), settings, Path(args.result_file))
+        return
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return
+
+    names = [name for name in BENCHMARKS
+             if not args.only or any(name == only or name.startswith(only) for only in args.only)]
+    if not names:
+        parser.error(f"No benchmark matches {' '.join(args.only)}; see --list")
+
+    temp_dir = None
+    if args.corpus_dir:
+        corpus_root = Path(args.corpus_dir).resolve()
+    else:
+        temp_dir = tempfile.mkdtemp(prefix="bates_bench_")
+        corpus_root = Path(temp_dir)
+    try:
+        results = []
+        for name in names:
+            runs = [run_isolated(name, corpus_root, settings) for _ in range(max(1, args.repeat))]
+            result = min(runs, key=lambda run: run['seconds'])
+            print(f"{name}: {result['seconds']:.2f} s", file=sys.stderr)
+            results.append(result)
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    print(f"Corpora: seed {args.seed}, scale {args.scale:g}; workers {args.workers}; best of {max(1, args.repeat)}")
+    print_results(results)
+    report = {'settings': settings, 'created': datetime.now().isoformat(timespec='seconds'), 'results': results}
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline['settings'] != settings:
+            print(f"\nWarning: baseline was measured with {baseline['settings']}, not {settings}")
+        regressions = compare_to_baseline(results, baseline, args.threshold, args.memory_threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressions: " + "; ".join(regressions))
+            sys.exit(1)
+        print("\nNo regressions")
+
+if __name__ == '__main__':
+    main()
@@ -1,106 +1,21 @@
-import os
+import sys
 import email
-from email import policy
-from email.parser import BytesParser
 from pathlib import Path
 import tkinter as tk
 from tkinter import filedialog, messagebox
-from fpdf import FPDF
 from datetime import datetime
-import html
 import re
 
-class PDF(FPDF):
-    def header(self):
-        self.set_font('Helvetica', 'B', 12)
-        self.cell(0, 10, 'Email Message', ln=True, align='C')
-        self.ln(10)
+# Messages are rendered by the same engine as bates_master.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from bates_master import EmailRenderer
 
-def extract_email_content(msg):
-    """Extract email content, handling both plain text and HTML."""
-    content = []
-    
-    # Get email metadata
-    subject = msg.get('subject', 'No Subject')
-    from_addr = msg.get('from', 'Unknown Sender')
-    to_addr = msg.get('to', 'Unknown Recipient')
-    date = msg.get('date', 'Unknown Date')
-    
-    content.append(f"From: {from_addr}")
-    content.append(f"To: {to_addr}")
-    content.append(f"Subject: {subject}")
-    content.append(f"Date: {date}")
-    content.append("\n" + "="*50 + "\n")
-    
-    # Process email body
-    if msg.is_multipart():
-        for part in msg.walk():
-            if part.get_content_type() == "text/plain":
-                try:
-                    text = part.get_content()
-                    if isinstance(text, bytes):
-                        text = text.decode()
-                    content.append(text)
-                except Exception as e:
-                    content.append(f"Error decoding text part: {str(e)}")
-            elif part.get_content_type() == "text/html":
-                try:
-                    html_content = part.get_content()
-                    if isinstance(html_content, bytes):
-                        html_content = html_content.decode()
-                    # Basic HTML to text conversion
-                    html_content = re.sub('<[^<]+?>', '', html_content)
-                    html_content = html.unescape(html_content)
-                    content.append(html_content)
-                except Exception as e:
-                    content.append(f"Error decoding HTML part: {str(e)}")
-    else:
-        try:
-            text = msg.get_content()
-            if isinstance(text, bytes):
-                text = text.decode()
-            content.append(text)
-        except Exception as e:
-            content.append(f"Error decoding content: {str(e)}")
-    
-    return "\n".join(content)
+renderer = EmailRenderer()
 
 def convert_eml_to_pdf(eml_path, output_dir):
-    """Convert a single EML file to PDF."""
+    """Convert a single EML file to PDF, saving its attachments in a folder next to it."""
     try:
-        with open(eml_path, 'rb') as f:
-            msg = BytesParser(policy=policy.default).parse(f)
-        
-        # Create PDF
-        pdf = FPDF()
-        pdf.add_page()
-        
-        # Set font and size
-        pdf.set_font('Helvetica', '', 10)
-        
-        # Set margins
-        pdf.set_margins(15, 15, 15)
-        
-        # Get content and split into lines
-        content = extract_email_content(msg)
-        lines = content.split('\n')
-        
-        # Add content to PDF
-        for line in lines:
-            # Handle long lines by wrapping
-            if len(line) > 100:
-                words = line.split()
-                current_line = ""
-                for word in words:
-                    if len(current_line) + len(word) + 1 <= 100:
-                        current_line += " " + word if current_line else word
-                    else:
-                        pdf.multi_cell(0, 5, current_line)
-                        current_line = word
-                if current_line:
-                    pdf.multi_cell(0, 5, current_line)
-            else:
-                pdf.multi_cell(0, 5, line)
+        msg = renderer.parse(eml_path)
         
         # Generate output filename
         # Get sender email
@@ -140,7 +55,8 @@ def convert_eml_to_pdf(eml_path, output_dir):
         output_path = output_dir / output_filename
         
         # Save PDF
-        pdf.output(str(output_path))
+        renderer.render(msg, output_path)
+        renderer.save_attachments(msg, output_dir / f"{output_path.stem}_attachments")
         return True, output_filename
         
     except Exception as e: